@@ -0,0 +1,11 @@
+"""
+Headless benchmarks for the combat code.
+
+Run from the repository root, for example:
+`poetry run python -m benchmarks.enemy_bands`
+"""
+import sys
+
+sys.path.append("ares-sc2/src/ares")
+sys.path.append("ares-sc2/src")
+sys.path.append("ares-sc2")
@@ -0,0 +1,120 @@
+"""
+AOE casting decisions for a squad: the old `_use_aoe_ability`, which
+filters the enemy for every AOE spell for every unit, against the per
+type ability index plus per frame density maps in `AOETargeting`.
+"""
+import random
+import time
+from typing import Optional
+
+import numpy as np
+from ares.dicts.aoe_ability_to_range import AOE_ABILITY_SPELLS_INFO
+from cython_extensions.geometry import cy_distance_to_squared
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.units import Units
+
+from benchmarks.fakes import FakeBot, FakeMediator, FakeUnit, make_army
+from bot.combat_squads.aoe_targeting import AOETargeting
+from bot.combat_squads.spatial_hash import EnemySpatialHash
+from bot.combat_squads.squad.base_squad import BaseSquad
+from bot.combat_squads.unit_snapshot import UnitArrays
+
+CASTERS: list[tuple[UnitID, AbilityId]] = [
+    (UnitID.HIGHTEMPLAR, AbilityId.PSISTORM_PSISTORM),
+    (UnitID.GHOST, AbilityId.EMP_EMP),
+    (UnitID.RAVAGER, AbilityId.EFFECT_CORROSIVEBILE),
+]
+
+
+def legacy_use_aoe_ability(squad: BaseSquad, unit, enemy) -> Optional[tuple]:
+    # the pre-index implementation, kept here as the baseline
+    for ability in AOE_ABILITY_SPELLS_INFO:
+        if ability not in unit.abilities:
+            continue
+        ability_range_squared: float = 9.0 + (
+            AOE_ABILITY_SPELLS_INFO[ability]["range"] ** 2
+        )
+        _targets = Units(
+            [
+                u
+                for u in enemy
+                if cy_distance_to_squared(u.position, unit.position)
+                <= ability_range_squared
+            ],
+            squad.ai,
+        )
+        if ability == AbilityId.EMP_EMP:
+            _targets = [t for t in _targets if t.shield > 48 or t.energy > 48]
+        if _targets:
+            return ability, _targets
+
+
+def make_squad_army(num_units: int, rng: random.Random) -> list[FakeUnit]:
+    own: list[FakeUnit] = make_army(num_units, Point2((94.0, 100.0)), 0, rng)
+    # a caster every fifth unit
+    for i in range(0, num_units, 5):
+        type_id, ability = CASTERS[(i // 5) % len(CASTERS)]
+        own[i].type_id = type_id
+        own[i].abilities = frozenset({ability})
+    return own
+
+
+def check_upper_bound(aoe_targeting: AOETargeting, enemy: list[FakeUnit]) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    positions: np.ndarray = np.array([e.position for e in enemy])
+    for radius in {info["radius"] for info in AOE_ABILITY_SPELLS_INFO.values()}:
+        density_map = aoe_targeting.density_map(radius)
+        width, height = density_map.density.shape
+        for x, y in zip(rng.integers(0, width, 200), rng.integers(0, height, 200)):
+            centre: np.ndarray = density_map.origin + (x + 0.5, y + 0.5)
+            exact: int = int(
+                (np.sum((positions - centre) ** 2, axis=1) <= radius**2).sum()
+            )
+            assert density_map.density[x, y] >= exact
+
+
+def main() -> None:
+    repeats: int = 20
+    rng: random.Random = random.Random(0)
+    # 100 own units, 20 of them casters
+    own: list[FakeUnit] = make_squad_army(100, rng)
+    for num_enemy in (25, 100, 400, 1600):
+        enemy: list[FakeUnit] = make_army(
+            num_enemy, Point2((104.0, 100.0)), 10_000, rng
+        )
+        for e in enemy[::3]:
+            e.shield = e.shield_max = 80.0
+        bot: FakeBot = FakeBot(FakeMediator(own, enemy))
+        squad: BaseSquad = BaseSquad(bot, bot.mediator, None, Point2((100, 100)))
+        # the hash is built once per frame for other lookups anyway
+        enemy_hash: EnemySpatialHash = EnemySpatialHash.build(
+            UnitArrays.from_units(enemy)
+        )
+        check_upper_bound(AOETargeting(enemy_hash), enemy)
+
+        start: float = time.perf_counter()
+        for _ in range(repeats):
+            legacy_casts: int = sum(
+                legacy_use_aoe_ability(squad, u, enemy) is not None for u in own
+            )
+        legacy_ms: float = (time.perf_counter() - start) / repeats * 1e3
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            aoe_targeting = AOETargeting(enemy_hash)
+            casts: int = sum(
+                squad._use_aoe_ability(u, enemy, aoe_targeting) is not None for u in own
+            )
+        indexed_ms: float = (time.perf_counter() - start) / repeats * 1e3
+
+        print(
+            f"100 own vs {num_enemy} enemy: legacy {legacy_ms:.2f}ms "
+            f"({legacy_casts} casts), indexed {indexed_ms:.2f}ms "
+            f"({casts} casts past min_targets)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Drive `CombatSquadsController` and each `BaseSquad` subclass headless with
+synthetic armies, and report per frame latency and allocations.
+
+Example:
+`poetry run python -m benchmarks.combat_squads --units 10 100 400 --frames 2000`
+"""
+import argparse
+import gc
+import math
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from ares.consts import UnitRole
+from sc2.position import Point2
+
+from benchmarks.fakes import FakeBot, FakeMediator, FakeUnit, make_army
+from bot.combat_squads.aoe_targeting import AOETargeting
+from bot.combat_squads.command_batcher import CommandBatcher
+from bot.combat_squads.enemy_view import EnemyView
+from bot.combat_squads.frame_context import FrameContext
+from bot.combat_squads.main import CombatSquadsController, EnemyBands
+from bot.combat_squads.squad.base_squad import BaseSquad
+from bot.combat_squads.squad.squad_engagement import SquadEngagement
+from bot.combat_squads.squad.squad_movement import SquadMovement
+from bot.combat_squads.squad.squad_retreating import SquadRetreating
+from bot.combat_squads.squad.squad_setup import SquadSetup
+from bot.combat_squads.spatial_hash import EnemySpatialHash
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot
+
+# game step 2 at 22.4 game loops per second
+SECONDS_PER_FRAME: float = 2 / 22.4
+# frames for the two armies to meet, separate and meet again
+ENGAGEMENT_PERIOD: int = 600
+
+PHASE_CLASSES: dict[str, type[BaseSquad]] = {
+    "setup": SquadSetup,
+    "movement": SquadMovement,
+    "engagement": SquadEngagement,
+    "retreating": SquadRetreating,
+}
+
+
+@dataclass
+class Scenario:
+    """Two armies oscillating towards and away from each other."""
+
+    bot: FakeBot
+    mediator: FakeMediator
+    own: list[FakeUnit]
+    enemy: list[FakeUnit]
+    own_offsets: np.ndarray
+    enemy_offsets: np.ndarray
+    rng: random.Random
+    frame: int = 0
+
+    @classmethod
+    def create(cls, num_units: int, seed: int = 0) -> "Scenario":
+        rng = random.Random(seed)
+        mediator = FakeMediator()
+        bot = FakeBot(mediator)
+        own = make_army(num_units, Point2((60.0, 100.0)), 1, rng, bot.actions)
+        enemy = make_army(num_units, Point2((140.0, 100.0)), 100_000, rng)
+        scenario = cls(
+            bot,
+            mediator,
+            own,
+            enemy,
+            np.array([u.position for u in own]) - (60.0, 100.0),
+            np.array([u.position for u in enemy]) - (140.0, 100.0),
+            rng,
+        )
+        bot.unit_tag_dict = {u.tag: u for u in own + enemy}
+        scenario.step()
+        return scenario
+
+    def step(self) -> None:
+        self.frame += 1
+        self.bot.time = self.frame * SECONDS_PER_FRAME
+        self.bot.actions.clear()
+        self.bot.grouped_actions = 0
+        self.bot.grouped_unit_actions = 0
+        separation: float = 35.0 * math.cos(
+            2 * math.pi * self.frame / ENGAGEMENT_PERIOD
+        )
+        for units, offsets, center_x in (
+            (self.own, self.own_offsets, 100.0 - separation - 5.0),
+            (self.enemy, self.enemy_offsets, 100.0 + separation + 5.0),
+        ):
+            jitter: np.ndarray = np.random.default_rng(self.frame).uniform(
+                -0.3, 0.3, offsets.shape
+            )
+            positions: np.ndarray = offsets + jitter + (center_x, 100.0)
+            for u, pos in zip(units, positions.tolist()):
+                u.position = Point2(pos)
+        if self.frame % 20 == 0:
+            for u in self.rng.sample(self.own + self.enemy, len(self.own) // 4):
+                u.health = self.rng.uniform(20.0, u.health_max)
+        self.mediator.update(self.own, self.enemy)
+
+    def snapshot(self) -> SquadStateSnapshot:
+        return SquadStateSnapshot.build(self.own, self.enemy)
+
+    def frame_context(self) -> FrameContext:
+        return FrameContext.build(self.mediator, UnitRole.ATTACKING)
+
+
+def controller_frame(scenario: Scenario) -> Callable[[], None]:
+    controller = CombatSquadsController(
+        scenario.bot, scenario.mediator, UnitRole.ATTACKING
+    )
+
+    def frame() -> None:
+        snapshot: SquadStateSnapshot = scenario.snapshot()
+        enemy_hash: EnemySpatialHash = EnemySpatialHash.build(snapshot.enemy)
+        controller.execute(
+            scenario.enemy[0].position,
+            dict(),
+            snapshot,
+            scenario.frame_context(),
+            enemy_hash,
+            AOETargeting(enemy_hash),
+        )
+
+    return frame
+
+
+def phase_frame(scenario: Scenario, phase: type[BaseSquad]) -> Callable[[], None]:
+    controller = CombatSquadsController(
+        scenario.bot, scenario.mediator, UnitRole.ATTACKING
+    )
+    target: Point2 = scenario.enemy[0].position
+    phase_objects: dict[str, BaseSquad] = {
+        squad.squad_id: phase(scenario.bot, scenario.mediator, squad, target)
+        for squad in scenario.mediator.squads
+    }
+
+    def frame() -> None:
+        squads = scenario.mediator.squads
+        bands: dict[str, EnemyBands] = controller._get_enemy_bands(squads, 14.0, 18.5)
+        snapshot: SquadStateSnapshot = scenario.snapshot()
+        enemy_hash: EnemySpatialHash = EnemySpatialHash.build(snapshot.enemy)
+        aoe_targeting: AOETargeting = AOETargeting(enemy_hash)
+        frame_context: FrameContext = scenario.frame_context()
+        commands: CommandBatcher = controller.commands
+        for squad in squads:
+            phase_objects[squad.squad_id].execute(
+                squad=squad,
+                enemy=bands[squad.squad_id].close,
+                target=target,
+                pos_of_main_squad=frame_context.position_of_main_squad,
+                stutter_forward=False,
+                _unit_tag_to_bane_tag=dict(),
+                snapshot=snapshot,
+                frame=frame_context,
+                commands=commands,
+                enemy_view=EnemyView(snapshot.enemy, bands[squad.squad_id].close),
+                enemy_hash=enemy_hash,
+                aoe_targeting=aoe_targeting,
+            )
+        commands.flush()
+
+    return frame
+
+
+def run(
+    scenario: Scenario, frame: Callable[[], None], num_frames: int
+) -> dict[str, float]:
+    latencies: np.ndarray = np.empty(num_frames)
+    actions: int = 0
+    sent: int = 0
+    gc_before: int = sum(s["collections"] for s in gc.get_stats())
+    for i in range(num_frames):
+        scenario.step()
+        start: float = time.perf_counter()
+        frame()
+        latencies[i] = time.perf_counter() - start
+        actions += len(scenario.bot.actions)
+        sent += scenario.bot.actions_sent
+    gc_runs: int = sum(s["collections"] for s in gc.get_stats()) - gc_before
+
+    # allocations are measured on a shorter second pass, tracemalloc is slow
+    alloc_frames: int = max(1, num_frames // 10)
+    allocated: np.ndarray = np.empty(alloc_frames)
+    tracemalloc.start()
+    for i in range(alloc_frames):
+        scenario.step()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        frame()
+        _, peak = tracemalloc.get_traced_memory()
+        allocated[i] = peak - before
+    tracemalloc.stop()
+
+    ms: np.ndarray = latencies * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "max": ms.max(),
+        "alloc_kib": allocated.mean() / 1024,
+        "gc_per_1k": gc_runs * 1000 / num_frames,
+        "actions": actions / num_frames,
+        "sent": sent / num_frames,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, nargs="+", default=[10, 50, 100, 200, 400])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument(
+        "--target",
+        choices=["controller", *PHASE_CLASSES, "all"],
+        default="all",
+    )
+    args = parser.parse_args()
+
+    targets: list[str] = (
+        ["controller", *PHASE_CLASSES] if args.target == "all" else [args.target]
+    )
+    print(
+        f"{'target':<12}{'units':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'max ms':>9}{'KiB/frame':>11}{'gc/1k':>8}{'actions':>9}{'sent':>7}"
+    )
+    for target in targets:
+        for num_units in args.units:
+            scenario: Scenario = Scenario.create(num_units)
+            frame: Callable[[], None] = (
+                controller_frame(scenario)
+                if target == "controller"
+                else phase_frame(scenario, PHASE_CLASSES[target])
+            )
+            stats: dict[str, float] = run(scenario, frame, args.frames)
+            print(
+                f"{target:<12}{num_units:>6}{stats['p50']:>9.3f}{stats['p95']:>9.3f}"
+                f"{stats['p99']:>9.3f}{stats['max']:>9.3f}{stats['alloc_kib']:>11.1f}"
+                f"{stats['gc_per_1k']:>8.1f}{stats['actions']:>9.1f}"
+                f"{stats['sent']:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
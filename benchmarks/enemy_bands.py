@@ -0,0 +1,160 @@
+"""
+Compare the per squad triple range query against the batched
+`CombatSquadsController._get_enemy_bands`, and check both give the same bands.
+
+Also compare splitting each band with list comprehensions wherever a split
+is needed, as the squad code and `GenericEngagement` did, against one
+shared `EnemyView` per band.
+"""
+import random
+import timeit
+
+from ares.consts import ALL_STRUCTURES, UnitRole, UnitTreeQueryType
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+from benchmarks.fakes import FakeMediator, FakeSquad, FakeUnit
+from bot.combat_squads.enemy_view import EnemyView
+from bot.combat_squads.main import COMMON_UNIT_IGNORE_TYPES, CombatSquadsController
+from bot.combat_squads.unit_snapshot import UnitArrays
+from bot.unit_table import UNIT_FLYING
+
+# own units per squad, each picking a target out of the band
+SQUAD_SIZE: int = 20
+
+ENEMY_TYPES: list[tuple[UnitTypeId, float]] = [
+    (UnitTypeId.MARINE, 5.0),
+    (UnitTypeId.ZERGLING, 0.1),
+    (UnitTypeId.STALKER, 6.0),
+    (UnitTypeId.SIEGETANKSIEGED, 13.0),
+    (UnitTypeId.LARVA, 0.0),
+]
+
+
+def legacy_bands(
+    mediator: FakeMediator,
+    squad: FakeSquad,
+    close_enemy_radius: float = 14.0,
+    far_enemy_radius: float = 18.5,
+) -> tuple[list, list, list]:
+    close_enemy = [
+        u
+        for u in mediator.get_units_in_range(
+            start_points=[squad.squad_position],
+            distances=close_enemy_radius,
+            query_tree=UnitTreeQueryType.AllEnemy,
+        )[0]
+        if u.type_id not in COMMON_UNIT_IGNORE_TYPES
+    ]
+    max_enemy_range = max([u.ground_range for u in close_enemy]) if close_enemy else 0.0
+    range_check = 4.0 + (max_enemy_range * 1.5)
+    super_close_enemy = [
+        u
+        for u in mediator.get_units_in_range(
+            start_points=[squad.squad_position],
+            distances=range_check,
+            query_tree=UnitTreeQueryType.AllEnemy,
+        )[0]
+        if u.type_id not in COMMON_UNIT_IGNORE_TYPES
+    ]
+    far_enemy = [
+        u
+        for u in mediator.get_units_in_range(
+            start_points=[squad.squad_position],
+            distances=far_enemy_radius,
+            query_tree=UnitTreeQueryType.AllEnemy,
+        )[0]
+        if u.type_id not in COMMON_UNIT_IGNORE_TYPES
+    ]
+    return close_enemy, super_close_enemy, far_enemy
+
+
+def legacy_partitions(enemy: list[FakeUnit]) -> None:
+    # once per squad
+    fliers = [u for u in enemy if UNIT_FLYING[u.type_id.value]]
+    ground = [u for u in enemy if not UNIT_FLYING[u.type_id.value]]
+    [u for u in ground if u.ground_range < 3 and u.type_id != UnitTypeId.BANELING]
+    # once per unit
+    for _ in range(SQUAD_SIZE):
+        non_structures = [u for u in enemy if u.type_id not in ALL_STRUCTURES]
+        [u for u in non_structures if u.type_id == UnitTypeId.SIEGETANKSIEGED]
+
+
+def view_partitions(arrays: UnitArrays, enemy: list[FakeUnit]) -> None:
+    view: EnemyView = EnemyView(arrays, enemy)
+    view.select(view.air)
+    view.select(view.ground)
+    view.melee
+    for _ in range(SQUAD_SIZE):
+        view.select(view.non_structures)
+        view.select(view.sieged_tanks)
+
+
+def make_scenario(
+    num_squads: int, num_enemy: int, seed: int = 0
+) -> tuple[FakeMediator, list[FakeSquad]]:
+    rng = random.Random(seed)
+    enemy: list[FakeUnit] = []
+    for i in range(num_enemy):
+        type_id, ground_range = rng.choice(ENEMY_TYPES)
+        pos = Point2((rng.uniform(20, 120), rng.uniform(20, 120)))
+        enemy.append(FakeUnit(i, type_id, pos, ground_range))
+    mediator = FakeMediator()
+    mediator.set_enemy(enemy)
+    squads: list[FakeSquad] = [
+        FakeSquad(
+            f"squad_{i}",
+            [],
+            Point2((rng.uniform(20, 120), rng.uniform(20, 120))),
+        )
+        for i in range(num_squads)
+    ]
+    return mediator, squads
+
+
+def main() -> None:
+    for num_squads, num_enemy in ((4, 50), (8, 150), (12, 400)):
+        mediator, squads = make_scenario(num_squads, num_enemy)
+        controller = CombatSquadsController(None, mediator, UnitRole.ATTACKING)
+
+        bands = controller._get_enemy_bands(squads, 14.0, 18.5)
+        for squad in squads:
+            close, super_close, far = legacy_bands(mediator, squad)
+            b = bands[squad.squad_id]
+            assert [u.tag for u in b.close] == [u.tag for u in close]
+            assert [u.tag for u in b.super_close] == [u.tag for u in super_close]
+            assert [u.tag for u in b.far] == [u.tag for u in far]
+
+        number: int = 200
+        legacy: float = timeit.timeit(
+            lambda: [legacy_bands(mediator, s) for s in squads], number=number
+        )
+        mediator.query_count = 0
+        batched: float = timeit.timeit(
+            lambda: controller._get_enemy_bands(squads, 14.0, 18.5), number=number
+        )
+        print(
+            f"{num_squads} squads vs {num_enemy} enemy: "
+            f"legacy {legacy / number * 1e3:.3f}ms "
+            f"({3 * num_squads} queries), "
+            f"batched {batched / number * 1e3:.3f}ms "
+            f"({mediator.query_count / number:.1f} queries) per frame"
+        )
+
+        arrays: UnitArrays = UnitArrays.from_units(mediator.enemy)
+        close: list[list[FakeUnit]] = [bands[s.squad_id].close for s in squads]
+        legacy = timeit.timeit(
+            lambda: [legacy_partitions(enemy) for enemy in close], number=number
+        )
+        view = timeit.timeit(
+            lambda: [view_partitions(arrays, enemy) for enemy in close],
+            number=number,
+        )
+        print(
+            f"  band partitions: list comprehensions {legacy / number * 1e3:.3f}ms, "
+            f"EnemyView {view / number * 1e3:.3f}ms per frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Lightweight stand-ins for python-sc2 / ares objects so combat code
+can be driven without a running SC2 client.
+
+Only the attributes and mediator requests used by the bot's combat code
+are implemented. Behaviors registered with `FakeBot.register_behavior` are
+counted, not executed, so benchmarks measure our own decision making.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+import numpy as np
+from ares.consts import EngagementResult, UnitRole, UnitTreeQueryType
+from cython_extensions import cy_point_below_value
+from sc2.data import Race
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.buff_id import BuffId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from scipy.spatial import KDTree
+
+from bot.combat_squads.consts import GAME_LOOPS_PER_SECOND
+from bot.main import MyBot
+from bot.unit_table import UNIT_FLYING
+
+MAP_SIZE: int = 200
+
+# type, ground range, radius, is light, is armored
+ARMY_COMPOSITION: list[tuple[UnitTypeId, float, float, bool, bool]] = [
+    (UnitTypeId.MARINE, 5.0, 0.375, True, False),
+    (UnitTypeId.MARAUDER, 6.0, 0.5625, False, True),
+    (UnitTypeId.MEDIVAC, 0.0, 0.75, False, True),
+    (UnitTypeId.SIEGETANK, 7.0, 0.875, False, True),
+    (UnitTypeId.ZERGLING, 0.1, 0.375, True, False),
+    (UnitTypeId.ROACH, 4.0, 0.625, False, True),
+    (UnitTypeId.BANELING, 0.25, 0.375, False, False),
+    (UnitTypeId.STALKER, 6.0, 0.625, False, True),
+    (UnitTypeId.ZEALOT, 0.1, 0.5, True, False),
+]
+
+# ordered weakest to strongest, used to bucket a supply ratio into a result
+ENGAGEMENT_RESULTS: list[EngagementResult] = [
+    EngagementResult.LOSS_EMPHATIC,
+    EngagementResult.LOSS_OVERWHELMING,
+    EngagementResult.LOSS_DECISIVE,
+    EngagementResult.LOSS_CLOSE,
+    EngagementResult.LOSS_MARGINAL,
+    EngagementResult.TIE,
+    EngagementResult.VICTORY_MARGINAL,
+    EngagementResult.VICTORY_CLOSE,
+    EngagementResult.VICTORY_DECISIVE,
+    EngagementResult.VICTORY_OVERWHELMING,
+    EngagementResult.VICTORY_EMPHATIC,
+]
+
+
+@dataclass
+class FakeUnit:
+    tag: int
+    type_id: UnitTypeId
+    position: Point2
+    ground_range: float = 5.0
+    air_range: float = 0.0
+    radius: float = 0.5
+    is_light: bool = False
+    is_armored: bool = False
+    health: float = 100.0
+    health_max: float = 100.0
+    shield: float = 0.0
+    shield_max: float = 0.0
+    energy: float = 0.0
+    movement_speed: float = 3.15
+    can_attack: bool = True
+    is_hallucination: bool = False
+    attack_upgrade_level: int = 0
+    armor_upgrade_level: int = 0
+    shield_upgrade_level: int = 0
+    abilities: frozenset[AbilityId] = frozenset()
+    orders: list = field(default_factory=list)
+    # shared with `FakeBot.actions` so issued commands can be counted
+    actions: Optional[list] = None
+
+    @property
+    def is_flying(self) -> bool:
+        return bool(UNIT_FLYING[self.type_id.value])
+
+    @property
+    def health_percentage(self) -> float:
+        return self.health / self.health_max if self.health_max else 0.0
+
+    @property
+    def shield_percentage(self) -> float:
+        return self.shield / self.shield_max if self.shield_max else 0.0
+
+    @property
+    def shield_health_percentage(self) -> float:
+        total: float = self.health_max + self.shield_max
+        return (self.health + self.shield) / total if total else 0.0
+
+    def has_buff(self, buff: BuffId) -> bool:
+        return False
+
+    def __call__(self, ability: AbilityId, target=None, queue: bool = False) -> bool:
+        if self.actions is not None:
+            self.actions.append((ability, self.tag, target))
+        return True
+
+    def move(self, target, queue: bool = False) -> bool:
+        return self(AbilityId.MOVE_MOVE, target, queue)
+
+    def attack(self, target, queue: bool = False) -> bool:
+        return self(AbilityId.ATTACK, target, queue)
+
+
+@dataclass
+class FakeSquad:
+    squad_id: str
+    squad_units: list[FakeUnit]
+    squad_position: Point2
+    main_squad: bool = False
+
+    @property
+    def tags(self) -> set[int]:
+        return {u.tag for u in self.squad_units}
+
+
+@dataclass
+class FakeMediator:
+    """
+    Implements the mediator requests used by the combat code.
+
+    Call `update` at the start of each simulated frame so the unit trees,
+    squads and influence grids reflect the current unit positions.
+    """
+
+    own: list[FakeUnit] = field(default_factory=list)
+    enemy: list[FakeUnit] = field(default_factory=list)
+    squad_size: int = 20
+    query_count: int = 0
+    calls: int = 0
+    squads: list[FakeSquad] = field(default_factory=list)
+    _tree: Optional[KDTree] = None
+    _ground_grid: np.ndarray = field(
+        default_factory=lambda: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    )
+    _air_grid: np.ndarray = field(
+        default_factory=lambda: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    )
+    # no effects to avoid, left at the base pathing cost
+    _ground_avoidance_grid: np.ndarray = field(
+        default_factory=lambda: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    )
+    _air_avoidance_grid: np.ndarray = field(
+        default_factory=lambda: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    )
+    _climber_grid: np.ndarray = field(
+        default_factory=lambda: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    )
+
+    def set_enemy(self, enemy: list[FakeUnit]) -> None:
+        self.enemy = enemy
+        self._tree = KDTree(np.array([u.position for u in enemy]))
+
+    def update(self, own: list[FakeUnit], enemy: list[FakeUnit]) -> None:
+        self.own = own
+        self.set_enemy(enemy)
+
+        self._ground_grid.fill(1.0)
+        if enemy:
+            cells: np.ndarray = np.array(
+                [u.position for u in enemy if u.ground_range > 0.0], dtype=np.intp
+            ).reshape(-1, 2)
+            np.add.at(self._ground_grid, (cells[:, 0], cells[:, 1]), 20.0)
+        self._air_grid[:] = self._ground_grid
+        self._climber_grid[:] = self._ground_grid
+
+        self.squads = []
+        for i in range(0, len(own), self.squad_size):
+            units: list[FakeUnit] = own[i : i + self.squad_size]
+            center: np.ndarray = np.mean([u.position for u in units], axis=0)
+            self.squads.append(
+                FakeSquad(f"squad_{i}", units, Point2(center), main_squad=i == 0)
+            )
+
+    def get_squads(self, role: UnitRole, squad_radius: float) -> list[FakeSquad]:
+        self.calls += 1
+        return self.squads
+
+    def get_position_of_main_squad(self, role: UnitRole) -> Point2:
+        self.calls += 1
+        return self.squads[0].squad_position if self.squads else Point2((0.0, 0.0))
+
+    def get_units_in_range(
+        self,
+        start_points: list[Point2],
+        distances: Union[float, list[float]],
+        query_tree: UnitTreeQueryType,
+        **kwargs,
+    ) -> list[list[FakeUnit]]:
+        self.calls += 1
+        self.query_count += 1
+        if not isinstance(distances, list):
+            distances = [distances] * len(start_points)
+        return [
+            [self.enemy[i] for i in sorted(self._tree.query_ball_point(p, d))]
+            for p, d in zip(start_points, distances)
+        ]
+
+    def can_win_fight(
+        self, own_units: list[FakeUnit], enemy_units: list[FakeUnit], **kwargs
+    ) -> EngagementResult:
+        """Stand-in sim, buckets the health weighted unit count ratio."""
+        self.calls += 1
+        own: float = sum(u.health_percentage for u in own_units)
+        enemy: float = sum(u.health_percentage for u in enemy_units)
+        ratio: float = own / enemy if enemy else 10.0
+        index: int = int(np.clip(np.log2(max(ratio, 1e-3)) * 4 + 5, 0, 10))
+        return ENGAGEMENT_RESULTS[index]
+
+    def is_position_safe(
+        self, grid: np.ndarray, position: Point2, weight_safety_limit: float = 1.0
+    ) -> bool:
+        self.calls += 1
+        return cy_point_below_value(grid, position, weight_safety_limit)
+
+    def find_closest_safe_spot(
+        self, from_pos: Point2, grid: np.ndarray, radius: int = 15
+    ) -> Point2:
+        self.calls += 1
+        return from_pos
+
+    @property
+    def get_ground_grid(self) -> np.ndarray:
+        self.calls += 1
+        return self._ground_grid
+
+    @property
+    def get_air_grid(self) -> np.ndarray:
+        self.calls += 1
+        return self._air_grid
+
+    @property
+    def get_ground_avoidance_grid(self) -> np.ndarray:
+        self.calls += 1
+        return self._ground_avoidance_grid
+
+    @property
+    def get_air_avoidance_grid(self) -> np.ndarray:
+        self.calls += 1
+        return self._air_avoidance_grid
+
+    @property
+    def get_climber_grid(self) -> np.ndarray:
+        self.calls += 1
+        return self._climber_grid
+
+
+@dataclass
+class FakeGameState:
+    game_loop: int = 0
+
+
+@dataclass
+class FakeBot:
+    """The parts of `MyBot` / `AresBot` the combat code reads."""
+
+    mediator: FakeMediator
+    race: Race = Race.Terran
+    enemy_race: Race = Race.Zerg
+    time: float = 0.0
+    config: dict = field(default_factory=lambda: {"Debug": False})
+    actions: list = field(default_factory=list)
+    behaviors_registered: int = 0
+    # multi unit actions, and the unit orders they carried
+    grouped_actions: int = 0
+    grouped_unit_actions: int = 0
+    unit_tag_dict: dict[int, FakeUnit] = field(default_factory=dict)
+
+    get_total_supply = MyBot.get_total_supply
+
+    @property
+    def state(self) -> FakeGameState:
+        return FakeGameState(int(self.time * GAME_LOOPS_PER_SECOND))
+
+    @property
+    def time_formatted(self) -> str:
+        return f"{int(self.time // 60):02}:{int(self.time % 60):02}"
+
+    def register_behavior(self, behavior) -> None:
+        self.behaviors_registered += 1
+
+    def give_same_action(
+        self, order: AbilityId, unit_tags: list[int], target=None
+    ) -> None:
+        # recorded per unit, so digests match whether or not orders are batched
+        self.actions.extend((order, tag, target) for tag in unit_tags)
+        self.grouped_actions += 1
+        self.grouped_unit_actions += len(unit_tags)
+
+    @property
+    def actions_sent(self) -> int:
+        """Actions as sent to the game, a grouped action counts once."""
+        return len(self.actions) - self.grouped_unit_actions + self.grouped_actions
+
+    def draw_text_on_world(self, *args, **kwargs) -> None:
+        pass
+
+    def in_pathing_grid(self, pos: Point2) -> bool:
+        return True
+
+    def in_map_bounds(self, pos: Point2) -> bool:
+        return 0 <= pos[0] < MAP_SIZE and 0 <= pos[1] < MAP_SIZE
+
+
+def make_army(
+    num_units: int,
+    center: Point2,
+    first_tag: int,
+    rng: random.Random,
+    actions: Optional[list] = None,
+) -> list[FakeUnit]:
+    army: list[FakeUnit] = []
+    for i in range(num_units):
+        type_id, ground_range, radius, is_light, is_armored = rng.choice(
+            ARMY_COMPOSITION
+        )
+        army.append(
+            FakeUnit(
+                first_tag + i,
+                type_id,
+                Point2(
+                    (center[0] + rng.uniform(-8, 8), center[1] + rng.uniform(-8, 8))
+                ),
+                ground_range=ground_range,
+                radius=radius,
+                is_light=is_light,
+                is_armored=is_armored,
+                health=rng.uniform(20.0, 100.0),
+                actions=actions,
+            )
+        )
+    return army
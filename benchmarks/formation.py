@@ -0,0 +1,112 @@
+"""
+Compare the scipy `interp1d` concave construction previously used by
+`SquadSetup` against the precomputed templates in
+`bot.combat_squads.formation`.
+
+Also compare unit to slot assignment: list order as previously used,
+the optimal and greedy assignment in `bot.combat_squads.formation`, and
+scipy's `linear_sum_assignment` as the reference optimum.
+"""
+import timeit
+
+import numpy as np
+from scipy.interpolate import interp1d
+from scipy.optimize import linear_sum_assignment
+
+from bot.combat_squads.formation import (
+    _greedy_assignment,
+    _optimal_assignment,
+    concave_points,
+    travel_costs,
+)
+
+
+def legacy_concave_points(
+    num_points: int,
+    setup_from: tuple[float, float],
+    target_location: tuple[float, float],
+) -> np.ndarray:
+    distance_spread: float = num_points * 0.35
+    mid_value_depth = distance_spread * 0.6
+    mid_value: float = (
+        mid_value_depth if target_location[0] < setup_from[0] else -mid_value_depth
+    )
+    points = np.array(
+        [
+            [setup_from[0], setup_from[0] + mid_value, setup_from[0]],
+            [
+                setup_from[1] - distance_spread,
+                setup_from[1],
+                setup_from[1] + distance_spread,
+            ],
+        ]
+    ).T
+
+    distance = np.cumsum(np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1)))
+    distance = np.insert(distance, 0, 0) / distance[-1]
+
+    alpha = np.linspace(0, 1, num_points)
+    interpolator = interp1d(distance, points, kind="quadratic", axis=0)
+    return interpolator(alpha)
+
+
+def assignment_benchmark(number: int = 200) -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    setup_from: tuple[float, float] = (62.3, 80.1)
+    for num_units in (5, 8, 16, 32, 80):
+        slots: np.ndarray = concave_points(num_units, setup_from, (10.0, 50.0))
+        # squad loosely clumped behind the concave
+        positions: np.ndarray = rng.normal(
+            (setup_from[0] + 4.0, setup_from[1]), num_units * 0.15, (num_units, 2)
+        )
+        costs: np.ndarray = travel_costs(positions, slots)
+        rows, cols = linear_sum_assignment(costs)
+        best: float = costs[rows, cols].sum()
+        list_order: float = np.trace(costs)
+        optimal: float = costs[np.arange(num_units), _optimal_assignment(costs)].sum()
+        greedy: float = costs[np.arange(num_units), _greedy_assignment(costs)].sum()
+
+        optimal_time: float = timeit.timeit(
+            lambda: _optimal_assignment(travel_costs(positions, slots)),
+            number=number,
+        )
+        greedy_time: float = timeit.timeit(
+            lambda: _greedy_assignment(travel_costs(positions, slots)),
+            number=number,
+        )
+        print(
+            f"{num_units} units, total travel vs optimum: "
+            f"list order {list_order / best:.2f}x, "
+            f"hungarian {optimal / best:.2f}x "
+            f"({optimal_time / number * 1e6:.1f}us), "
+            f"greedy {greedy / best:.2f}x ({greedy_time / number * 1e6:.1f}us)"
+        )
+
+
+def main() -> None:
+    setup_from: tuple[float, float] = (62.3, 80.1)
+    for num_units in (1, 5, 20, 40, 80, 120):
+        for target in ((10.0, 50.0), (120.0, 90.0)):
+            assert np.allclose(
+                legacy_concave_points(num_units, setup_from, target),
+                concave_points(num_units, setup_from, target),
+                atol=1e-9,
+            )
+        number: int = 5000
+        legacy: float = timeit.timeit(
+            lambda: legacy_concave_points(num_units, setup_from, (10.0, 50.0)),
+            number=number,
+        )
+        template: float = timeit.timeit(
+            lambda: concave_points(num_units, setup_from, (10.0, 50.0)),
+            number=number,
+        )
+        print(
+            f"{num_units} units: interp1d {legacy / number * 1e6:.1f}us, "
+            f"template {template / number * 1e6:.1f}us"
+        )
+    assignment_benchmark()
+
+
+if __name__ == "__main__":
+    main()
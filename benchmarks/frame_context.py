@@ -0,0 +1,176 @@
+"""
+Compare resolving grids and the main squad position through the mediator
+where the squad code uses them, against reading them from a
+`FrameContext` built once per frame.
+
+`DispatchMediator` goes through the same two level dispatch as ares'
+`ManagerMediator` (mediator -> manager -> request handler), the fakes in
+`benchmarks.fakes` return their grids directly and would hide its cost.
+"""
+import time
+from enum import Enum, auto
+from typing import Any, Callable
+
+import numpy as np
+from ares.consts import UnitRole
+from sc2.position import Point2
+
+from benchmarks.fakes import MAP_SIZE
+from bot.combat_squads.frame_context import FrameContext
+
+SQUAD_SIZE: int = 20
+NUM_FRAMES: int = 2000
+
+
+class ManagerName(Enum):
+    PATH_MANAGER = auto()
+    SQUAD_MANAGER = auto()
+
+
+class ManagerRequestType(Enum):
+    GET_GROUND_GRID = auto()
+    GET_AIR_GRID = auto()
+    GET_GROUND_AVOIDANCE_GRID = auto()
+    GET_AIR_AVOIDANCE_GRID = auto()
+    GET_CLIMBER_GRID = auto()
+    GET_POSITION_OF_MAIN_SQUAD = auto()
+
+
+class FakeManager:
+    def __init__(self, requests: dict[ManagerRequestType, Callable[[dict], Any]]):
+        self.manager_requests_dict = requests
+
+    def manager_request(
+        self, receiver: ManagerName, request: ManagerRequestType, reason=None, **kwargs
+    ) -> Any:
+        return self.manager_requests_dict[request](kwargs)
+
+
+class DispatchMediator:
+    """Grid and squad lookups routed like ares' `ManagerMediator`."""
+
+    def __init__(self, grids: dict[str, np.ndarray]):
+        self.managers: dict[str, FakeManager] = {
+            ManagerName.PATH_MANAGER.name: FakeManager(
+                {
+                    ManagerRequestType.GET_GROUND_GRID: lambda kwargs: grids["ground"],
+                    ManagerRequestType.GET_AIR_GRID: lambda kwargs: grids["air"],
+                    ManagerRequestType.GET_GROUND_AVOIDANCE_GRID: (
+                        lambda kwargs: grids["ground_avoidance"]
+                    ),
+                    ManagerRequestType.GET_AIR_AVOIDANCE_GRID: (
+                        lambda kwargs: grids["air_avoidance"]
+                    ),
+                    ManagerRequestType.GET_CLIMBER_GRID: (
+                        lambda kwargs: grids["climber"]
+                    ),
+                }
+            ),
+            ManagerName.SQUAD_MANAGER.name: FakeManager(
+                {
+                    ManagerRequestType.GET_POSITION_OF_MAIN_SQUAD: (
+                        lambda kwargs: Point2((60.0, 100.0))
+                    ),
+                }
+            ),
+        }
+
+    def manager_request(
+        self, receiver: ManagerName, request: ManagerRequestType, reason=None, **kwargs
+    ) -> Any:
+        return self.managers[receiver.name].manager_request(
+            receiver, request, reason, **kwargs
+        )
+
+    @property
+    def get_ground_grid(self) -> np.ndarray:
+        return self.manager_request(
+            ManagerName.PATH_MANAGER, ManagerRequestType.GET_GROUND_GRID
+        )
+
+    @property
+    def get_air_grid(self) -> np.ndarray:
+        return self.manager_request(
+            ManagerName.PATH_MANAGER, ManagerRequestType.GET_AIR_GRID
+        )
+
+    @property
+    def get_ground_avoidance_grid(self) -> np.ndarray:
+        return self.manager_request(
+            ManagerName.PATH_MANAGER, ManagerRequestType.GET_GROUND_AVOIDANCE_GRID
+        )
+
+    @property
+    def get_air_avoidance_grid(self) -> np.ndarray:
+        return self.manager_request(
+            ManagerName.PATH_MANAGER, ManagerRequestType.GET_AIR_AVOIDANCE_GRID
+        )
+
+    @property
+    def get_climber_grid(self) -> np.ndarray:
+        return self.manager_request(
+            ManagerName.PATH_MANAGER, ManagerRequestType.GET_CLIMBER_GRID
+        )
+
+    def get_position_of_main_squad(self, role: UnitRole) -> Point2:
+        return self.manager_request(
+            ManagerName.SQUAD_MANAGER,
+            ManagerRequestType.GET_POSITION_OF_MAIN_SQUAD,
+            role=role,
+        )
+
+
+def mediator_frame(mediator: DispatchMediator, squads: list[list[bool]]) -> None:
+    # mirrors the lookups done before `FrameContext`
+    for squad in squads:
+        mediator.get_position_of_main_squad(role=UnitRole.ATTACKING)
+        mediator.get_position_of_main_squad(role=UnitRole.ATTACKING)
+        mediator.get_ground_grid
+        mediator.get_air_grid
+        for flying in squad:
+            avoid_grid: np.ndarray = mediator.get_ground_avoidance_grid
+            grid: np.ndarray = mediator.get_ground_grid
+            if flying:
+                avoid_grid = mediator.get_air_avoidance_grid
+                grid = mediator.get_air_grid
+
+
+def context_frame(mediator: DispatchMediator, squads: list[list[bool]]) -> None:
+    frame: FrameContext = FrameContext.build(mediator, UnitRole.ATTACKING)
+    for squad in squads:
+        frame.position_of_main_squad
+        frame.position_of_main_squad
+        frame.ground_grid
+        frame.air_grid
+        for flying in squad:
+            avoid_grid: np.ndarray = frame.avoidance_grid(flying)
+            grid: np.ndarray = frame.grid(flying)
+
+
+def main() -> None:
+    grids: dict[str, np.ndarray] = {
+        name: np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+        for name in ("ground", "air", "ground_avoidance", "air_avoidance", "climber")
+    }
+    mediator: DispatchMediator = DispatchMediator(grids)
+    rng: np.random.Generator = np.random.default_rng(0)
+    for num_units in (25, 100, 200, 400):
+        flying: list[bool] = (rng.random(num_units) < 0.2).tolist()
+        squads: list[list[bool]] = [
+            flying[i : i + SQUAD_SIZE] for i in range(0, num_units, SQUAD_SIZE)
+        ]
+        results: list[str] = []
+        for name, frame in (
+            ("mediator", mediator_frame),
+            ("frame context", context_frame),
+        ):
+            start: float = time.perf_counter()
+            for _ in range(NUM_FRAMES):
+                frame(mediator, squads)
+            elapsed: float = (time.perf_counter() - start) / NUM_FRAMES
+            results.append(f"{name} {elapsed * 1e6:.1f}us")
+        print(f"{num_units} units: " + ", ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare keeping influence grid history as a full `np.copy` per frame
+against `bot.grid_history.GridHistory` keyframes plus sparse deltas, both
+in memory and backed by memory mapped files.
+
+Synthetic grids change a few hundred cells per frame, roughly what moving
+units do to the ground grid of a micro arena map.
+"""
+import tempfile
+import time
+from typing import Optional
+
+import numpy as np
+
+from bot.grid_history import GridHistory
+
+SHAPE: tuple[int, int] = (200, 200)
+NUM_FRAMES: int = 2000
+CHANGED_CELLS: int = 400
+
+
+def synthetic_grids(seed: int = 0) -> list[np.ndarray]:
+    rng: np.random.Generator = np.random.default_rng(seed)
+    grid: np.ndarray = np.ones(SHAPE, dtype=np.float32)
+    grids: list[np.ndarray] = []
+    for _ in range(NUM_FRAMES):
+        cells: np.ndarray = rng.integers(0, grid.size, CHANGED_CELLS)
+        grid.ravel()[cells] = rng.uniform(1.0, 50.0, CHANGED_CELLS)
+        grids.append(grid.copy())
+    return grids
+
+
+def bench_copy(grids: list[np.ndarray]) -> tuple[float, int]:
+    history: list[np.ndarray] = []
+    start: float = time.perf_counter()
+    for grid in grids:
+        history.append(np.copy(grid))
+    return time.perf_counter() - start, sum(g.nbytes for g in history)
+
+
+def bench_history(
+    grids: list[np.ndarray], directory: Optional[str] = None
+) -> tuple[float, int, GridHistory]:
+    history = GridHistory(SHAPE, max_frames=NUM_FRAMES, directory=directory)
+    start: float = time.perf_counter()
+    for grid in grids:
+        history.append(grid)
+    history.flush()
+    return time.perf_counter() - start, history.nbytes, history
+
+
+def main() -> None:
+    grids: list[np.ndarray] = synthetic_grids()
+    copy_time, copy_bytes = bench_copy(grids)
+    print(
+        f"np.copy: {copy_time / NUM_FRAMES * 1e6:.1f}us/frame, "
+        f"{copy_bytes / 2**20:.1f}MiB"
+    )
+
+    history_time, history_bytes, history = bench_history(grids)
+    print(
+        f"GridHistory: {history_time / NUM_FRAMES * 1e6:.1f}us/frame, "
+        f"{history_bytes / 2**20:.1f}MiB"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        mmap_time, mmap_bytes, _ = bench_history(grids, directory)
+        print(
+            f"GridHistory memmap: {mmap_time / NUM_FRAMES * 1e6:.1f}us/frame, "
+            f"{mmap_bytes / 2**20:.1f}MiB"
+        )
+        opened: GridHistory = GridHistory.open(directory)
+        for frame, grid in enumerate(opened.frames()):
+            assert np.array_equal(grid, grids[frame])
+        number: int = 200
+        start: float = time.perf_counter()
+        for frame in range(NUM_FRAMES - number, NUM_FRAMES):
+            opened.grid_at(frame)
+        print(
+            f"grid_at, memmap: "
+            f"{(time.perf_counter() - start) / number * 1e6:.1f}us/frame"
+        )
+        del opened
+
+    for frame in (0, NUM_FRAMES // 2, NUM_FRAMES - 1):
+        assert np.array_equal(history.grid_at(frame), grids[frame])
+
+
+if __name__ == "__main__":
+    main()
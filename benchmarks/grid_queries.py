@@ -0,0 +1,62 @@
+"""
+Compare per unit `is_position_safe` calls against the batched squad
+safety checks in `bot.combat_squads.grid_queries`.
+"""
+import time
+
+import numpy as np
+from cython_extensions import cy_point_below_value
+
+from benchmarks.fakes import MAP_SIZE
+from bot.combat_squads.grid_queries import squad_positions_safe
+
+
+def make_grids(rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    ground: np.ndarray = np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    air: np.ndarray = np.ones((MAP_SIZE, MAP_SIZE), dtype=np.float32)
+    # sprinkle danger and a few pathing blockers (inf) around the map
+    for grid in (ground, air):
+        cells = rng.integers(0, MAP_SIZE, size=(MAP_SIZE * 40, 2))
+        grid[cells[:, 0], cells[:, 1]] += rng.uniform(0, 40, size=cells.shape[0])
+        blocked = rng.integers(0, MAP_SIZE, size=(MAP_SIZE, 2))
+        grid[blocked[:, 0], blocked[:, 1]] = np.inf
+    return ground, air
+
+
+def per_unit(ground, air, positions, flying) -> list[bool]:
+    return [
+        cy_point_below_value(air if fly else ground, (x, y), 1.0)
+        for (x, y), fly in zip(positions.tolist(), flying.tolist())
+    ]
+
+
+def main() -> None:
+    rng: np.random.Generator = np.random.default_rng(0)
+    ground, air = make_grids(rng)
+    repeats: int = 2000
+    for num_units in (10, 50, 200, 800):
+        positions: np.ndarray = rng.uniform(0, MAP_SIZE, size=(num_units, 2))
+        flying: np.ndarray = rng.random(num_units) < 0.25
+
+        expected: list[bool] = per_unit(ground, air, positions, flying)
+        batched: np.ndarray = squad_positions_safe(ground, air, positions, flying)
+        assert batched.tolist() == expected
+
+        start: float = time.perf_counter()
+        for _ in range(repeats):
+            per_unit(ground, air, positions, flying)
+        loop_us: float = (time.perf_counter() - start) / repeats * 1e6
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            squad_positions_safe(ground, air, positions, flying)
+        batched_us: float = (time.perf_counter() - start) / repeats * 1e6
+
+        print(
+            f"{num_units} units: per unit {loop_us:.1f}us, "
+            f"batched {batched_us:.1f}us ({loop_us / batched_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
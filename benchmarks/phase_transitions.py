@@ -0,0 +1,77 @@
+"""
+Measure the cost of squad phase transitions: constructing a fresh
+`BaseSquad` object on every transition versus reusing pooled objects
+from `SquadPhasePool`.
+"""
+import gc
+import itertools
+import time
+import tracemalloc
+from typing import Callable
+
+from ares.consts import UnitRole
+
+from benchmarks.combat_squads import Scenario
+from bot.combat_squads.main import CombatSquadsController, EngagementPhase
+from bot.combat_squads.squad.base_squad import BaseSquad
+
+# an oscillating fight: engage, retreat, regroup, move in, engage again
+PHASE_CYCLE: list[EngagementPhase] = [
+    EngagementPhase.Engaging,
+    EngagementPhase.Retreating,
+    EngagementPhase.SettingUp,
+    EngagementPhase.Moving,
+    EngagementPhase.PreEngaging,
+]
+
+
+def measure(
+    transition: Callable[[int], BaseSquad], num_transitions: int
+) -> tuple[float, int, float]:
+    gc_before: int = sum(s["collections"] for s in gc.get_stats())
+    start: float = time.perf_counter()
+    for i in range(num_transitions):
+        transition(i)
+    elapsed: float = time.perf_counter() - start
+    gc_runs: int = sum(s["collections"] for s in gc.get_stats()) - gc_before
+
+    tracemalloc.start()
+    for i in range(num_transitions // 10):
+        transition(i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / num_transitions * 1e6, gc_runs, peak / 1024
+
+
+def main() -> None:
+    num_transitions: int = 100_000
+    for num_units in (20, 100, 400):
+        scenario: Scenario = Scenario.create(num_units)
+        controller = CombatSquadsController(
+            scenario.bot, scenario.mediator, UnitRole.ATTACKING
+        )
+        squads = scenario.mediator.squads
+        target = scenario.enemy[0].position
+        phases = list(itertools.islice(itertools.cycle(PHASE_CYCLE), 1000))
+        phase_to_class = controller._engagement_phase_to_base_squad
+
+        def construct(i: int) -> BaseSquad:
+            squad = squads[i % len(squads)]
+            return phase_to_class[phases[i % 1000]](
+                scenario.bot, scenario.mediator, squad, target
+            )
+
+        def pooled(i: int) -> BaseSquad:
+            squad = squads[i % len(squads)]
+            return controller.phase_pool.get(squad, phases[i % 1000], target)
+
+        for name, transition in (("construct", construct), ("pooled", pooled)):
+            per_transition, gc_runs, peak_kib = measure(transition, num_transitions)
+            print(
+                f"{num_units} units {name}: {per_transition:.2f}us per transition, "
+                f"{gc_runs} gc runs, {peak_kib:.1f}KiB peak traced"
+            )
+
+
+if __name__ == "__main__":
+    main()
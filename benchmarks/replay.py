@@ -0,0 +1,196 @@
+"""
+Play a recording made by `bot.recorder.GameRecorder` back through
+`CombatManager.execute` headless, and report per frame latency along with
+a digest of every issued command.
+
+The digest only changes when the bot's decisions change, so a recording
+doubles as a regression fixture: record once, then compare digests and
+latency before and after a change. Combat sims use the `FakeMediator`
+stand-in, so decisions are deterministic but not identical to the game.
+
+Example:
+`poetry run python -m benchmarks.replay data/recordings/<opponent>_<time>`
+"""
+import argparse
+import hashlib
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+from benchmarks.fakes import FakeBot, FakeMediator, FakeSquad, FakeUnit
+from bot.combat_manager import CombatManager
+from bot.frame_profiler import FrameProfiler
+from bot.recorder import (
+    FLAG_COLUMNS,
+    FLOAT_COLUMNS,
+    INT_COLUMNS,
+    RecordedFrame,
+    read_recording,
+)
+from bot.unit_table import is_structure
+
+
+@dataclass
+class ReplayMediator(FakeMediator):
+    """`FakeMediator` with squads and grids taken from the recording."""
+
+    def load_frame(
+        self,
+        own: list[FakeUnit],
+        enemy: list[FakeUnit],
+        squads: list[FakeSquad],
+        grids: dict[str, np.ndarray],
+    ) -> None:
+        self.own = own
+        if enemy:
+            self.set_enemy(enemy)
+        else:
+            self.enemy = enemy
+        self.squads = squads
+        for name, grid in grids.items():
+            setattr(self, f"_{name}", grid)
+
+
+class FakeUnits(list):
+    """List of `FakeUnit` that can be filtered by type like `Units`."""
+
+    def __call__(self, type_id: UnitTypeId) -> "FakeUnits":
+        return FakeUnits(u for u in self if u.type_id == type_id)
+
+
+@dataclass
+class ReplayBot(FakeBot):
+    """`FakeBot` with the unit collections `CombatManager` reads."""
+
+    units: FakeUnits = field(default_factory=FakeUnits)
+    enemy_units: FakeUnits = field(default_factory=FakeUnits)
+    all_enemy_units: FakeUnits = field(default_factory=FakeUnits)
+    enemy_structures: FakeUnits = field(default_factory=FakeUnits)
+    game_info: SimpleNamespace = field(
+        default_factory=lambda: SimpleNamespace(map_center=Point2((100.0, 100.0)))
+    )
+
+
+@dataclass
+class Player:
+    """Turns recorded frames back into fake units, reusing them by tag."""
+
+    bot: ReplayBot
+    mediator: ReplayMediator
+    combat_manager: CombatManager
+    match_up_tracker: SimpleNamespace
+    _units: dict[int, FakeUnit] = field(default_factory=dict)
+
+    @classmethod
+    def create(cls) -> "Player":
+        mediator = ReplayMediator()
+        bot = ReplayBot(mediator)
+        match_up_tracker = SimpleNamespace(
+            active_match_up=None, record_engagement_decision=lambda engage: None
+        )
+        combat_manager = CombatManager(
+            bot, dict(), mediator, match_up_tracker, FrameProfiler()
+        )
+        return cls(bot, mediator, combat_manager, match_up_tracker)
+
+    def load(self, frame: RecordedFrame) -> None:
+        own: list[FakeUnit] = self._fake_units(frame.own, self.bot.actions)
+        enemy: list[FakeUnit] = self._fake_units(frame.enemy)
+        structures: np.ndarray = is_structure(frame.enemy["type_id"])
+        tag_to_unit: dict[int, FakeUnit] = {u.tag: u for u in own}
+        squads: list[FakeSquad] = [
+            FakeSquad(
+                squad.squad_id,
+                [
+                    tag_to_unit[tag]
+                    for tag in squad.member_tags.tolist()
+                    if tag in tag_to_unit
+                ],
+                Point2(squad.position),
+                squad.main_squad,
+            )
+            for squad in frame.squads
+        ]
+
+        self.bot.time = frame.time
+        self.bot.race = frame.race
+        self.bot.enemy_race = frame.enemy_race
+        self.bot.actions.clear()
+        self.bot.units = FakeUnits(own)
+        self.bot.all_enemy_units = FakeUnits(enemy)
+        self.bot.enemy_units = FakeUnits(u for u, s in zip(enemy, structures) if not s)
+        self.bot.enemy_structures = FakeUnits(u for u, s in zip(enemy, structures) if s)
+        self.bot.unit_tag_dict = {u.tag: u for u in own + enemy}
+        self.mediator.load_frame(own, enemy, squads, frame.grids)
+        self.match_up_tracker.active_match_up = frame.match_up_active or None
+
+    def _fake_units(
+        self, columns: dict[str, np.ndarray], actions: Optional[list] = None
+    ) -> list[FakeUnit]:
+        units: list[FakeUnit] = []
+        for i, tag in enumerate(columns["tag"].tolist()):
+            if not (unit := self._units.get(tag)):
+                unit = FakeUnit(tag, UnitTypeId.NOTAUNIT, Point2((0.0, 0.0)))
+                self._units[tag] = unit
+            unit.type_id = UnitTypeId(int(columns["type_id"][i]))
+            unit.position = Point2((float(columns["x"][i]), float(columns["y"][i])))
+            for name in FLOAT_COLUMNS:
+                setattr(unit, name, float(columns[name][i]))
+            for name in INT_COLUMNS:
+                setattr(unit, name, int(columns[name][i]))
+            for name in FLAG_COLUMNS:
+                setattr(unit, name, bool(columns[name][i]))
+            unit.actions = actions
+            units.append(unit)
+        return units
+
+
+def _action_key(action: tuple) -> tuple:
+    """Hashable summary of an issued command, targets reduced to tag / point."""
+    ability, tag, target = action
+    if isinstance(target, FakeUnit):
+        target = target.tag
+    elif target is not None:
+        target = (round(target[0], 2), round(target[1], 2))
+    return ability.value, tag, target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("recording", help="directory written by GameRecorder")
+    args = parser.parse_args()
+
+    player: Player = Player.create()
+    digest = hashlib.sha256()
+    latencies: list[float] = []
+    for frame in read_recording(args.recording):
+        player.load(frame)
+        start: float = time.perf_counter()
+        player.combat_manager.execute()
+        latencies.append(time.perf_counter() - start)
+        digest.update(
+            repr(
+                (
+                    frame.game_loop,
+                    player.bot.behaviors_registered,
+                    [_action_key(action) for action in player.bot.actions],
+                )
+            ).encode()
+        )
+
+    ms: np.ndarray = np.array(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    print(
+        f"{len(ms)} frames, p50 {p50:.3f}ms, p95 {p95:.3f}ms, p99 {p99:.3f}ms, "
+        f"max {ms.max():.3f}ms, total {ms.sum() / 1000:.2f}s"
+    )
+    print(f"decision digest {digest.hexdigest()[:16]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per own unit proximity lookups: scanning every enemy (the old behaviour
+of the retreat melee check and `_use_aoe_ability`) against
+`EnemySpatialHash` radius queries.
+"""
+import random
+import time
+from math import sqrt
+
+from cython_extensions.geometry import cy_distance_to_squared
+from sc2.position import Point2
+
+from benchmarks.fakes import FakeUnit, make_army
+from bot.combat_squads.spatial_hash import EnemySpatialHash
+from bot.combat_squads.unit_snapshot import UnitArrays
+
+# (name, radius) pairs matching the call sites
+QUERIES: list[tuple[str, float]] = [
+    ("retreat close ground", sqrt(10.0)),
+    ("aoe range", sqrt(9.0 + 8.0**2)),
+]
+
+
+def brute_force(own: list[FakeUnit], enemy: list[FakeUnit], radius: float) -> int:
+    radius_sq: float = radius**2
+    found: int = 0
+    for unit in own:
+        found += len(
+            [
+                e
+                for e in enemy
+                if not e.is_flying
+                and cy_distance_to_squared(unit.position, e.position) <= radius_sq
+            ]
+        )
+    return found
+
+
+def hashed(own: list[FakeUnit], enemy: list[FakeUnit], radius: float) -> int:
+    enemy_hash: EnemySpatialHash = EnemySpatialHash.build(UnitArrays.from_units(enemy))
+    found: int = 0
+    for unit in own:
+        found += enemy_hash.query(unit.position, radius, enemy_hash.ground).size
+    return found
+
+
+def main() -> None:
+    repeats: int = 5
+    for army_size in (20, 50, 100, 200):
+        rng: random.Random = random.Random(army_size)
+        own: list[FakeUnit] = make_army(army_size, Point2((94.0, 100.0)), 0, rng)
+        enemy: list[FakeUnit] = make_army(
+            army_size, Point2((106.0, 100.0)), 10_000, rng
+        )
+        for name, radius in QUERIES:
+            assert brute_force(own, enemy, radius) == hashed(own, enemy, radius)
+            timings: list[float] = []
+            for fn in (brute_force, hashed):
+                start: float = time.perf_counter()
+                for _ in range(repeats):
+                    fn(own, enemy, radius)
+                timings.append((time.perf_counter() - start) / repeats * 1e3)
+            print(
+                f"{army_size} vs {army_size} {name}: brute force "
+                f"{timings[0]:.2f}ms, hashed {timings[1]:.2f}ms "
+                f"({timings[0] / timings[1]:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
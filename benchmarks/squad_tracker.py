@@ -0,0 +1,142 @@
+"""
+Compare the old string keyed `dict[str, dict]` squad tracker against the
+slotted `SquadTracker`, and show how tracker size grows over a simulated
+10 round match with and without evicting squads that disappeared.
+"""
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable
+
+from ares.consts import EngagementResult
+
+from bot.combat_squads.consts import EngagementPhase
+from bot.combat_squads.squad_tracker import SquadState, SquadTracker
+
+NUM_SQUADS: int = 8
+# squads are recreated with fresh ids whenever they split, merge or die
+SQUAD_CHURN_PER_STEP: float = 0.02
+STEPS_PER_ROUND: int = 2000
+
+
+def dict_state() -> dict:
+    return {
+        "combat_object": None,
+        "phase": EngagementPhase.Moving,
+        "time_phase_transition": 0.0,
+        "engagement_result": EngagementResult.LOSS_EMPHATIC,
+        "stutter_forward": False,
+        "time_stutter_set": 0.0,
+        "engaging": False,
+        "time_engagement_switched": 0.0,
+        "small_engagement": False,
+        "main_fight_engage": False,
+    }
+
+
+def slotted_state() -> SquadState:
+    return SquadState(None, EngagementPhase.Moving, 0.0)
+
+
+def dict_frame(tracker: dict[str, dict], squad_ids: list[str], t: float) -> None:
+    # mirrors the reads / writes done per squad by `CombatSquadsController`
+    for squad_id in squad_ids:
+        info: dict = tracker[squad_id]
+        if info["phase"] == EngagementPhase.Engaging and not info["engaging"]:
+            info["time_engagement_switched"] = t
+        if t - info["time_stutter_set"] > 1.0:
+            tracker[squad_id]["stutter_forward"] = not info["stutter_forward"]
+            tracker[squad_id]["time_stutter_set"] = t
+        if info["main_fight_engage"] or tracker[squad_id]["engaging"]:
+            tracker[squad_id]["time_phase_transition"] = t
+        tracker[squad_id]["engagement_result"] = info["engagement_result"]
+
+
+def slotted_frame(tracker: SquadTracker, squad_ids: list[str], t: float) -> None:
+    for squad_id in squad_ids:
+        info: SquadState = tracker[squad_id]
+        if info.phase == EngagementPhase.Engaging and not info.engaging:
+            info.time_engagement_switched = t
+        if t - info.time_stutter_set > 1.0:
+            tracker[squad_id].stutter_forward = not info.stutter_forward
+            tracker[squad_id].time_stutter_set = t
+        if info.main_fight_engage or tracker[squad_id].engaging:
+            tracker[squad_id].time_phase_transition = t
+        tracker[squad_id].engagement_result = info.engagement_result
+
+
+def time_access(
+    frame: Callable[[Any, list[str], float], None], tracker: Any, frames: int
+) -> float:
+    squad_ids: list[str] = list(tracker)
+    start: float = time.perf_counter()
+    for i in range(frames):
+        frame(tracker, squad_ids, i * 0.0446)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def simulate_match(evict: bool, num_rounds: int = 10) -> tuple[int, float]:
+    """Returns final tracker length and traced KiB used by the tracker."""
+
+    class _Squad:
+        __slots__ = ("squad_id",)
+
+        def __init__(self):
+            self.squad_id = uuid.uuid4().hex
+
+    tracemalloc.start()
+    tracker: SquadTracker = SquadTracker()
+    step: int = 0
+    for _ in range(num_rounds):
+        # every round starts with brand-new squads
+        squads: list[_Squad] = [_Squad() for _ in range(NUM_SQUADS)]
+        for _ in range(STEPS_PER_ROUND):
+            step += 1
+            if step % int(1 / SQUAD_CHURN_PER_STEP) == 0:
+                squads[step % NUM_SQUADS] = _Squad()
+            if evict:
+                tracker.evict_missing(squads)
+            for squad in squads:
+                if squad.squad_id not in tracker:
+                    tracker[squad.squad_id] = slotted_state()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tracker), current / 1024
+
+
+def main() -> None:
+    frames: int = 20_000
+    squad_ids: list[str] = [uuid.uuid4().hex for _ in range(NUM_SQUADS)]
+
+    dict_tracker: dict[str, dict] = {_id: dict_state() for _id in squad_ids}
+    slotted: SquadTracker = SquadTracker()
+    for _id in squad_ids:
+        slotted[_id] = slotted_state()
+
+    dict_us: float = time_access(dict_frame, dict_tracker, frames)
+    slotted_us: float = time_access(slotted_frame, slotted, frames)
+    print(
+        f"{NUM_SQUADS} squads per frame: dict {dict_us:.2f}us, "
+        f"slotted {slotted_us:.2f}us ({dict_us / slotted_us:.2f}x)"
+    )
+
+    tracemalloc.start()
+    _ = [dict_state() for _ in range(1000)]
+    dict_kib: float = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    tracemalloc.start()
+    _ = [slotted_state() for _ in range(1000)]
+    slotted_kib: float = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    print(f"1000 states: dict {dict_kib:.1f}KiB, slotted {slotted_kib:.1f}KiB")
+
+    for evict in (False, True):
+        size, kib = simulate_match(evict)
+        print(
+            f"10 round match, evict={evict}: {size} tracked squads, "
+            f"{kib:.1f}KiB traced"
+        )
+
+
+if __name__ == "__main__":
+    main()
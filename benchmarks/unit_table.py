@@ -0,0 +1,81 @@
+"""
+Compare nested `UNIT_DATA` dict lookups against the array indexed
+`bot.unit_table` for the per unit loops used by the bot.
+"""
+import random
+import timeit
+
+from ares.consts import ALL_STRUCTURES
+from ares.dicts.unit_data import UNIT_DATA
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+from benchmarks.fakes import FakeUnit
+from bot.unit_table import (
+    is_flying,
+    is_structure,
+    supply,
+    type_ids_of,
+    unit_value,
+)
+
+ARMY_TYPES: list[UnitTypeId] = [
+    UnitTypeId.MARINE,
+    UnitTypeId.MARAUDER,
+    UnitTypeId.MEDIVAC,
+    UnitTypeId.SIEGETANK,
+    UnitTypeId.VIKINGFIGHTER,
+    UnitTypeId.ZERGLING,
+    UnitTypeId.BANELING,
+    UnitTypeId.MUTALISK,
+    UnitTypeId.STALKER,
+    UnitTypeId.COLOSSUS,
+]
+
+
+def dict_path(units: list[FakeUnit]) -> tuple[float, list[bool], float]:
+    total_supply: float = sum(
+        [
+            UNIT_DATA[u.type_id]["supply"]
+            for u in units
+            if u.type_id not in ALL_STRUCTURES
+        ]
+    )
+    flying: list[bool] = [UNIT_DATA[u.type_id]["flying"] for u in units]
+    max_value: float = 0.0
+    for u in units:
+        value: float = (
+            UNIT_DATA[u.type_id]["minerals"] * 0.5 + UNIT_DATA[u.type_id]["gas"]
+        )
+        if value > max_value:
+            max_value = value
+    return total_supply, flying, max_value
+
+
+def table_path(units: list[FakeUnit]) -> tuple[float, list[bool], float]:
+    type_ids = type_ids_of(units)
+    total_supply: float = float(supply(type_ids)[~is_structure(type_ids)].sum())
+    flying: list[bool] = is_flying(type_ids).tolist()
+    max_value: float = float(unit_value(type_ids, 0.5).max())
+    return total_supply, flying, max_value
+
+
+def main() -> None:
+    rng = random.Random(0)
+    for num_units in (10, 50, 200, 400):
+        units: list[FakeUnit] = [
+            FakeUnit(i, rng.choice(ARMY_TYPES), Point2((0.0, 0.0)))
+            for i in range(num_units)
+        ]
+        assert dict_path(units) == table_path(units)
+        number: int = 2000
+        dict_time: float = timeit.timeit(lambda: dict_path(units), number=number)
+        table_time: float = timeit.timeit(lambda: table_path(units), number=number)
+        print(
+            f"{num_units} units: dict {dict_time / number * 1e6:.1f}us, "
+            f"table {table_time / number * 1e6:.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
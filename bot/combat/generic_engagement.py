@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy as np
 from ares import ManagerMediator
@@ -20,6 +20,8 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.enemy_view import EnemyView
+
 if TYPE_CHECKING:
     from ares import AresBot
 
@@ -41,12 +43,17 @@ class GenericEngagement(CombatIndividualBehavior):
     use_blink : bool
         Use blink if available?
         default = True
+    enemy_view : Optional[EnemyView]
+        View over `nearby_targets` shared with other behaviors this frame,
+        saves splitting out structures and tanks again for every unit.
+        default = None
     """
 
     unit: Unit
     nearby_targets: Union[Units, list[Unit]]
     stutter_forward: bool
     use_blink: bool = True
+    enemy_view: Optional[EnemyView] = None
 
     def execute(
         self, ai: "AresBot", config: dict, mediator: ManagerMediator, **kwargs
@@ -72,12 +79,20 @@ class GenericEngagement(CombatIndividualBehavior):
 
         unit = self.unit
         nearby_targets = self.nearby_targets
-        if non_structures := [
-            u for u in nearby_targets if u.type_id not in ALL_STRUCTURES
-        ]:
-            if tanks := [
+        if self.enemy_view:
+            non_structures: list[Unit] = self.enemy_view.select(
+                self.enemy_view.non_structures
+            )
+            tanks: list[Unit] = self.enemy_view.select(self.enemy_view.sieged_tanks)
+        else:
+            non_structures: list[Unit] = [
+                u for u in nearby_targets if u.type_id not in ALL_STRUCTURES
+            ]
+            tanks: list[Unit] = [
                 u for u in non_structures if u.type_id == UnitID.SIEGETANKSIEGED
-            ]:
+            ]
+        if non_structures:
+            if tanks:
                 enemy_target: Unit = cy_closest_to(unit.position, tanks)
             else:
                 enemy_target: Unit = cy_closest_to(unit.position, non_structures)
@@ -1,19 +1,51 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 from sc2.data import Race
 
 from ares import ManagerMediator
 from ares.behaviors.combat.individual import AttackTarget
 from ares.cache import property_cache_once_per_frame
 from ares.consts import UnitRole
-from cython_extensions import cy_closest_to
-from cython_extensions.units_utils import cy_find_units_center_mass
+from ares.dicts.aoe_ability_to_range import AOE_ABILITY_SPELLS_INFO
+from cython_extensions import cy_closest_to, cy_towards
+from cython_extensions.geometry import cy_distance_to_squared
+from cython_extensions.units_utils import cy_center, cy_find_units_center_mass
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.unit_typeid import UnitTypeId as UnitID
 from sc2.position import Point2
+from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.aoe_targeting import AOETargeting
+from bot.combat_squads.change_tracking import SkipStats
+from bot.combat_squads.command_batcher import CommandBatcher, CommandStats
+from bot.combat_squads.fight_cache import FightResultCache
+from bot.combat_squads.formation import (
+    MAX_OPTIMAL_ASSIGNMENT,
+    assign_slots,
+    concave_points,
+)
+from bot.combat_squads.frame_context import FrameContext
 from bot.combat_squads.main import CombatSquadsController
+from bot.combat_squads.scheduler import SquadScheduler
+from bot.combat_squads.sim_queue import AsyncFightEvaluator, FightSimQueue
+from bot.combat_squads.spatial_hash import EnemySpatialHash
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot
+from bot.consts import (
+    ASYNC,
+    COMMAND_BATCHING,
+    DEADLINE,
+    ENABLED,
+    FIGHT_SIM_QUEUE,
+    MAX_DEFERRED_STEPS,
+    MAX_RESULT_AGE,
+    MODE,
+    ROUND_ROBIN_STEPS,
+    SQUAD_SCHEDULER,
+    STEP_BUDGET,
+)
+from bot.frame_profiler import FrameProfiler
 from bot.match_up_tracker import MatchUpTracker
 
 if TYPE_CHECKING:
@@ -35,6 +67,8 @@ class CombatManager:
         Dictionary with the data from the configuration file
     mediator : ManagerMediator
         Used for getting information from managers in Ares.
+    profiler : FrameProfiler
+        Times the stages of combat execution.
     """
 
     def __init__(
@@ -43,19 +77,104 @@ class CombatManager:
         config: dict,
         mediator: ManagerMediator,
         match_up_tracker: MatchUpTracker,
+        profiler: FrameProfiler,
     ):
         self.ai: "AresBot" = ai
         self.config: dict = config
         self.mediator: ManagerMediator = mediator
         self.match_up_tracker: MatchUpTracker = match_up_tracker
+        self.profiler: FrameProfiler = profiler
+        self.sim_queue: Optional[FightSimQueue] = None
+        sim_queue_config: dict = self.config.get(FIGHT_SIM_QUEUE, {})
+        if sim_queue_config.get(ENABLED, False):
+            if sim_queue_config.get(MODE) == ASYNC:
+                self.sim_queue = AsyncFightEvaluator(
+                    self.mediator,
+                    max_result_age=sim_queue_config.get(MAX_RESULT_AGE, 24),
+                )
+            else:
+                self.sim_queue = FightSimQueue(
+                    self.mediator, deadline=sim_queue_config.get(DEADLINE, 0.004)
+                )
+        self.scheduler: Optional[SquadScheduler] = None
+        scheduler_config: dict = self.config.get(SQUAD_SCHEDULER, {})
+        if scheduler_config.get(ENABLED, False):
+            self.scheduler = SquadScheduler(
+                round_robin_steps=scheduler_config.get(ROUND_ROBIN_STEPS, 3),
+                step_budget=scheduler_config.get(STEP_BUDGET, 0.01),
+                max_deferred_steps=scheduler_config.get(MAX_DEFERRED_STEPS, 6),
+            )
         self._combat_squad_controller: CombatSquadsController = CombatSquadsController(
-            self.ai, self.mediator, UnitRole.ATTACKING
+            self.ai,
+            self.mediator,
+            UnitRole.ATTACKING,
+            profiler=self.profiler,
+            sim_queue=self.sim_queue,
+            scheduler=self.scheduler,
+            commands=CommandBatcher(
+                self.ai,
+                combine=self.config.get(COMMAND_BATCHING, {}).get(ENABLED, False),
+            ),
+            on_engagement_decision=self.match_up_tracker.record_engagement_decision,
         )
 
         self._transfused_tags: set[int] = set()
-        self._unit_tag_to_bane_tag: dict = dict()
+        # incremental bane assignment, kept up to date from unit events
+        self._unit_tag_to_bane_tag: dict[int, int] = dict()
+        self._bane_tag_to_unit_tag: dict[int, int] = dict()
+        # light units not yet assigned to a bane
+        self._free_unit_tags: set[int] = set()
         self._squad_engagement_phase: dict[str, dict] = dict()
 
+    @property
+    def fight_cache(self) -> FightResultCache:
+        return self._combat_squad_controller.fight_cache
+
+    @property
+    def skip_stats(self) -> SkipStats:
+        return self._combat_squad_controller.skip_stats
+
+    @property
+    def command_stats(self) -> CommandStats:
+        return self._combat_squad_controller.commands.stats
+
+    def warm_up(self) -> None:
+        """
+        Exercise the combat code paths once on the first step with attacking
+        units, plus synthetic formations, so lazy imports, cython first
+        calls, numpy setup and ares' combat sim don't land on the first
+        fight.
+
+        Micro maps usually start with no enemy in vision, our own units
+        then stand in for the enemy.
+
+        There are no buffers to preallocate, every array the squad code
+        uses is sized by that frame's units and allocated per frame, the
+        unit type tables in `bot.unit_table` are built on import.
+        """
+        enemy: Units = self.ai.all_enemy_units or self.ai.units
+        snapshot: SquadStateSnapshot = SquadStateSnapshot.build(self.ai.units, enemy)
+        frame: FrameContext = FrameContext.build(self.mediator, UnitRole.ATTACKING)
+        aoe_targeting: AOETargeting = AOETargeting(
+            EnemySpatialHash.build(snapshot.enemy)
+        )
+        for spell_info in AOE_ABILITY_SPELLS_INFO.values():
+            aoe_targeting.density_map(spell_info["radius"])
+            aoe_targeting.density_map(spell_info["radius"], emp=True)
+        self._combat_squad_controller.warm_up(snapshot, frame)
+
+        map_center: Point2 = self.ai.game_info.map_center
+        target: Point2 = Point2(cy_towards(map_center, self.ai.start_location, 10.0))
+        rng: np.random.Generator = np.random.default_rng(0)
+        # both the optimal and greedy assignment
+        for num_units in (2, MAX_OPTIMAL_ASSIGNMENT + 1):
+            slots: np.ndarray = concave_points(num_units, map_center, target)
+            assign_slots(rng.normal(map_center, 3.0, (num_units, 2)), slots)
+
+        cy_center(self.ai.units)
+        cy_find_units_center_mass(self.ai.units, 14.0)
+        cy_distance_to_squared(map_center, target)
+
     @property_cache_once_per_frame
     def attack_target(self) -> Point2:
         _attack_target: Point2 = self.ai.game_info.map_center
@@ -78,37 +197,87 @@ class CombatManager:
             return
 
         if self.ai.race == Race.Zerg:
-            self._assign_units_to_banes(self.ai.enemy_units)
+            with self.profiler.stage("bane_assignment"):
+                self._assign_units_to_banes(self.ai.enemy_units)
+        # unit arrays shared by all squads this frame
+        with self.profiler.stage("snapshot"):
+            snapshot: SquadStateSnapshot = SquadStateSnapshot.build(
+                self.ai.units, self.ai.all_enemy_units
+            )
+            enemy_hash: EnemySpatialHash = EnemySpatialHash.build(snapshot.enemy)
+            frame: FrameContext = FrameContext.build(self.mediator, UnitRole.ATTACKING)
         self._combat_squad_controller.execute(
-            self.attack_target, self._unit_tag_to_bane_tag
+            self.attack_target,
+            self._unit_tag_to_bane_tag,
+            snapshot,
+            frame,
+            enemy_hash,
+            AOETargeting(enemy_hash),
         )
 
-        for unit in self.ai.units:
-            if unit.tag in self._unit_tag_to_bane_tag:
-                bane_tag: int = self._unit_tag_to_bane_tag[unit.tag]
-                if bane := self.ai.unit_tag_dict.get(bane_tag):
+        with self.profiler.stage("behavior_registration"):
+            for unit_tag, bane_tag in self._unit_tag_to_bane_tag.items():
+                if (unit := self.ai.unit_tag_dict.get(unit_tag)) and (
+                    bane := self.ai.unit_tag_dict.get(bane_tag)
+                ):
                     self.ai.register_behavior(AttackTarget(unit, bane))
 
+    def on_unit_created(self, unit: Unit) -> None:
+        if self._eligible_for_bane(unit):
+            self._free_unit_tags.add(unit.tag)
+
+    def on_unit_destroyed(self, unit_tag: int) -> None:
+        self._free_unit_tags.discard(unit_tag)
+        # our unit died, its bane needs a new unit
+        if (bane_tag := self._unit_tag_to_bane_tag.pop(unit_tag, None)) is not None:
+            del self._bane_tag_to_unit_tag[bane_tag]
+        # bane died, release the unit chasing it
+        elif (tag := self._bane_tag_to_unit_tag.pop(unit_tag, None)) is not None:
+            del self._unit_tag_to_bane_tag[tag]
+            self._free_unit_tags.add(tag)
+
+    def on_unit_type_changed(self, unit: Unit) -> None:
+        if self._eligible_for_bane(unit):
+            if unit.tag not in self._unit_tag_to_bane_tag:
+                self._free_unit_tags.add(unit.tag)
+        else:
+            self._free_unit_tags.discard(unit.tag)
+            if (bane_tag := self._unit_tag_to_bane_tag.pop(unit.tag, None)) is not None:
+                del self._bane_tag_to_unit_tag[bane_tag]
+
+    @staticmethod
+    def _eligible_for_bane(unit: Unit) -> bool:
+        return unit.type_id != UnitTypeId.BANELING and unit.is_light
+
     def _assign_units_to_banes(self, all_close_enemy: Units) -> None:
-        if not self.ai.units:
+        if not self._free_unit_tags:
             return
-        banes: Units = all_close_enemy(UnitID.BANELING)
-
-        for bane in banes:
-            assigned_bane_tags: set[int] = set(self._unit_tag_to_bane_tag.values())
-            if bane.tag not in assigned_bane_tags:
-                for unit in self.ai.units:
-                    if (
-                        unit.type_id != UnitTypeId.BANELING
-                        and unit.is_light
-                        and unit.tag not in self._unit_tag_to_bane_tag
-                    ):
-                        self._unit_tag_to_bane_tag[unit.tag] = bane.tag
-                        break
-        to_remove: list[int] = []
-        for unit_tag in self._unit_tag_to_bane_tag:
-            if not self.ai.unit_tag_dict.get(unit_tag):
-                to_remove.append(unit_tag)
-
-        for tag in to_remove:
-            del self._unit_tag_to_bane_tag[tag]
+        unassigned_banes: list[Unit] = [
+            bane
+            for bane in all_close_enemy(UnitID.BANELING)
+            if bane.tag not in self._bane_tag_to_unit_tag
+        ]
+        if not unassigned_banes:
+            return
+
+        free_units: list[Unit] = []
+        for tag in list(self._free_unit_tags):
+            if unit := self.ai.unit_tag_dict.get(tag):
+                free_units.append(unit)
+            else:
+                self._free_unit_tags.discard(tag)
+        if not free_units:
+            return
+
+        # nearest free unit for each bane, taken units are masked out
+        positions: np.ndarray = np.array([u.position for u in free_units])
+        available: np.ndarray = np.ones(len(free_units), dtype=bool)
+        for bane in unassigned_banes[: len(free_units)]:
+            distances: np.ndarray = np.sum((positions - bane.position) ** 2, axis=1)
+            distances[~available] = np.inf
+            index: int = int(np.argmin(distances))
+            available[index] = False
+            unit_tag: int = free_units[index].tag
+            self._free_unit_tags.discard(unit_tag)
+            self._unit_tag_to_bane_tag[unit_tag] = bane.tag
+            self._bane_tag_to_unit_tag[bane.tag] = unit_tag
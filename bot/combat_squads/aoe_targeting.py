@@ -0,0 +1,210 @@
+from dataclasses import dataclass, field
+from math import ceil, sqrt
+from typing import Optional
+
+import numpy as np
+from ares.dicts.aoe_ability_to_range import AOE_ABILITY_SPELLS_INFO
+from sc2.dicts.unit_abilities import UNIT_ABILITIES
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from bot.combat_squads.spatial_hash import EnemySpatialHash
+from bot.combat_squads.unit_snapshot import UnitArrays
+
+ALL_AOE_ABILITIES: tuple[AbilityId, ...] = tuple(AOE_ABILITY_SPELLS_INFO)
+# AOE abilities each unit type could ever cast, in `AOE_ABILITY_SPELLS_INFO`
+# order. Types python-sc2 has no ability data for fall back to every spell.
+AOE_ABILITIES_BY_TYPE: dict[UnitID, tuple[AbilityId, ...]] = {
+    type_id: tuple(a for a in ALL_AOE_ABILITIES if a in abilities)
+    for type_id, abilities in UNIT_ABILITIES.items()
+}
+# a cell centre is at most this far from any point in the cell
+HALF_CELL_DIAGONAL: float = sqrt(0.5)
+# EMP is only worth it on targets with shields or energy to drain
+EMP_MIN_SHIELD_OR_ENERGY: float = 48.0
+
+
+def aoe_abilities_for(type_id: UnitID) -> tuple[AbilityId, ...]:
+    return AOE_ABILITIES_BY_TYPE.get(type_id, ALL_AOE_ABILITIES)
+
+
+@dataclass
+class DensityMap:
+    """
+    Enemy count within `radius` of every 1x1 cell centre in a window
+    around the enemy, counts are an upper bound so a cell is never
+    wrongly rejected.
+
+    Local maxima ("peaks") are extracted once, so most casters only
+    compare their position against a handful of cluster centres.
+    """
+
+    density: np.ndarray
+    origin: np.ndarray
+    max_density: int
+    peak_centres: np.ndarray
+    peak_density: np.ndarray
+
+    @classmethod
+    def from_density(cls, density: np.ndarray, origin: np.ndarray) -> "DensityMap":
+        # a peak is a non empty cell no smaller than any of its neighbours
+        padded: np.ndarray = np.pad(density, 1)
+        width, height = density.shape
+        neighbourhood_max: np.ndarray = density.copy()
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                np.maximum(
+                    neighbourhood_max,
+                    padded[dx : dx + width, dy : dy + height],
+                    out=neighbourhood_max,
+                )
+        peaks: np.ndarray = np.argwhere((density > 0) & (density == neighbourhood_max))
+        return cls(
+            density=density,
+            origin=origin,
+            max_density=int(density.max()),
+            peak_centres=origin + peaks + 0.5,
+            peak_density=density[peaks[:, 0], peaks[:, 1]],
+        )
+
+    def best_peak(self, position: Point2, reach: float) -> int:
+        """Index of the densest peak within `reach`, or -1 if there is none."""
+        offsets: np.ndarray = self.peak_centres - (position[0], position[1])
+        in_reach: np.ndarray = np.einsum("ij,ij->i", offsets, offsets) <= reach**2
+        if not in_reach.any():
+            return -1
+        return int(np.argmax(np.where(in_reach, self.peak_density, -1)))
+
+    def best_centre(self, position: Point2, reach: float) -> tuple[int, Point2]:
+        """Highest density cell whose centre is within `reach` of `position`."""
+        x: float = position[0] - self.origin[0]
+        y: float = position[1] - self.origin[1]
+        min_x: int = max(int(x - reach), 0)
+        max_x: int = min(int(x + reach) + 1, self.density.shape[0])
+        min_y: int = max(int(y - reach), 0)
+        max_y: int = min(int(y + reach) + 1, self.density.shape[1])
+        if min_x >= max_x or min_y >= max_y:
+            return 0, position
+
+        window: np.ndarray = self.density[min_x:max_x, min_y:max_y]
+        xs: np.ndarray = np.arange(min_x, max_x) + 0.5 - x
+        ys: np.ndarray = np.arange(min_y, max_y) + 0.5 - y
+        in_reach: np.ndarray = xs[:, None] ** 2 + ys[None, :] ** 2 <= reach**2
+        candidates: np.ndarray = np.where(in_reach, window, 0)
+        best: int = int(np.argmax(candidates))
+        best_x, best_y = np.unravel_index(best, candidates.shape)
+        return int(candidates[best_x, best_y]), Point2(
+            (
+                self.origin[0] + min_x + best_x + 0.5,
+                self.origin[1] + min_y + best_y + 0.5,
+            )
+        )
+
+
+@dataclass
+class AOETargeting:
+    """
+    Per frame AOE target selection shared by every caster.
+
+    Density maps are built lazily, once per frame for each spell radius,
+    so picking where to storm / EMP / bile / KD8 for a caster is a window
+    lookup rather than re-filtering the enemy list per ability per unit.
+
+    Attributes
+    ----------
+    enemy_hash : EnemySpatialHash
+        Spatial hash over this frame's enemy.
+    """
+
+    enemy_hash: EnemySpatialHash
+    _density_maps: dict[tuple[float, bool], DensityMap] = field(default_factory=dict)
+    _emp_mask: Optional[np.ndarray] = None
+    _targets: dict[tuple[AbilityId, Point2], list[Unit]] = field(default_factory=dict)
+
+    def density_map(self, radius: float, emp: bool = False) -> DensityMap:
+        key: tuple[float, bool] = (radius, emp)
+        if key not in self._density_maps:
+            self._density_maps[key] = self._build_density_map(radius, emp)
+        return self._density_maps[key]
+
+    def emp_mask(self) -> np.ndarray:
+        if self._emp_mask is None:
+            arrays: UnitArrays = self.enemy_hash.arrays
+            self._emp_mask = (arrays.shield > EMP_MIN_SHIELD_OR_ENERGY) | (
+                arrays.energy > EMP_MIN_SHIELD_OR_ENERGY
+            )
+        return self._emp_mask
+
+    def best_target(
+        self, unit: Unit, ability: AbilityId, min_targets: int
+    ) -> tuple[int, Point2, list[Unit]]:
+        """
+        Best cluster for `ability` cast by `unit`, returns an upper bound
+        on enemy hit, the cluster centre and the enemy around it.
+
+        Casters are rejected without any lookup when no cluster anywhere
+        reaches `min_targets`, which is most frames.
+        """
+        spell_info: dict = AOE_ABILITY_SPELLS_INFO[ability]
+        radius: float = spell_info["radius"]
+        emp: bool = ability == AbilityId.EMP_EMP
+        density_map: DensityMap = self.density_map(radius, emp)
+        if density_map.max_density < min_targets:
+            return 0, unit.position, []
+
+        reach: float = sqrt(9.0 + spell_info["range"] ** 2)
+        peak: int = density_map.best_peak(unit.position, reach)
+        if peak != -1 and density_map.peak_density[peak] >= min_targets:
+            count: int = int(density_map.peak_density[peak])
+            centre: Point2 = Point2(density_map.peak_centres[peak])
+        else:
+            # cluster centres are out of reach, the edge of one may not be
+            count, centre = density_map.best_centre(unit.position, reach)
+            if count < min_targets:
+                return count, centre, []
+
+        # casters in the same squad usually pick the same cluster
+        key: tuple[AbilityId, Point2] = (ability, centre)
+        if key not in self._targets:
+            # let `UseAOEAbility` refine the exact spot around this cluster
+            self._targets[key] = self.enemy_hash.units_in_range(
+                centre,
+                2 * radius + HALF_CELL_DIAGONAL,
+                self.emp_mask() if emp else None,
+            )
+        return count, centre, self._targets[key]
+
+    def _build_density_map(self, radius: float, emp: bool) -> DensityMap:
+        arrays: UnitArrays = self.enemy_hash.arrays
+        indices: np.ndarray = self.enemy_hash.indexed
+        if emp:
+            indices = indices[self.emp_mask()[indices]]
+        positions: np.ndarray = arrays.positions[indices]
+        if positions.shape[0] == 0:
+            return DensityMap.from_density(
+                np.zeros((1, 1), dtype=np.int32), np.zeros(2)
+            )
+
+        kernel_radius: float = radius + HALF_CELL_DIAGONAL
+        pad: int = ceil(kernel_radius)
+        origin: np.ndarray = np.floor(positions.min(axis=0)) - pad
+        cells: np.ndarray = (positions - origin).astype(np.intp)
+        shape: tuple[int, int] = tuple(cells.max(axis=0) + pad + 1)
+
+        counts: np.ndarray = np.zeros(shape, dtype=np.int32)
+        np.add.at(counts, (cells[:, 0], cells[:, 1]), 1)
+
+        # sum shifted copies of the count grid over a disc shaped kernel
+        padded: np.ndarray = np.pad(counts, pad)
+        density: np.ndarray = np.zeros(shape, dtype=np.int32)
+        width, height = shape
+        for dx in range(-pad, pad + 1):
+            for dy in range(-pad, pad + 1):
+                if dx * dx + dy * dy > kernel_radius**2:
+                    continue
+                density += padded[
+                    pad + dx : pad + dx + width, pad + dy : pad + dy + height
+                ]
+        return DensityMap.from_density(density, origin)
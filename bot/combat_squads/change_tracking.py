@@ -0,0 +1,88 @@
+"""
+Per squad change detection.
+
+Most frames most squads have the same members and the same enemy around
+them. Work that only depends on those (stutter forward, the combat sim)
+is skipped for such squads and the previous result reused, commands are
+still issued every frame.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Union
+
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat_squads.fight_cache import FightSignature
+
+
+def unit_set_key(units: Union[Units, list[Unit]]) -> int:
+    """
+    Order independent hash of the units in `units`. Type ids are part of
+    the key, so a unit that morphed (sieged tank, burrowed unit) counts
+    as a change, its ranges and combat value differ.
+    """
+    return hash(frozenset([(u.tag, u.type_id) for u in units]))
+
+
+@dataclass(slots=True)
+class SquadChanges:
+    """
+    What changed for a squad since its engagement / stutter forward were
+    last evaluated. The keys are this frame's, whatever re-evaluates
+    stores them on the squad.
+    """
+
+    # the squad or its far enemy differ from when the engagement was last
+    # evaluated, including units moving to another health bucket
+    fight: bool
+    # further than `max_unchanged_movement` from where it was last simmed
+    moved: bool
+    # members or far enemy differ from when stutter forward was last set
+    stutter_forward: bool
+    fight_signature: FightSignature
+    stutter_forward_key: int
+
+    @property
+    def any(self) -> bool:
+        return self.fight or self.moved
+
+
+@dataclass
+class SkipStats:
+    """
+    How often each skippable computation was reused instead of recomputed,
+    and an estimate of the time that saved based on the average cost of
+    a full evaluation.
+    """
+
+    evaluated: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    skipped: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    _evaluation_time: dict[str, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+    def add_evaluated(self, name: str, duration: float) -> None:
+        self.evaluated[name] += 1
+        self._evaluation_time[name] += duration
+
+    def add_skipped(self, name: str) -> None:
+        self.skipped[name] += 1
+
+    def skip_rate(self, name: str) -> float:
+        total: int = self.evaluated[name] + self.skipped[name]
+        return self.skipped[name] / total if total else 0.0
+
+    def time_saved(self, name: str) -> float:
+        """Estimated seconds saved by skipping `name`."""
+        if not self.evaluated[name]:
+            return 0.0
+        average: float = self._evaluation_time[name] / self.evaluated[name]
+        return average * self.skipped[name]
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name} {self.skip_rate(name):.1%} skipped "
+            f"(~{self.time_saved(name) * 1000:.0f}ms saved)"
+            for name in sorted(self.evaluated.keys() | self.skipped.keys())
+        )
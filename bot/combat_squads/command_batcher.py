@@ -0,0 +1,150 @@
+"""
+Per frame command batching.
+
+Squad phases hand their plain orders (move here, use this ability on that)
+to a `CommandBatcher` instead of issuing them unit by unit. At the end of
+the frame units given the same ability and target are sent as a single
+multi unit action, and orders a unit is already carrying out are dropped.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Union
+
+from ares.behaviors.combat.individual import CombatIndividualBehavior
+from ares.managers.manager_mediator import ManagerMediator
+from sc2.ids.ability_id import AbilityId
+from sc2.position import Point2
+from sc2.unit import Unit
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+# a move target closer than this to the current one is the same order
+SAME_TARGET_DISTANCE: float = 0.1
+
+Target = Optional[Union[Point2, Unit]]
+
+
+def _target_key(target: Target) -> Optional[Union[int, tuple[float, float]]]:
+    if target is None:
+        return None
+    if isinstance(target, Unit):
+        return target.tag
+    return target[0], target[1]
+
+
+def is_current_order(unit: Unit, ability: AbilityId, target: Target) -> bool:
+    """Is `unit` already carrying out `ability` on `target` as its first order."""
+    if not unit.orders:
+        return False
+    order = unit.orders[0]
+    if ability not in (order.ability.id, order.ability.exact_id):
+        return False
+    order_target = order.target
+    if target is None or isinstance(target, Unit):
+        return order_target == (target.tag if target else None)
+    if isinstance(order_target, int) or order_target is None:
+        return False
+    dx: float = order_target[0] - target[0]
+    dy: float = order_target[1] - target[1]
+    return dx * dx + dy * dy < SAME_TARGET_DISTANCE**2
+
+
+@dataclass
+class CommandStats:
+    """Orders handed to the batcher against actions actually sent."""
+
+    frames: int = 0
+    # orders squad phases asked for
+    requested: int = 0
+    # orders dropped, the unit was already doing it
+    duplicates: int = 0
+    # actions sent, a multi unit action counts once
+    actions: int = 0
+
+    def per_frame(self, count: int) -> float:
+        return count / self.frames if self.frames else 0.0
+
+    def summary(self) -> str:
+        saved: float = 1.0 - self.actions / self.requested if self.requested else 0.0
+        return (
+            f"{self.per_frame(self.requested):.1f} orders/frame -> "
+            f"{self.per_frame(self.actions):.1f} actions/frame "
+            f"({saved:.1%} fewer, {self.per_frame(self.duplicates):.1f} "
+            f"duplicate orders/frame dropped)"
+        )
+
+
+@dataclass
+class CommandBatcher:
+    """
+    Collect plain orders over a frame and send them grouped by ability and
+    target when `flush` is called.
+
+    Parameters
+    ----------
+    ai : AresBot
+        Bot object the actions are sent through.
+    combine : bool
+        Send units with the same order as one action, when `False` every
+        unit still gets its own action but duplicates are dropped.
+    """
+
+    ai: "AresBot"
+    combine: bool = True
+    stats: CommandStats = field(default_factory=CommandStats)
+    # (ability, target key) -> target, unit tags
+    _groups: dict[tuple, tuple[Target, list[int]]] = field(default_factory=dict)
+    # unit tag -> unit, group key of its order
+    _units: dict[int, tuple[Unit, tuple]] = field(default_factory=dict)
+
+    def order(self, unit: Unit, ability: AbilityId, target: Target = None) -> None:
+        self.stats.requested += 1
+        if unit.tag in self._units:
+            # a later order this frame replaces the earlier one
+            self._groups[self._units.pop(unit.tag)[1]][1].remove(unit.tag)
+        if is_current_order(unit, ability, target):
+            self.stats.duplicates += 1
+            return
+        key: tuple = (ability, _target_key(target))
+        if key not in self._groups:
+            self._groups[key] = (target, [])
+        self._groups[key][1].append(unit.tag)
+        self._units[unit.tag] = unit, key
+
+    def move(self, unit: Unit, target: Point2) -> None:
+        self.order(unit, AbilityId.MOVE_MOVE, target)
+
+    def flush(self) -> None:
+        """Send everything collected this frame."""
+        self.stats.frames += 1
+        for (ability, _), (target, tags) in self._groups.items():
+            if not tags:
+                continue
+            if self.combine and len(tags) > 1:
+                self.ai.give_same_action(
+                    ability, tags, target.tag if isinstance(target, Unit) else target
+                )
+                self.stats.actions += 1
+                continue
+            for tag in tags:
+                self._units[tag][0](ability, target)
+            self.stats.actions += len(tags)
+        self._groups.clear()
+        self._units.clear()
+
+
+@dataclass
+class BatchedOrder(CombatIndividualBehavior):
+    """
+    `CombatManeuver` step handing an order to a `CommandBatcher`, for
+    when the order should only go out if earlier steps did nothing.
+    """
+
+    unit: Unit
+    ability: AbilityId
+    target: Target
+    commands: CommandBatcher
+
+    def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
+        self.commands.order(self.unit, self.ability, self.target)
+        return True
@@ -1,6 +1,42 @@
-# if something shouldn't ever be fodder, it's excluded
+from enum import Enum
+
 from sc2.ids.unit_typeid import UnitTypeId
 
+
+class EngagementPhase(str, Enum):
+    # setup formation, move fodder to front etc
+    SettingUp = "SettingUp"
+    # moving towards target with no enemy around
+    Moving = "Moving"
+    # after moving and enemy is getting near, and we want the fight
+    # should be a very short window to adjust formation
+    PreEngaging = "PreEngaging"
+    # near enemy, time to fight if we decide to
+    Engaging = "Engaging"
+    # move away from enemy
+    # if we manage to move away from any enemy go
+    # back to `SettingUp`
+    Retreating = "Retreating"
+    # TODO
+    # Sieging = "Sieging"
+
+
+GAME_LOOPS_PER_SECOND: float = 22.4
+
+# default radii `CombatSquadsController` groups squads and their enemy with
+SQUAD_RADIUS: float = 9.0
+CLOSE_ENEMY_RADIUS: float = 14.0
+FAR_ENEMY_RADIUS: float = 18.5
+
+COMMON_UNIT_IGNORE_TYPES: set[UnitTypeId] = {
+    UnitTypeId.EGG,
+    UnitTypeId.LARVA,
+    UnitTypeId.OVERSEER,
+    UnitTypeId.OBSERVER,
+}
+
+
+# if something shouldn't ever be fodder, it's excluded
 FODDER_VALUES: dict[UnitTypeId, int] = {
     # zerg
     UnitTypeId.BROODLING: 0,
@@ -0,0 +1,115 @@
+from functools import cached_property
+from typing import Union
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat_squads.unit_snapshot import UnitArrays
+from bot.unit_table import is_structure
+
+# ground range below this counts as melee
+MELEE_RANGE: float = 3.0
+
+
+class EnemyView:
+    """
+    Partitions of one enemy band, as index arrays into the frame's enemy
+    `UnitArrays`.
+
+    Nothing is computed on construction, each partition is worked out the
+    first time it is asked for and reused by every later caller, so a view
+    should be built once per band per frame and shared. Indices keep the
+    order of the units the view was built from.
+
+    Parameters
+    ----------
+    arrays : UnitArrays
+        Enemy snapshot of this frame.
+    units : Union[Units, list[Unit]]
+        Enemy in the band, units missing from `arrays` are dropped.
+    """
+
+    def __init__(self, arrays: UnitArrays, units: Union[Units, list[Unit]]):
+        self.arrays: UnitArrays = arrays
+        self._units: Union[Units, list[Unit]] = units
+
+    @cached_property
+    def indices(self) -> np.ndarray:
+        return self.arrays.indices(self._units)
+
+    @cached_property
+    def ground(self) -> np.ndarray:
+        return self.indices[~self.arrays.flying[self.indices]]
+
+    @cached_property
+    def air(self) -> np.ndarray:
+        return self.indices[self.arrays.flying[self.indices]]
+
+    @cached_property
+    def banelings(self) -> np.ndarray:
+        return self._of_type(UnitID.BANELING)
+
+    @cached_property
+    def melee(self) -> np.ndarray:
+        """Ground enemy with less than `MELEE_RANGE` ground range, not banelings."""
+        ground: np.ndarray = self.ground
+        return ground[
+            (self.arrays.ground_range[ground] < MELEE_RANGE)
+            & (self.arrays.type_ids[ground] != UnitID.BANELING.value)
+        ]
+
+    @cached_property
+    def ranged(self) -> np.ndarray:
+        """Enemy with at least `MELEE_RANGE` ground range."""
+        return self.indices[self.arrays.ground_range[self.indices] >= MELEE_RANGE]
+
+    @cached_property
+    def energy_casters(self) -> np.ndarray:
+        """Enemy with enough energy to be worth a feedback."""
+        return self.indices[self.arrays.energy[self.indices] >= 50]
+
+    @cached_property
+    def non_structures(self) -> np.ndarray:
+        return self.indices[~is_structure(self.arrays.type_ids[self.indices])]
+
+    @cached_property
+    def sieged_tanks(self) -> np.ndarray:
+        return self._of_type(UnitID.SIEGETANKSIEGED)
+
+    def select(self, indices: np.ndarray) -> list[Unit]:
+        """`Unit` objects of one of this view's partitions."""
+        return self.arrays.select(indices)
+
+    def in_range(
+        self,
+        indices: np.ndarray,
+        position: Union[Point2, tuple[float, float]],
+        distance: float,
+        add_radius: bool = False,
+    ) -> np.ndarray:
+        """
+        Units of the partition `indices` within `distance` of `position`,
+        plus each unit's own radius if `add_radius`.
+        """
+        offsets: np.ndarray = self.arrays.positions[indices] - (
+            position[0],
+            position[1],
+        )
+        reach: Union[float, np.ndarray] = (
+            distance + self.arrays.radius[indices] if add_radius else distance
+        )
+        return indices[np.einsum("ij,ij->i", offsets, offsets) <= reach**2]
+
+    def any_in_range(
+        self,
+        indices: np.ndarray,
+        position: Union[Point2, tuple[float, float]],
+        distance: float,
+    ) -> bool:
+        return self.in_range(indices, position, distance).size > 0
+
+    def _of_type(self, type_id: UnitID) -> np.ndarray:
+        return self.indices[self.arrays.type_ids[self.indices] == type_id.value]
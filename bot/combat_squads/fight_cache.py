@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from ares.consts import EngagementResult
+from sc2.unit import Unit
+from sc2.units import Units
+
+# per unit: type, health bucket, shield bucket, attack / armor / shield upgrades
+UnitSignature = tuple[int, int, int, int, int, int]
+FightSignature = tuple[tuple[UnitSignature, ...], tuple[UnitSignature, ...]]
+
+
+@dataclass
+class FightResultCache:
+    """
+    Remember combat sim results for a short while, so the same fight
+    isn't simulated again every frame or for every squad facing the
+    same enemy.
+
+    Results are keyed on a quantized composition signature of both sides,
+    bounded with LRU eviction and expire after `expire_after` game seconds.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of fight results to keep.
+    expire_after : float
+        Game seconds after which a cached result is resimulated.
+    num_health_buckets : int
+        How finely health and shield percentages are quantized.
+    """
+
+    max_size: int = 256
+    expire_after: float = 2.0
+    num_health_buckets: int = 5
+    hits: int = 0
+    misses: int = 0
+    _results: OrderedDict[FightSignature, tuple[EngagementResult, float]] = field(
+        default_factory=OrderedDict
+    )
+
+    @property
+    def hit_rate(self) -> float:
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def signature(
+        self,
+        own_units: Union[Units, list[Unit]],
+        enemy_units: Union[Units, list[Unit]],
+    ) -> FightSignature:
+        return self._side_signature(own_units), self._side_signature(enemy_units)
+
+    def get(self, signature: FightSignature, time: float) -> Optional[EngagementResult]:
+        if cached := self._results.get(signature):
+            result, time_simulated = cached
+            if time - time_simulated <= self.expire_after:
+                self._results.move_to_end(signature)
+                self.hits += 1
+                return result
+            del self._results[signature]
+        self.misses += 1
+        return None
+
+    def contains(self, signature: FightSignature, time: float) -> bool:
+        """Like `get` without touching LRU order or hit counts."""
+        if cached := self._results.get(signature):
+            return time - cached[1] <= self.expire_after
+        return False
+
+    def put(self, signature: FightSignature, result: EngagementResult, time: float):
+        self._results[signature] = (result, time)
+        self._results.move_to_end(signature)
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def _side_signature(
+        self, units: Union[Units, list[Unit]]
+    ) -> tuple[UnitSignature, ...]:
+        buckets: int = self.num_health_buckets
+        return tuple(
+            sorted(
+                (
+                    u.type_id.value,
+                    int(u.health_percentage * buckets),
+                    int(u.shield_percentage * buckets),
+                    u.attack_upgrade_level,
+                    u.armor_upgrade_level,
+                    u.shield_upgrade_level,
+                )
+                for u in units
+            )
+        )
@@ -0,0 +1,172 @@
+"""
+Concave formation slots.
+
+Normalized concave templates are precomputed per unit count, at runtime they
+are only scaled and translated to the setup position, and mirrored so the
+concave bulges away from the target.
+
+A template is the quadratic through the two wing tips and the apex, sampled
+at evenly spaced arc length. This matches the previous `interp1d(...,
+kind="quadratic")` construction without needing scipy.
+
+Units are matched to slots by minimum total travel distance, so they don't
+cross paths getting into formation.
+"""
+import numpy as np
+
+MAX_TEMPLATE_UNITS: int = 80
+# above this many units the optimal assignment gets too slow, go greedy
+MAX_OPTIMAL_ASSIGNMENT: int = 16
+# half the width of the concave per unit
+SPREAD_PER_UNIT: float = 0.35
+# depth of the concave apex relative to its half width
+DEPTH_RATIO: float = 0.6
+
+
+def _normalized_template(num_units: int) -> np.ndarray:
+    """(num_units, 2) array of (depth, spread) offsets for a half width of 1."""
+    t: np.ndarray = np.linspace(0.0, 1.0, num_units)
+    template: np.ndarray = np.column_stack(
+        (DEPTH_RATIO * 4.0 * t * (1.0 - t), 2.0 * t - 1.0)
+    )
+    template.flags.writeable = False
+    return template
+
+
+CONCAVE_TEMPLATES: list[np.ndarray] = [
+    _normalized_template(num_units) for num_units in range(MAX_TEMPLATE_UNITS + 1)
+]
+
+
+def concave_template(num_units: int) -> np.ndarray:
+    if num_units <= MAX_TEMPLATE_UNITS:
+        return CONCAVE_TEMPLATES[num_units]
+    return _normalized_template(num_units)
+
+
+def concave_points(
+    num_units: int,
+    setup_from: tuple[float, float],
+    target: tuple[float, float],
+    spread_per_unit: float = SPREAD_PER_UNIT,
+) -> np.ndarray:
+    """
+    World positions of a concave of `num_units` slots centered on `setup_from`.
+
+    Parameters
+    ----------
+    num_units :
+        Number of slots to return.
+    setup_from :
+        Where the middle of the concave should be.
+    target :
+        What the concave faces, the apex is placed on the far side from it.
+    spread_per_unit :
+        Half width of the concave per unit.
+
+    Returns
+    -------
+    np.ndarray :
+        (num_units, 2) array of slot positions, ordered wing to wing.
+    """
+    half_width: float = num_units * spread_per_unit
+    facing: float = 1.0 if target[0] < setup_from[0] else -1.0
+    points: np.ndarray = concave_template(num_units) * (half_width * facing, half_width)
+    points += setup_from
+    return points
+
+
+def travel_costs(positions: np.ndarray, slots: np.ndarray) -> np.ndarray:
+    """(num_units, num_slots) matrix of distances from each unit to each slot."""
+    diff: np.ndarray = positions[:, np.newaxis, :] - slots[np.newaxis, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+
+def _optimal_assignment(costs: np.ndarray) -> np.ndarray:
+    """
+    Hungarian algorithm (shortest augmenting path with potentials),
+    the inner loop over slots is vectorized.
+    Requires num_units <= num_slots.
+    """
+    num_units, num_slots = costs.shape
+    # 1 indexed as in the textbook formulation, index 0 is a dummy
+    u: np.ndarray = np.zeros(num_units + 1)
+    v: np.ndarray = np.zeros(num_slots + 1)
+    slot_to_unit: np.ndarray = np.zeros(num_slots + 1, dtype=np.int64)
+    way: np.ndarray = np.zeros(num_slots + 1, dtype=np.int64)
+
+    for unit in range(1, num_units + 1):
+        slot_to_unit[0] = unit
+        slot: int = 0
+        min_reduced: np.ndarray = np.full(num_slots + 1, np.inf)
+        used: np.ndarray = np.zeros(num_slots + 1, dtype=bool)
+        while slot_to_unit[slot] != 0:
+            used[slot] = True
+            current_unit: int = slot_to_unit[slot]
+            free: np.ndarray = ~used[1:]
+            reduced: np.ndarray = costs[current_unit - 1] - u[current_unit] - v[1:]
+            improved: np.ndarray = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = slot
+
+            next_slot: int = int(np.argmin(np.where(free, min_reduced[1:], np.inf))) + 1
+            delta: float = min_reduced[next_slot]
+            u[slot_to_unit[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+            slot = next_slot
+
+        # flip the augmenting path
+        while slot:
+            previous: int = way[slot]
+            slot_to_unit[slot] = slot_to_unit[previous]
+            slot = previous
+
+    assignment: np.ndarray = np.empty(num_units, dtype=np.int64)
+    assigned_slots: np.ndarray = np.flatnonzero(slot_to_unit[1:])
+    assignment[slot_to_unit[assigned_slots + 1] - 1] = assigned_slots
+    return assignment
+
+
+def _greedy_assignment(costs: np.ndarray) -> np.ndarray:
+    """Cheapest remaining unit / slot pair first, taken ones are masked out."""
+    num_units, num_slots = costs.shape
+    costs = costs.copy()
+    assignment: np.ndarray = np.empty(num_units, dtype=np.int64)
+    for _ in range(num_units):
+        unit, slot = divmod(int(np.argmin(costs)), num_slots)
+        assignment[unit] = slot
+        costs[unit, :] = np.inf
+        costs[:, slot] = np.inf
+    return assignment
+
+
+def assign_slots(
+    positions: np.ndarray,
+    slots: np.ndarray,
+    max_optimal: int = MAX_OPTIMAL_ASSIGNMENT,
+) -> np.ndarray:
+    """
+    Match units to formation slots minimizing the total travel distance.
+
+    Parameters
+    ----------
+    positions :
+        (num_units, 2) array of unit positions.
+    slots :
+        (num_slots, 2) array of slot positions, `num_slots >= num_units`.
+    max_optimal :
+        Largest unit count solved optimally, bigger squads are matched
+        greedily.
+
+    Returns
+    -------
+    np.ndarray :
+        Slot index for each unit.
+    """
+    if not len(positions):
+        return np.empty(0, dtype=np.int64)
+    costs: np.ndarray = travel_costs(positions, slots)
+    if len(positions) > max_optimal:
+        return _greedy_assignment(costs)
+    return _optimal_assignment(costs)
@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+
+import numpy as np
+from ares.consts import UnitRole
+from ares.managers.manager_mediator import ManagerMediator
+from sc2.position import Point2
+
+
+@dataclass
+class FrameContext:
+    """
+    Mediator lookups the squad code makes over and over, resolved once per
+    frame in `CombatManager` and shared by the squad controller and every
+    squad phase class. Only valid for the frame it was built on.
+    """
+
+    ground_grid: np.ndarray
+    air_grid: np.ndarray
+    ground_avoidance_grid: np.ndarray
+    air_avoidance_grid: np.ndarray
+    climber_grid: np.ndarray
+    position_of_main_squad: Point2
+
+    @classmethod
+    def build(cls, mediator: ManagerMediator, role: UnitRole) -> "FrameContext":
+        return cls(
+            ground_grid=mediator.get_ground_grid,
+            air_grid=mediator.get_air_grid,
+            ground_avoidance_grid=mediator.get_ground_avoidance_grid,
+            air_avoidance_grid=mediator.get_air_avoidance_grid,
+            climber_grid=mediator.get_climber_grid,
+            position_of_main_squad=mediator.get_position_of_main_squad(role=role),
+        )
+
+    def grid(self, flying: bool) -> np.ndarray:
+        return self.air_grid if flying else self.ground_grid
+
+    def avoidance_grid(self, flying: bool) -> np.ndarray:
+        return self.air_avoidance_grid if flying else self.ground_avoidance_grid
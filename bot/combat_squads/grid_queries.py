@@ -0,0 +1,74 @@
+"""
+Batched influence grid lookups for whole squads.
+
+These match `mediator.is_position_safe` (`cy_point_below_value`): a point
+is safe when the grid weight at its floored cell is `inf` or at most the
+safety limit. Positions come from `UnitArrays.positions`, so a squad is
+checked with one fancy indexing op rather than a Python call per unit.
+"""
+import numpy as np
+
+DEFAULT_WEIGHT_SAFETY_LIMIT: float = 1.0
+
+
+def grid_weights(grid: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Grid weight at the floored cell of each `(x, y)` in `positions`."""
+    cells: np.ndarray = positions.astype(np.intp)
+    return grid[cells[:, 0], cells[:, 1]]
+
+
+def _below_limit(weights: np.ndarray, weight_safety_limit: float) -> np.ndarray:
+    # np.inf check if pathing near a spore crawler etc, as in `is_position_safe`
+    return (weights <= weight_safety_limit) | (weights == np.inf)
+
+
+def positions_safe(
+    grid: np.ndarray,
+    positions: np.ndarray,
+    weight_safety_limit: float = DEFAULT_WEIGHT_SAFETY_LIMIT,
+) -> np.ndarray:
+    """Boolean vector, `True` where the position is safe on `grid`."""
+    return _below_limit(grid_weights(grid, positions), weight_safety_limit)
+
+
+def squad_positions_safe(
+    ground_grid: np.ndarray,
+    air_grid: np.ndarray,
+    positions: np.ndarray,
+    flying: np.ndarray,
+    weight_safety_limit: float = DEFAULT_WEIGHT_SAFETY_LIMIT,
+) -> np.ndarray:
+    """
+    Boolean safety vector for a mixed squad, flying units are checked
+    against `air_grid` and everything else against `ground_grid`.
+    """
+    if not flying.any():
+        return positions_safe(ground_grid, positions, weight_safety_limit)
+    cells: np.ndarray = positions.astype(np.intp)
+    x: np.ndarray = cells[:, 0]
+    y: np.ndarray = cells[:, 1]
+    weights: np.ndarray = np.where(flying, air_grid[x, y], ground_grid[x, y])
+    return _below_limit(weights, weight_safety_limit)
+
+
+def any_unsafe(
+    grid: np.ndarray,
+    positions: np.ndarray,
+    weight_safety_limit: float = DEFAULT_WEIGHT_SAFETY_LIMIT,
+) -> bool:
+    return not positions_safe(grid, positions, weight_safety_limit).all()
+
+
+def all_safe(
+    ground_grid: np.ndarray,
+    air_grid: np.ndarray,
+    positions: np.ndarray,
+    flying: np.ndarray,
+    weight_safety_limit: float = DEFAULT_WEIGHT_SAFETY_LIMIT,
+) -> bool:
+    """`True` if every unit is safe on its own grid."""
+    return bool(
+        squad_positions_safe(
+            ground_grid, air_grid, positions, flying, weight_safety_limit
+        ).all()
+    )
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
-from enum import Enum
-from typing import Any, Optional
+from time import perf_counter
+from typing import Any, Callable, Optional
 
 import numpy as np
 from sc2.data import Race
@@ -13,7 +13,6 @@ from ares.consts import (
     EngagementResult,
     UnitTreeQueryType,
 )
-from ares.dicts.unit_data import UNIT_DATA
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
 from cython_extensions.geometry import cy_distance_to_squared
@@ -24,36 +23,46 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.aoe_targeting import AOETargeting
+from bot.combat_squads.change_tracking import SkipStats, SquadChanges, unit_set_key
+from bot.combat_squads.command_batcher import CommandBatcher
+from bot.combat_squads.consts import (
+    CLOSE_ENEMY_RADIUS,
+    COMMON_UNIT_IGNORE_TYPES,
+    FAR_ENEMY_RADIUS,
+    GAME_LOOPS_PER_SECOND,
+    SQUAD_RADIUS,
+    EngagementPhase,
+)
+from bot.combat_squads.enemy_view import EnemyView
+from bot.combat_squads.fight_cache import FightResultCache, FightSignature
+from bot.combat_squads.frame_context import FrameContext
+from bot.combat_squads.grid_queries import all_safe, any_unsafe
+from bot.combat_squads.phase_pool import SquadPhasePool
+from bot.combat_squads.scheduler import SquadScheduler
+from bot.combat_squads.sim_queue import FightSimQueue
+from bot.combat_squads.spatial_hash import EnemySpatialHash
 from bot.combat_squads.squad.squad_engagement import SquadEngagement
 from bot.combat_squads.squad.squad_movement import SquadMovement
 from bot.combat_squads.squad.squad_retreating import SquadRetreating
 from bot.combat_squads.squad.squad_setup import SquadSetup
+from bot.combat_squads.squad_tracker import SquadState, SquadTracker
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot, UnitArrays
+from bot.frame_profiler import FrameProfiler
 
 COMBAT_SIM_IGNORE: set[UnitID] = {UnitID.BANELING}
-COMMON_UNIT_IGNORE_TYPES: set[UnitID] = {
-    UnitID.EGG,
-    UnitID.LARVA,
-    UnitID.OVERSEER,
-    UnitID.OBSERVER,
-}
-
-
-class EngagementPhase(str, Enum):
-    # setup formation, move fodder to front etc
-    SettingUp = "SettingUp"
-    # moving towards target with no enemy around
-    Moving = "Moving"
-    # after moving and enemy is getting near, and we want the fight
-    # should be a very short window to adjust formation
-    PreEngaging = "PreEngaging"
-    # near enemy, time to fight if we decide to
-    Engaging = "Engaging"
-    # move away from enemy
-    # if we manage to move away from any enemy go
-    # back to `SettingUp`
-    Retreating = "Retreating"
-    # TODO
-    # Sieging = "Sieging"
+NO_STUTTER_FORWARD_TYPES: np.ndarray = np.array(
+    [UnitID.ARCHON.value, UnitID.ZEALOT.value], dtype=np.int32
+)
+
+
+@dataclass
+class EnemyBands:
+    """Enemy around a squad, split by distance from the squad position."""
+
+    close: list[Unit]
+    super_close: list[Unit]
+    far: list[Unit]
 
 
 @dataclass
@@ -68,14 +77,34 @@ class CombatSquadsController:
     engage_threshold: set[EngagementResult] = field(default_factory=set)
     disengage_threshold: set[EngagementResult] = field(default_factory=set)
     small_engage_threshold: set[EngagementResult] = field(default_factory=set)
+    fight_cache_size: int = 256
+    fight_cache_expire_after: float = 2.0
     # for each squad, remember what `SquadEngagementPhase` we are in
     # also store things like what time we changed etc
-    _squads_tracker: dict[str, dict] = field(default_factory=dict)
+    _squads_tracker: SquadTracker = field(default_factory=SquadTracker)
     # for each engagement phase, have a `BaseSquad` object
     # that executes the relevant micro
     _engagement_phase_to_base_squad: dict[EngagementPhase, Any] = field(
         default_factory=dict
     )
+    # combat sim results shared across frames and squads
+    fight_cache: Optional[FightResultCache] = None
+    profiler: Optional[FrameProfiler] = None
+    # reusable `BaseSquad` objects, one per phase per squad
+    phase_pool: Optional[SquadPhasePool] = None
+    # when set, combat sims are queued and run under a per frame deadline
+    # or on the event loop between steps
+    sim_queue: Optional[FightSimQueue] = None
+    # reuse a squad's last combat sim result while it hasn't moved further
+    # than this and its members and enemy are unchanged
+    max_unchanged_movement: float = 1.5
+    skip_stats: SkipStats = field(default_factory=SkipStats)
+    # when set, quiet squads are staggered over several steps
+    scheduler: Optional[SquadScheduler] = None
+    # called with `True` / `False` whenever a squad decides to engage / disengage
+    on_engagement_decision: Optional[Callable[[bool], None]] = None
+    # plain squad orders, sent grouped at the end of `execute`
+    commands: Optional[CommandBatcher] = None
 
     def __post_init__(self):
         if not self.engage_threshold:
@@ -84,6 +113,15 @@ class CombatSquadsController:
             self.disengage_threshold = LOSS_DECISIVE_OR_WORSE
         if not self.small_engage_threshold:
             self.small_engage_threshold = VICTORY_MARGINAL_OR_BETTER
+        if not self.profiler:
+            self.profiler = FrameProfiler()
+        if not self.commands:
+            self.commands = CommandBatcher(self.ai)
+        if not self.fight_cache:
+            self.fight_cache = FightResultCache(
+                max_size=self.fight_cache_size,
+                expire_after=self.fight_cache_expire_after,
+            )
 
         self._engagement_phase_to_base_squad[EngagementPhase.SettingUp] = SquadSetup
         self._engagement_phase_to_base_squad[EngagementPhase.Moving] = SquadMovement
@@ -92,19 +130,42 @@ class CombatSquadsController:
         self._engagement_phase_to_base_squad[
             EngagementPhase.Retreating
         ] = SquadRetreating
+        if not self.phase_pool:
+            self.phase_pool = SquadPhasePool(
+                self.ai, self.mediator, self._engagement_phase_to_base_squad
+            )
 
     def execute(
         self,
         attack_target: Point2,
         _unit_tag_to_bane_tag: dict[int, int],
-        squad_radius: float = 9.0,
-        close_enemy_radius: float = 14.0,
-        far_enemy_radius: float = 18.5,
+        snapshot: SquadStateSnapshot,
+        frame: FrameContext,
+        enemy_hash: EnemySpatialHash,
+        aoe_targeting: AOETargeting,
+        squad_radius: float = SQUAD_RADIUS,
+        close_enemy_radius: float = CLOSE_ENEMY_RADIUS,
+        far_enemy_radius: float = FAR_ENEMY_RADIUS,
     ) -> None:
         squads: list[UnitSquad] = self.mediator.get_squads(
             role=self.role, squad_radius=squad_radius
         )
 
+        # squads that merged or died leave stale entries behind,
+        # drop them along with their pooled phase objects
+        for squad_id in self._squads_tracker.evict_missing(squads):
+            self.phase_pool.remove(squad_id)
+            if self.sim_queue:
+                self.sim_queue.cancel(squad_id)
+            if self.scheduler:
+                self.scheduler.remove(squad_id)
+
+        profiler: FrameProfiler = self.profiler
+        with profiler.stage("range_queries"):
+            enemy_bands: dict[str, EnemyBands] = self._get_enemy_bands(
+                squads, close_enemy_radius, far_enemy_radius
+            )
+
         for squad in squads:
             # we have no info on this squad right now, set things up
             # set things to retreating by default as safest option
@@ -113,77 +174,228 @@ class CombatSquadsController:
                     squad, EngagementPhase.Retreating, self.ai.time, attack_target
                 )
 
-            close_enemy: list[Unit] = [
-                u
-                for u in self.mediator.get_units_in_range(
-                    start_points=[squad.squad_position],
-                    distances=close_enemy_radius,
-                    query_tree=UnitTreeQueryType.AllEnemy,
-                )[0]
-                if u.type_id not in COMMON_UNIT_IGNORE_TYPES
-            ]
-            max_enemy_range: float = (
-                max([u.ground_range for u in close_enemy]) if close_enemy else 0.0
-            )
-            range_check: float = 4.0 + (max_enemy_range * 1.5)
-            super_close_enemy: list[Unit] = [
-                u
-                for u in self.mediator.get_units_in_range(
-                    start_points=[squad.squad_position],
-                    distances=range_check,
-                    query_tree=UnitTreeQueryType.AllEnemy,
-                )[0]
-                if u.type_id not in COMMON_UNIT_IGNORE_TYPES
-            ]
+        # queued mode, sim every squad at once before making decisions
+        if self.sim_queue:
+            with profiler.stage("engagement_sims"):
+                self._run_queued_fight_sims(squads, enemy_bands)
+
+        scheduler: Optional[SquadScheduler] = self.scheduler
+        squads_to_process: list[UnitSquad] = squads
+        critical: dict[str, bool] = dict()
+        if scheduler:
+            scheduler.begin_step()
+            critical = {
+                squad.squad_id: scheduler.is_critical(
+                    self._squads_tracker[squad.squad_id].phase,
+                    bool(enemy_bands[squad.squad_id].far),
+                )
+                for squad in squads
+            }
+            # squads that matter first, so only quiet squads go over budget
+            squads_to_process = sorted(squads, key=lambda s: not critical[s.squad_id])
+
+        for squad in squads_to_process:
+            if scheduler and not scheduler.should_update(
+                squad.squad_id, critical[squad.squad_id]
+            ):
+                continue
 
-            far_enemy: list[Unit] = [
-                u
-                for u in self.mediator.get_units_in_range(
-                    start_points=[squad.squad_position],
-                    distances=far_enemy_radius,
-                    query_tree=UnitTreeQueryType.AllEnemy,
-                )[0]
-                if u.type_id not in COMMON_UNIT_IGNORE_TYPES
-            ]
-            main_fight_should_engage: bool = self._update_squad_engagement(
-                squad, squads, close_enemy, far_enemy
+            bands: EnemyBands = enemy_bands[squad.squad_id]
+            close_enemy: list[Unit] = bands.close
+            super_close_enemy: list[Unit] = bands.super_close
+            far_enemy: list[Unit] = bands.far
+
+            changes: SquadChanges = self._detect_squad_changes(squad, far_enemy)
+
+            with profiler.stage("engagement_sims"):
+                main_fight_should_engage: bool = self._update_squad_engagement(
+                    squad, squads, close_enemy, far_enemy, changes
+                )
+
+                small_fight_should_engage: bool = (
+                    not main_fight_should_engage
+                    and self._update_squad_small_engagement(squad, super_close_enemy)
+                )
+
+            with profiler.stage("phase_transitions"):
+                current_phase: EngagementPhase = self._update_current_squad_phase(
+                    squad,
+                    self.ai.time,
+                    close_enemy,
+                    far_enemy,
+                    super_close_enemy,
+                    main_fight_should_engage,
+                    small_fight_should_engage,
+                    attack_target,
+                    snapshot,
+                    frame,
+                )
+
+            with profiler.stage("stutter_forward"):
+                # depends only on our units and the enemy types near us
+                if changes.stutter_forward:
+                    start: float = perf_counter()
+                    self._track_stutter_forward(
+                        squad, EnemyView(snapshot.enemy, far_enemy), snapshot
+                    )
+                    self._squads_tracker[
+                        squad.squad_id
+                    ].stutter_forward_key = changes.stutter_forward_key
+                    self.skip_stats.add_evaluated(
+                        "stutter_forward", perf_counter() - start
+                    )
+                else:
+                    self.skip_stats.add_skipped("stutter_forward")
+
+            _move_to: Point2 = (
+                attack_target if squad.main_squad else frame.position_of_main_squad
             )
 
-            small_fight_should_engage: bool = (
-                not main_fight_should_engage
-                and self._update_squad_small_engagement(squad, super_close_enemy)
+            with profiler.stage("phase_execute"):
+                self._execute_squad_control(
+                    squad,
+                    current_phase,
+                    close_enemy,
+                    super_close_enemy,
+                    main_fight_should_engage,
+                    small_fight_should_engage,
+                    _move_to,
+                    _unit_tag_to_bane_tag,
+                    snapshot,
+                    frame,
+                    EnemyView(snapshot.enemy, close_enemy),
+                    enemy_hash,
+                    aoe_targeting,
+                )
+
+        with profiler.stage("command_flush"):
+            self.commands.flush()
+
+    def warm_up(self, snapshot: SquadStateSnapshot, frame: FrameContext) -> None:
+        """
+        Run the decision making and ares' combat sim once without touching
+        squad state, the fight cache or issuing commands, so numpy / cython
+        code paths are warm before the first fight.
+
+        Squads with no enemy near are simulated against themselves.
+        """
+        squads: list[UnitSquad] = self.mediator.get_squads(
+            role=self.role, squad_radius=SQUAD_RADIUS
+        )
+        enemy_bands: dict[str, EnemyBands] = self._get_enemy_bands(
+            squads, CLOSE_ENEMY_RADIUS, FAR_ENEMY_RADIUS
+        )
+        own: UnitArrays = snapshot.own
+        for squad in squads:
+            own_units, enemy = self._fight_sim_units(
+                squad, enemy_bands[squad.squad_id].far or squad.squad_units
+            )
+            self._obvious_fight_result(own_units, enemy)
+            self.fight_cache.signature(own_units, enemy)
+            if own_units and enemy:
+                self.mediator.can_win_fight(own_units=own_units, enemy_units=enemy)
+            own_idx: np.ndarray = own.indices(squad.squad_units)
+            any_unsafe(frame.ground_grid, own.positions[own_idx])
+            all_safe(
+                frame.ground_grid,
+                frame.air_grid,
+                own.positions[own_idx],
+                own.flying[own_idx],
             )
 
-            current_phase: EngagementPhase = self._update_current_squad_phase(
-                squad,
-                self.ai.time,
-                close_enemy,
-                far_enemy,
-                super_close_enemy,
-                main_fight_should_engage,
-                small_fight_should_engage,
-                attack_target,
+    def _detect_squad_changes(
+        self, squad: UnitSquad, far_enemy: list[Unit]
+    ) -> SquadChanges:
+        squad_battle_info: SquadState = self._squads_tracker[squad.squad_id]
+        fight_signature: FightSignature = self.fight_cache.signature(
+            *self._fight_sim_units(squad, far_enemy)
+        )
+        stutter_forward_key: int = hash(
+            (unit_set_key(squad.squad_units), unit_set_key(far_enemy))
+        )
+        return SquadChanges(
+            fight=fight_signature != squad_battle_info.fight_signature,
+            moved=cy_distance_to_squared(
+                squad.squad_position, squad_battle_info.position_engagement_result
             )
+            > self.max_unchanged_movement**2,
+            stutter_forward=stutter_forward_key
+            != squad_battle_info.stutter_forward_key,
+            fight_signature=fight_signature,
+            stutter_forward_key=stutter_forward_key,
+        )
 
-            self._track_stutter_forward(squad, far_enemy)
+    def _get_enemy_bands(
+        self,
+        squads: list[UnitSquad],
+        close_enemy_radius: float,
+        far_enemy_radius: float,
+    ) -> dict[str, EnemyBands]:
+        """
+        Query the enemy tree once for every squad at the largest radius,
+        then split each result into close, super close and far bands.
 
-            _move_to: Point2 = (
-                attack_target
-                if squad.main_squad
-                else self.mediator.get_position_of_main_squad(role=UnitRole.ATTACKING)
+        The super close radius depends on the max range of the close enemy,
+        so the rare squads whose `range_check` exceeds the batched radius
+        get a second (also batched) query.
+        """
+        if not squads:
+            return dict()
+
+        query_radius: float = max(close_enemy_radius, far_enemy_radius)
+        close_sq: float = close_enemy_radius**2
+        far_sq: float = far_enemy_radius**2
+        in_range: list[Units] = self.mediator.get_units_in_range(
+            start_points=[squad.squad_position for squad in squads],
+            distances=query_radius,
+            query_tree=UnitTreeQueryType.AllEnemy,
+        )
+
+        enemy_bands: dict[str, EnemyBands] = dict()
+        # squads needing a wider query for their super close band
+        wide_squads: list[UnitSquad] = []
+        wide_range_checks: list[float] = []
+        for squad, enemy in zip(squads, in_range):
+            squad_position: Point2 = squad.squad_position
+            enemy_and_dist: list[tuple[Unit, float]] = [
+                (u, cy_distance_to_squared(u.position, squad_position))
+                for u in enemy
+                if u.type_id not in COMMON_UNIT_IGNORE_TYPES
+            ]
+            close_enemy: list[Unit] = [u for u, d in enemy_and_dist if d <= close_sq]
+            max_enemy_range: float = (
+                max([u.ground_range for u in close_enemy]) if close_enemy else 0.0
             )
+            range_check: float = 4.0 + (max_enemy_range * 1.5)
+            super_close_enemy: list[Unit] = []
+            if range_check <= query_radius:
+                range_check_sq: float = range_check**2
+                super_close_enemy = [
+                    u for u, d in enemy_and_dist if d <= range_check_sq
+                ]
+            else:
+                wide_squads.append(squad)
+                wide_range_checks.append(range_check)
 
-            self._execute_squad_control(
-                squad,
-                current_phase,
-                close_enemy,
-                super_close_enemy,
-                main_fight_should_engage,
-                small_fight_should_engage,
-                _move_to,
-                _unit_tag_to_bane_tag,
+            enemy_bands[squad.squad_id] = EnemyBands(
+                close=close_enemy,
+                super_close=super_close_enemy,
+                far=[u for u, d in enemy_and_dist if d <= far_sq],
             )
 
+        if wide_squads:
+            wide_in_range: list[Units] = self.mediator.get_units_in_range(
+                start_points=[squad.squad_position for squad in wide_squads],
+                distances=wide_range_checks,
+                query_tree=UnitTreeQueryType.AllEnemy,
+            )
+            for squad, enemy in zip(wide_squads, wide_in_range):
+                enemy_bands[squad.squad_id].super_close = [
+                    u for u in enemy if u.type_id not in COMMON_UNIT_IGNORE_TYPES
+                ]
+
+        return enemy_bands
+
     def _execute_squad_control(
         self,
         squad: UnitSquad,
@@ -194,17 +406,25 @@ class CombatSquadsController:
         small_fight_should_engage: bool,
         attack_target: Point2,
         _unit_tag_to_bane_tag: dict[int, int],
+        snapshot: SquadStateSnapshot,
+        frame: FrameContext,
+        enemy_view: EnemyView,
+        enemy_hash: EnemySpatialHash,
+        aoe_targeting: AOETargeting,
     ) -> None:
-        pos_of_main_squad: Point2 = self.mediator.get_position_of_main_squad(
-            role=self.role
-        )
-        self._squads_tracker[squad.squad_id]["combat_object"].execute(
+        self._squads_tracker[squad.squad_id].combat_object.execute(
             squad=squad,
             enemy=close_enemy,
             target=attack_target,
-            pos_of_main_squad=pos_of_main_squad,
-            stutter_forward=self._squads_tracker[squad.squad_id]["stutter_forward"],
+            pos_of_main_squad=frame.position_of_main_squad,
+            stutter_forward=self._squads_tracker[squad.squad_id].stutter_forward,
             _unit_tag_to_bane_tag=_unit_tag_to_bane_tag,
+            snapshot=snapshot,
+            frame=frame,
+            commands=self.commands,
+            enemy_view=enemy_view,
+            enemy_hash=enemy_hash,
+            aoe_targeting=aoe_targeting,
         )
 
         if self.ai.config:
@@ -230,30 +450,29 @@ class CombatSquadsController:
                         squad.squad_position, f"{squad.squad_id} Retreating"
                     )
 
-    def _track_stutter_forward(self, squad: UnitSquad, close_enemy: Units) -> None:
-        our_range = [
-            u.ground_range
-            for u in squad.squad_units
-            if not UNIT_DATA[u.type_id]["flying"]
-        ]
-        our_avg_range = sum(our_range) / len(our_range) if our_range else 0
-
-        enemy_range = [
-            u.ground_range for u in close_enemy if not UNIT_DATA[u.type_id]["flying"]
-        ]
-        enemy_avg_range = sum(enemy_range) / len(enemy_range) if enemy_range else 0
-        no_stutter_enemy = []
+    def _track_stutter_forward(
+        self, squad: UnitSquad, enemy_view: EnemyView, snapshot: SquadStateSnapshot
+    ) -> None:
+        own: UnitArrays = snapshot.own
+        own_idx: np.ndarray = own.indices(squad.squad_units)
+        our_range: np.ndarray = own.ground_range[own_idx[~own.flying[own_idx]]]
+        our_avg_range = our_range.mean() if our_range.size else 0
+
+        enemy: UnitArrays = snapshot.enemy
+        enemy_range: np.ndarray = enemy.ground_range[enemy_view.ground]
+        enemy_avg_range = enemy_range.mean() if enemy_range.size else 0
+        no_stutter_enemy: bool = False
         if self.ai.enemy_race == Race.Protoss:
-            no_stutter_enemy: list[Unit] = [
-                e for e in close_enemy if e.type_id in {UnitID.ARCHON, UnitID.ZEALOT}
-            ]
+            no_stutter_enemy = np.isin(
+                enemy.type_ids[enemy_view.indices], NO_STUTTER_FORWARD_TYPES
+            ).any()
 
         if our_avg_range < enemy_avg_range and not no_stutter_enemy:
-            self._squads_tracker[squad.squad_id]["stutter_forward"] = True
-            self._squads_tracker[squad.squad_id]["time_stutter_set"] = self.ai.time
+            self._squads_tracker[squad.squad_id].stutter_forward = True
+            self._squads_tracker[squad.squad_id].time_stutter_set = self.ai.time
         else:
-            self._squads_tracker[squad.squad_id]["stutter_forward"] = False
-            self._squads_tracker[squad.squad_id]["time_stutter_set"] = self.ai.time
+            self._squads_tracker[squad.squad_id].stutter_forward = False
+            self._squads_tracker[squad.squad_id].time_stutter_set = self.ai.time
 
     def _reset_engagement(
         self,
@@ -265,17 +484,16 @@ class CombatSquadsController:
         Reset engagement back to default settings
         """
         _id: str = squad.squad_id
-        self._squads_tracker[_id]["engaging"] = False
+        self._squads_tracker[_id].engaging = False
         # ensure we turn off the main fight result for all squads
         if squad.main_squad:
             for squad in squads:
                 if squad.squad_id not in self._squads_tracker:
                     continue
-                self._squads_tracker[squad.squad_id]["main_fight_engage"] = False
+                self._squads_tracker[squad.squad_id].main_fight_engage = False
 
         if switch_to_phase:
-            self._squads_tracker[_id]["phase"] = switch_to_phase
-            self._squads_tracker[_id]["time"] = switch_to_phase
+            self._squads_tracker[_id].phase = switch_to_phase
 
     def _update_current_squad_phase(
         self,
@@ -287,14 +505,17 @@ class CombatSquadsController:
         main_fight_engage: bool,
         small_fight_engage: bool,
         target: Point2,
+        snapshot: SquadStateSnapshot,
+        frame: FrameContext,
     ) -> EngagementPhase:
         squad_id: str = squad.squad_id
-        squad_battle_info: dict = self._squads_tracker[squad_id]
-        phase: EngagementPhase = squad_battle_info["phase"]
-        switched_time: float = squad_battle_info["time_phase_transition"]
-        engage: bool = squad_battle_info["engaging"]
-        main_fight: bool = squad_battle_info["main_fight_engage"]
-        grid: np.ndarray = self.mediator.get_ground_grid
+        squad_battle_info: SquadState = self._squads_tracker[squad_id]
+        phase: EngagementPhase = squad_battle_info.phase
+        switched_time: float = squad_battle_info.time_phase_transition
+        engage: bool = squad_battle_info.engaging
+        main_fight: bool = squad_battle_info.main_fight_engage
+        grid: np.ndarray = frame.ground_grid
+        own: UnitArrays = snapshot.own
         # could this decision use RL?
         match phase:
             case EngagementPhase.SettingUp:
@@ -328,29 +549,16 @@ class CombatSquadsController:
                             squad, EngagementPhase.Engaging, time, target
                         )
                 # really close enemy and still don't want to fight, time to retreat
-                elif not (small_fight_engage or main_fight_engage) and any(
-                    [
-                        not self.mediator.is_position_safe(
-                            grid=grid, position=u.position
-                        )
-                        for u in squad.squad_units
-                    ]
+                elif not (small_fight_engage or main_fight_engage) and any_unsafe(
+                    grid, own.positions[own.indices(squad.squad_units)]
                 ):
                     self._update_phase_transition(
                         squad, EngagementPhase.Retreating, time, target
                     )
 
             case EngagementPhase.PreEngaging:
-                if (
-                    any(
-                        [
-                            not self.mediator.is_position_safe(
-                                grid=grid, position=u.position
-                            )
-                            for u in squad.squad_units
-                        ]
-                    )
-                    or switched_time + self.pre_engage_setup_time < time
+                if switched_time + self.pre_engage_setup_time < time or any_unsafe(
+                    grid, own.positions[own.indices(squad.squad_units)]
                 ):
                     self._update_phase_transition(
                         squad, EngagementPhase.Engaging, time, target
@@ -363,21 +571,17 @@ class CombatSquadsController:
                     )
 
             case EngagementPhase.Retreating:
+                own_idx: np.ndarray = own.indices(squad.squad_units)
                 if super_close_enemy and small_fight_engage:
                     self._update_phase_transition(
                         squad, EngagementPhase.Engaging, time, target
                     )
                 # once all units are safe, retreat is complete
-                elif all(
-                    [
-                        self.mediator.is_position_safe(
-                            grid=self.mediator.get_ground_grid
-                            if not UNIT_DATA[u.type_id]["flying"]
-                            else self.mediator.get_air_grid,
-                            position=u.position,
-                        )
-                        for u in squad.squad_units
-                    ]
+                elif all_safe(
+                    grid,
+                    frame.air_grid,
+                    own.positions[own_idx],
+                    own.flying[own_idx],
                 ):
                     if len(squad.squad_units) > 2:
                         self._update_phase_transition(
@@ -388,7 +592,7 @@ class CombatSquadsController:
                             squad, EngagementPhase.Moving, time, target
                         )
 
-        return self._squads_tracker[squad_id]["phase"]
+        return self._squads_tracker[squad_id].phase
 
     def _update_squad_small_engagement(
         self, squad: UnitSquad, enemy: list[Unit]
@@ -396,12 +600,12 @@ class CombatSquadsController:
         # TODO
         return False
         # if not enemy:
-        #     self._squads_tracker[squad.squad_id]["small_engagement"] = False
+        #     self._squads_tracker[squad.squad_id].small_engagement = False
         #     return False
         #
-        # previous_decision: bool = self._squads_tracker[squad.squad_id][
-        #     "small_engagement"
-        # ]
+        # previous_decision: bool = self._squads_tracker[
+        #     squad.squad_id
+        # ].small_engagement
         # squad_units: list[Unit] = squad.squad_units
         # fight_result: EngagementResult = self.mediator.can_win_fight(
         #     own_units=[
@@ -418,7 +622,7 @@ class CombatSquadsController:
         #     logger.info(
         #         f"{self.ai.time_formatted} - small engagement changed to {engage}"
         #     )
-        #     self._squads_tracker[squad.squad_id]["small_engagement"] = engage
+        #     self._squads_tracker[squad.squad_id].small_engagement = engage
         # return engage
 
     def _update_squad_engagement(
@@ -427,85 +631,76 @@ class CombatSquadsController:
         squads: list[UnitSquad],
         close_enemy: list[Unit],
         far_enemy: list[Unit],
+        changes: SquadChanges,
     ) -> bool:
         squad_id: str = squad.squad_id
 
         squad_units: list[Unit] = squad.squad_units
         main_squad: bool = squad.main_squad and len(squad_units) > 7
-        squad_battle_info: dict = self._squads_tracker[squad_id]
-        main_fight_engage: bool = squad_battle_info["main_fight_engage"]
-        engaging: bool = squad_battle_info["engaging"]
+        squad_battle_info: SquadState = self._squads_tracker[squad_id]
+        main_fight_engage: bool = squad_battle_info.main_fight_engage
+        engaging: bool = squad_battle_info.engaging
 
         if not far_enemy and engaging:
-            self._squads_tracker[squad.squad_id]["engaging"] = False
-            self._squads_tracker[squad_id]["time_engagement_switched"] = self.ai.time
+            self._squads_tracker[squad.squad_id].engaging = False
+            self._squads_tracker[squad_id].time_engagement_switched = self.ai.time
             return False
 
-        # if we recently made a new decision, commit to it
+        committed: Optional[bool] = self._committed_engagement(squad)
+        if committed is not None:
+            return committed
+
+        fight_result: Optional[EngagementResult]
+        # same units, same enemy and roughly the same place, same fight
+        frame_simulated: Optional[int] = squad_battle_info.frame_engagement_result
         if (
-            engaging
-            and self.ai.time
-            < squad_battle_info["time_engagement_switched"] + self.commit_to_engage_for
-        ):
-            return True
-        # recently decided to disengage here
-        elif (
-            not main_fight_engage
-            and not engaging
-            and self.ai.time
-            < squad_battle_info["time_engagement_switched"]
-            + self.commit_to_disengage_for
+            not changes.any
+            and frame_simulated is not None
+            and self.ai.state.game_loop - frame_simulated
+            <= self.fight_cache_expire_after * GAME_LOOPS_PER_SECOND
         ):
-            return False
-
-        # the main squad is currently controlling the decision
-        if not main_squad and main_fight_engage:
-            return True
-
-        enemy: list[Unit] = [
-            e for e in far_enemy if e.can_attack and e.type_id not in COMBAT_SIM_IGNORE
-        ]
-        fight_result: EngagementResult
-        if all([e for e in enemy if not e.can_attack]):
-            fight_result = EngagementResult.VICTORY_EMPHATIC
+            fight_result = squad_battle_info.engagement_result
+            self.skip_stats.add_skipped("engagement")
         else:
-            _own_units = [
-                u
-                for u in squad_units
-                if u.can_attack and u.type_id not in COMBAT_SIM_IGNORE
-            ]
-            if (
-                self.ai.get_total_supply(_own_units)
-                > self.ai.get_total_supply(enemy) * 1.4
-            ):
-                fight_result = EngagementResult.VICTORY_EMPHATIC
-            else:
-                fight_result = self.mediator.can_win_fight(
-                    own_units=_own_units,
-                    enemy_units=enemy,
+            start: float = perf_counter()
+            _own_units, enemy = self._fight_sim_units(squad, far_enemy)
+            fight_result = self._obvious_fight_result(_own_units, enemy)
+            if fight_result is None:
+                fight_result = self._can_win_fight(
+                    squad_id, _own_units, enemy, changes.fight_signature
                 )
+            else:
+                squad_battle_info.engagement_result = fight_result
+                squad_battle_info.frame_engagement_result = self.ai.state.game_loop
+            squad_battle_info.position_engagement_result = squad.squad_position
+            squad_battle_info.fight_signature = changes.fight_signature
+            self.skip_stats.add_evaluated("engagement", perf_counter() - start)
 
         # currently engaging and we should disengage
         if engaging and fight_result in self.disengage_threshold:
-            self._squads_tracker[squad_id]["engaging"] = False
-            self._squads_tracker[squad_id]["time_engagement_switched"] = self.ai.time
+            self._squads_tracker[squad_id].engaging = False
+            self._squads_tracker[squad_id].time_engagement_switched = self.ai.time
+            if self.on_engagement_decision:
+                self.on_engagement_decision(False)
 
             if main_squad:
                 logger.info(f"{self.ai.time_formatted} Main fight disengaging")
-                self._squads_tracker[squad_id]["main_fight_engage"] = False
+                self._squads_tracker[squad_id].main_fight_engage = False
 
         # not engaging and we should engage
         elif not engaging and fight_result in self.engage_threshold and far_enemy:
-            self._squads_tracker[squad_id]["engaging"] = True
-            self._squads_tracker[squad_id]["time_engagement_switched"] = self.ai.time
+            self._squads_tracker[squad_id].engaging = True
+            self._squads_tracker[squad_id].time_engagement_switched = self.ai.time
+            if self.on_engagement_decision:
+                self.on_engagement_decision(True)
 
             if main_squad:
                 logger.info(f"{self.ai.time_formatted} Main fight engaging")
-                self._squads_tracker[squad_id]["main_fight_engage"] = True
+                self._squads_tracker[squad_id].main_fight_engage = True
 
         # if main squad, update other squads nearby about main fight happening
         if main_squad and far_enemy:
-            _engaging: bool = self._squads_tracker[squad_id]["engaging"]
+            _engaging: bool = self._squads_tracker[squad_id].engaging
             enemy_position: tuple[float, float] = cy_center(far_enemy)
             for squad in squads:
                 if (
@@ -514,14 +709,118 @@ class CombatSquadsController:
                     and cy_distance_to_squared(squad.squad_position, enemy_position)
                     < 400.0
                 ):
-                    self._squads_tracker[squad.squad_id][
-                        "main_fight_engage"
-                    ] = _engaging
+                    self._squads_tracker[squad.squad_id].main_fight_engage = _engaging
 
         return (
-            self._squads_tracker[squad_id]["main_fight_engage"]
-            or self._squads_tracker[squad_id]["engaging"]
+            self._squads_tracker[squad_id].main_fight_engage
+            or self._squads_tracker[squad_id].engaging
+        )
+
+    def _committed_engagement(self, squad: UnitSquad) -> Optional[bool]:
+        """
+        The engagement decision if it is currently locked in, `None` when
+        it should be re-evaluated with a combat sim.
+        """
+        squad_battle_info: SquadState = self._squads_tracker[squad.squad_id]
+        engaging: bool = squad_battle_info.engaging
+        main_fight_engage: bool = squad_battle_info.main_fight_engage
+        main_squad: bool = squad.main_squad and len(squad.squad_units) > 7
+
+        # if we recently made a new decision, commit to it
+        if (
+            engaging
+            and self.ai.time
+            < squad_battle_info.time_engagement_switched + self.commit_to_engage_for
+        ):
+            return True
+        # recently decided to disengage here
+        elif (
+            not main_fight_engage
+            and not engaging
+            and self.ai.time
+            < squad_battle_info.time_engagement_switched + self.commit_to_disengage_for
+        ):
+            return False
+
+        # the main squad is currently controlling the decision
+        if not main_squad and main_fight_engage:
+            return True
+
+        return None
+
+    @staticmethod
+    def _fight_sim_units(
+        squad: UnitSquad, far_enemy: list[Unit]
+    ) -> tuple[list[Unit], list[Unit]]:
+        own_units: list[Unit] = [
+            u
+            for u in squad.squad_units
+            if u.can_attack and u.type_id not in COMBAT_SIM_IGNORE
+        ]
+        enemy: list[Unit] = [
+            e for e in far_enemy if e.can_attack and e.type_id not in COMBAT_SIM_IGNORE
+        ]
+        return own_units, enemy
+
+    def _obvious_fight_result(
+        self, own_units: list[Unit], enemy: list[Unit]
+    ) -> Optional[EngagementResult]:
+        """Fights not worth simulating, `None` if a sim is needed."""
+        if not enemy or (
+            self.ai.get_total_supply(own_units) > self.ai.get_total_supply(enemy) * 1.4
+        ):
+            return EngagementResult.VICTORY_EMPHATIC
+        return None
+
+    def _run_queued_fight_sims(
+        self, squads: list[UnitSquad], enemy_bands: dict[str, EnemyBands]
+    ) -> None:
+        time: float = self.ai.time
+        for squad in squads:
+            far_enemy: list[Unit] = enemy_bands[squad.squad_id].far
+            if not far_enemy or self._committed_engagement(squad) is not None:
+                continue
+            own_units, enemy = self._fight_sim_units(squad, far_enemy)
+            if self._obvious_fight_result(own_units, enemy) is not None:
+                continue
+            signature: FightSignature = self.fight_cache.signature(own_units, enemy)
+            if not self.fight_cache.contains(signature, time):
+                self.sim_queue.submit(squad.squad_id, signature, own_units, enemy)
+
+        for squad_id, (result, signature) in self.sim_queue.gather().items():
+            self.fight_cache.put(signature, result, time)
+            if squad_battle_info := self._squads_tracker.get(squad_id):
+                squad_battle_info.engagement_result = result
+                squad_battle_info.frame_engagement_result = self.ai.state.game_loop
+
+    def _can_win_fight(
+        self,
+        squad_id: str,
+        own_units: list[Unit],
+        enemy_units: list[Unit],
+        signature: FightSignature,
+    ) -> EngagementResult:
+        squad_battle_info: SquadState = self._squads_tracker[squad_id]
+        fight_result: Optional[EngagementResult] = self.fight_cache.get(
+            signature, self.ai.time
         )
+        if fight_result is None:
+            if self.sim_queue:
+                # queued sim didn't make the deadline, go with what we last knew
+                if self.sim_queue.is_fresh(
+                    squad_battle_info.frame_engagement_result, self.ai.state.game_loop
+                ):
+                    return squad_battle_info.engagement_result
+                # nothing to fall back on, sim now rather than again later
+                self.sim_queue.cancel(squad_id)
+            fight_result = self.mediator.can_win_fight(
+                own_units=own_units,
+                enemy_units=enemy_units,
+            )
+            self.fight_cache.put(signature, fight_result, self.ai.time)
+        squad_battle_info.engagement_result = fight_result
+        squad_battle_info.frame_engagement_result = self.ai.state.game_loop
+        return fight_result
 
     def _add_to_squad_tracker(
         self,
@@ -537,32 +836,25 @@ class CombatSquadsController:
         small_engagement: bool = False,
         main_fight_engage: bool = False,
     ) -> None:
-        self._squads_tracker[squad.squad_id] = {
-            "combat_object": self._engagement_phase_to_base_squad[phase](
-                self.ai, self.mediator, squad, target
-            ),
-            "phase": phase,
-            "time_phase_transition": time_phase_transition,
-            "engagement_result": engagement_result,
-            "stutter_forward": stutter_forward,
-            "time_stutter_set": time_stutter_set,
-            "engaging": engaging,
-            "time_engagement_switched": time_engagement_switched,
-            "small_engagement": small_engagement,
-            "main_fight_engage": main_fight_engage,
-        }
+        self._squads_tracker[squad.squad_id] = SquadState(
+            combat_object=self.phase_pool.get(squad, phase, target),
+            phase=phase,
+            time_phase_transition=time_phase_transition,
+            engagement_result=engagement_result,
+            stutter_forward=stutter_forward,
+            time_stutter_set=time_stutter_set,
+            engaging=engaging,
+            time_engagement_switched=time_engagement_switched,
+            small_engagement=small_engagement,
+            main_fight_engage=main_fight_engage,
+        )
 
     def _update_phase_transition(
         self, squad: UnitSquad, phase: EngagementPhase, time: float, target: Point2
     ) -> None:
         squad_id: str = squad.squad_id
-        # ensure the previous object is removed
-        del self._squads_tracker[squad_id]["combat_object"]
-
-        self._squads_tracker[squad_id][
-            "combat_object"
-        ] = self._engagement_phase_to_base_squad[phase](
-            self.ai, self.mediator, squad, target
+        self._squads_tracker[squad_id].combat_object = self.phase_pool.get(
+            squad, phase, target
         )
-        self._squads_tracker[squad_id]["phase"] = phase
-        self._squads_tracker[squad_id]["time_phase_transition"] = time
+        self._squads_tracker[squad_id].phase = phase
+        self._squads_tracker[squad_id].time_phase_transition = time
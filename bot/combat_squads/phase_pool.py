@@ -0,0 +1,61 @@
+from typing import TYPE_CHECKING, Any
+
+from ares.managers.manager_mediator import ManagerMediator
+from ares.managers.squad_manager import UnitSquad
+from sc2.position import Point2
+
+from bot.combat_squads.squad.base_squad import BaseSquad
+
+if TYPE_CHECKING:
+    from ares import AresBot
+
+
+class SquadPhasePool:
+    """
+    Keep one reusable `BaseSquad` object per engagement phase per squad.
+
+    Re-entering a phase resets the pooled object with `set_squad`,
+    `set_target` and `invalidate` instead of constructing a new one.
+
+    Parameters
+    ----------
+    ai : AresBot
+        Bot object that will be running the game
+    mediator : ManagerMediator
+        Used for getting information from managers in Ares.
+    phase_to_class : dict[Any, type[BaseSquad]]
+        Which `BaseSquad` class handles each engagement phase.
+    """
+
+    def __init__(
+        self,
+        ai: "AresBot",
+        mediator: ManagerMediator,
+        phase_to_class: dict[Any, type[BaseSquad]],
+    ):
+        self.ai: "AresBot" = ai
+        self.mediator: ManagerMediator = mediator
+        self.phase_to_class: dict[Any, type[BaseSquad]] = phase_to_class
+        self.num_created: int = 0
+        self.num_reused: int = 0
+        self._phase_objects: dict[str, dict[Any, BaseSquad]] = dict()
+
+    def get(self, squad: UnitSquad, phase: Any, target: Point2) -> BaseSquad:
+        squad_objects: dict[Any, BaseSquad] = self._phase_objects.setdefault(
+            squad.squad_id, dict()
+        )
+        if phase_object := squad_objects.get(phase):
+            phase_object.set_squad(squad)
+            phase_object.set_target(target)
+            phase_object.invalidate()
+            self.num_reused += 1
+        else:
+            phase_object = self.phase_to_class[phase](
+                self.ai, self.mediator, squad, target
+            )
+            squad_objects[phase] = phase_object
+            self.num_created += 1
+        return phase_object
+
+    def remove(self, squad_id: str) -> None:
+        self._phase_objects.pop(squad_id, None)
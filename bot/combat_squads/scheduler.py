@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from bot.combat_squads.consts import EngagementPhase
+
+# squads in these phases are near a fight, they update every step
+CRITICAL_PHASES: set[EngagementPhase] = {
+    EngagementPhase.PreEngaging,
+    EngagementPhase.Engaging,
+    EngagementPhase.Retreating,
+}
+
+
+@dataclass
+class SquadScheduler:
+    """
+    Decide which squads get a full update this step.
+
+    Squads fighting, retreating or with enemy around update every step.
+    The rest (moving or setting up with nothing nearby) are round robined,
+    each getting an update every `round_robin_steps` steps. Once squad
+    processing this step has taken longer than `step_budget` seconds the
+    remaining non critical squads are deferred, a squad is never deferred
+    for more than `max_deferred_steps` steps in a row.
+
+    Parameters
+    ----------
+    round_robin_steps : int
+        Steps between updates of a quiet squad.
+    step_budget : float
+        Seconds of squad processing per step before quiet squads are deferred.
+    max_deferred_steps : int
+        Quiet squads not updated for this many steps update regardless.
+    """
+
+    round_robin_steps: int = 3
+    step_budget: float = 0.01
+    max_deferred_steps: int = 6
+    updated: int = 0
+    deferred: int = 0
+    over_budget_steps: int = 0
+    _step: int = 0
+    _step_start: float = 0.0
+    _over_budget: bool = False
+    # squad id -> round robin slot
+    _slots: dict[str, int] = field(default_factory=dict)
+    _next_slot: int = 0
+    # squad id -> steps since the squad was last updated
+    _steps_waiting: dict[str, int] = field(default_factory=dict)
+
+    @staticmethod
+    def is_critical(phase: EngagementPhase, enemy_nearby: bool) -> bool:
+        return enemy_nearby or phase in CRITICAL_PHASES
+
+    def begin_step(self) -> None:
+        self._step += 1
+        self._step_start = perf_counter()
+        self._over_budget = False
+
+    def remove(self, squad_id: str) -> None:
+        self._slots.pop(squad_id, None)
+        self._steps_waiting.pop(squad_id, None)
+
+    def should_update(self, squad_id: str, critical: bool) -> bool:
+        if critical:
+            return self._update(squad_id)
+
+        if squad_id not in self._slots:
+            self._slots[squad_id] = self._next_slot
+            self._next_slot += 1
+            # never seen before, get it going straight away
+            return self._update(squad_id)
+
+        steps_waiting: int = self._steps_waiting.get(squad_id, 0)
+        if steps_waiting >= self.max_deferred_steps:
+            return self._update(squad_id)
+
+        elapsed: float = perf_counter() - self._step_start
+        if not self._over_budget and elapsed > self.step_budget:
+            self._over_budget = True
+            self.over_budget_steps += 1
+
+        # its turn, or it missed its turn to the budget last time round
+        turn: int = (self._step + self._slots[squad_id]) % self.round_robin_steps
+        due: bool = turn == 0 or steps_waiting >= self.round_robin_steps
+        if due and not self._over_budget:
+            return self._update(squad_id)
+
+        self._steps_waiting[squad_id] = steps_waiting + 1
+        self.deferred += 1
+        return False
+
+    def _update(self, squad_id: str) -> bool:
+        self._steps_waiting[squad_id] = 0
+        self.updated += 1
+        return True
@@ -0,0 +1,185 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Collection, Optional, Union
+
+from ares.consts import EngagementResult
+from ares.managers.manager_mediator import ManagerMediator
+from loguru import logger
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat_squads.fight_cache import FightSignature
+
+# fight signature, own units and enemy units of a sim waiting to run
+QueuedSim = tuple[FightSignature, list[Unit], list[Unit]]
+
+
+@dataclass
+class FightSimQueue:
+    """
+    Combat sims of every squad that needs one, run together before any
+    phase updates under a per frame time budget.
+
+    Squads queue their sim at the start of a frame and `gather` runs
+    ares' `can_win_fight` for them, oldest first, until `deadline`
+    seconds have passed. Sims that don't fit stay queued for a later
+    frame and the squad keeps its last known result in the meantime, so
+    a big multi front fight can't push the step over the time limit.
+
+    Parameters
+    ----------
+    mediator : ManagerMediator
+        Used to run `can_win_fight`.
+    deadline : float
+        Seconds `gather` may spend on sims each frame, at least one
+        queued sim runs per frame.
+    max_result_age : Optional[int]
+        Game loops a squad's last result stays usable while its next sim
+        is queued, `None` to use it regardless of age.
+    """
+
+    mediator: ManagerMediator
+    deadline: float = 0.004
+    max_result_age: Optional[int] = None
+    submitted: int = 0
+    completed: int = 0
+    late: int = 0
+    _queue: dict[str, QueuedSim] = field(default_factory=dict)
+    # squads whose queued sim was already counted in `late`
+    _late: set[str] = field(default_factory=set)
+
+    def shutdown(self) -> None:
+        self._queue.clear()
+        self._late.clear()
+
+    def is_pending(self, squad_id: str) -> bool:
+        return squad_id in self._queue
+
+    def is_fresh(self, frame_simulated: Optional[int], frame: int) -> bool:
+        """Can a result simulated on `frame_simulated` still be used?"""
+        if frame_simulated is None:
+            return False
+        return self.max_result_age is None or (
+            frame - frame_simulated <= self.max_result_age
+        )
+
+    def submit(
+        self,
+        squad_id: str,
+        signature: FightSignature,
+        own_units: Union[Units, list[Unit]],
+        enemy_units: Union[Units, list[Unit]],
+    ) -> None:
+        # a squad already queued keeps its place with the newer units
+        if squad_id not in self._queue:
+            self.submitted += 1
+        self._queue[squad_id] = (signature, list(own_units), list(enemy_units))
+
+    def cancel(self, squad_id: str) -> None:
+        self._queue.pop(squad_id, None)
+        self._late.discard(squad_id)
+
+    def gather(self) -> dict[str, tuple[EngagementResult, FightSignature]]:
+        """Run queued sims until `deadline` and return them by squad id."""
+        results: dict[str, tuple[EngagementResult, FightSignature]] = dict()
+        start: float = perf_counter()
+        while self._queue and perf_counter() - start < self.deadline:
+            squad_id, sim = self._pop_next()
+            results[squad_id] = self._simulate(sim)
+        self._count_late()
+        self.completed += len(results)
+        return results
+
+    def _pop_next(self) -> tuple[str, QueuedSim]:
+        # dicts keep insertion order, so this is the oldest submission
+        squad_id: str = next(iter(self._queue))
+        self._late.discard(squad_id)
+        return squad_id, self._queue.pop(squad_id)
+
+    def _simulate(self, sim: QueuedSim) -> tuple[EngagementResult, FightSignature]:
+        signature, own_units, enemy_units = sim
+        return (
+            self.mediator.can_win_fight(own_units=own_units, enemy_units=enemy_units),
+            signature,
+        )
+
+    def _count_late(self, skip: Collection[str] = ()) -> None:
+        """Count sims that missed their frame, each only the first time."""
+        for squad_id in self._queue:
+            if squad_id not in self._late and squad_id not in skip:
+                self._late.add(squad_id)
+                self.late += 1
+
+
+@dataclass
+class AsyncFightEvaluator(FightSimQueue):
+    """
+    Run the queued sims on the asyncio event loop, in the time the bot
+    spends waiting on the game, instead of on the step.
+
+    python-sc2 awaits the SC2 client after every step and the loop sits
+    idle until the game answers. A background task runs queued sims in
+    that window, one per turn of the loop, so a step waits on at most
+    the sim in progress. The sim holds the GIL, worker threads would
+    compete with the step rather than overlap it.
+
+    Engagement decisions are committed to for several seconds, so a
+    result a few frames old is good enough. `gather` only collects sims
+    that already finished, squads keep their last result for up to
+    `max_result_age` game loops and only sim on the step once it is
+    older than that. `deadline` is not used.
+    """
+
+    max_result_age: Optional[int] = 24
+    _results: dict[str, tuple[EngagementResult, FightSignature]] = field(
+        default_factory=dict
+    )
+    _task: Optional[asyncio.Task] = None
+    # queued since the last `gather`, not late before they had a wait
+    _new: set[str] = field(default_factory=set)
+
+    def shutdown(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        super().shutdown()
+        self._results.clear()
+        self._new.clear()
+
+    def submit(
+        self,
+        squad_id: str,
+        signature: FightSignature,
+        own_units: Union[Units, list[Unit]],
+        enemy_units: Union[Units, list[Unit]],
+    ) -> None:
+        if squad_id not in self._queue:
+            self._new.add(squad_id)
+        super().submit(squad_id, signature, own_units, enemy_units)
+        if not self._task or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self, squad_id: str) -> None:
+        super().cancel(squad_id)
+        self._results.pop(squad_id, None)
+        self._new.discard(squad_id)
+
+    def gather(self) -> dict[str, tuple[EngagementResult, FightSignature]]:
+        """Return every sim finished since the last call by squad id."""
+        results: dict[str, tuple[EngagementResult, FightSignature]] = self._results
+        self._results = dict()
+        self._count_late(skip=self._new)
+        self._new = set()
+        self.completed += len(results)
+        return results
+
+    async def _run(self) -> None:
+        while self._queue:
+            squad_id, sim = self._pop_next()
+            try:
+                self._results[squad_id] = self._simulate(sim)
+            except Exception as error:
+                logger.warning(f"Combat sim for squad {squad_id} failed: {error}")
+            # let the game step through before the next sim
+            await asyncio.sleep(0)
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as UnitID
+from sc2.position import Point2
+from sc2.unit import Unit
+
+from bot.combat_squads.consts import COMMON_UNIT_IGNORE_TYPES
+from bot.combat_squads.unit_snapshot import UnitArrays
+
+DEFAULT_CELL_SIZE: float = 4.0
+
+
+@dataclass
+class EnemySpatialHash:
+    """
+    Uniform grid over the enemy units of a frame snapshot.
+
+    Enemy indices are sorted by cell, with cells laid out column by column,
+    so a radius query reads one contiguous slice per grid column it
+    overlaps and only distance checks those candidates. This keeps
+    per-unit proximity checks roughly constant in the size of the
+    enemy army.
+
+    Queries return indices into `arrays`, so callers can filter further
+    with any snapshot column before picking `Unit` objects with `select`.
+
+    Attributes
+    ----------
+    arrays : UnitArrays
+        Enemy snapshot this hash indexes.
+    cell_size : float
+        Width and height of a grid cell.
+    ground : np.ndarray
+        Mask over `arrays`, enemy ground units.
+    max_radius : float
+        Largest enemy unit radius, for queries that add target radius.
+    indexed : np.ndarray
+        Indices into `arrays` of every enemy in the hash.
+    """
+
+    arrays: UnitArrays
+    cell_size: float
+    ground: np.ndarray
+    max_radius: float
+    indexed: np.ndarray
+    _origin: np.ndarray
+    _num_rows: int
+    _num_cols: int
+    _order: np.ndarray
+    _cell_starts: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        arrays: UnitArrays,
+        cell_size: float = DEFAULT_CELL_SIZE,
+        ignore_types: Optional[set[UnitID]] = None,
+    ) -> "EnemySpatialHash":
+        if ignore_types is None:
+            ignore_types = COMMON_UNIT_IGNORE_TYPES
+        indexed: np.ndarray = np.flatnonzero(
+            ~np.isin(arrays.type_ids, [t.value for t in ignore_types])
+        )
+        positions: np.ndarray = arrays.positions[indexed]
+
+        if positions.shape[0]:
+            origin: np.ndarray = positions.min(axis=0)
+            extent: np.ndarray = positions.max(axis=0) - origin
+        else:
+            origin = np.zeros(2)
+            extent = np.zeros(2)
+        num_cols, num_rows = (extent // cell_size).astype(int) + 1
+
+        cells: np.ndarray = ((positions - origin) // cell_size).astype(np.intp)
+        keys: np.ndarray = cells[:, 0] * num_rows + cells[:, 1]
+        order: np.ndarray = np.argsort(keys, kind="stable")
+        cell_starts: np.ndarray = np.zeros(num_cols * num_rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(keys, minlength=num_cols * num_rows), out=cell_starts[1:])
+
+        return cls(
+            arrays=arrays,
+            cell_size=cell_size,
+            ground=~arrays.flying,
+            max_radius=float(arrays.radius.max(initial=0.0)),
+            indexed=indexed,
+            _origin=origin,
+            _num_rows=int(num_rows),
+            _num_cols=int(num_cols),
+            _order=indexed[order],
+            _cell_starts=cell_starts,
+        )
+
+    def query(
+        self,
+        position: Union[Point2, tuple[float, float]],
+        radius: float,
+        mask: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Indices into `arrays` of enemy within `radius` of `position`,
+        optionally restricted to where `mask` is `True`.
+        """
+        x: float = position[0] - self._origin[0]
+        y: float = position[1] - self._origin[1]
+        cell_size: float = self.cell_size
+        min_col: int = max(int((x - radius) // cell_size), 0)
+        max_col: int = min(int((x + radius) // cell_size), self._num_cols - 1)
+        min_row: int = max(int((y - radius) // cell_size), 0)
+        max_row: int = min(int((y + radius) // cell_size), self._num_rows - 1)
+        if min_col > max_col or min_row > max_row:
+            return np.empty(0, dtype=np.intp)
+
+        # cells of one column are contiguous in `_order`
+        starts: np.ndarray = self._cell_starts
+        order: np.ndarray = self._order
+        num_rows: int = self._num_rows
+        slices: list[np.ndarray] = []
+        for col in range(min_col, max_col + 1):
+            first_cell: int = col * num_rows
+            slices.append(
+                order[starts[first_cell + min_row] : starts[first_cell + max_row + 1]]
+            )
+        candidates: np.ndarray = np.concatenate(slices)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+
+        offsets: np.ndarray = self.arrays.positions[candidates] - (
+            position[0],
+            position[1],
+        )
+        in_range: np.ndarray = np.einsum("ij,ij->i", offsets, offsets) <= radius**2
+        return candidates[in_range]
+
+    def units_in_range(
+        self,
+        position: Union[Point2, tuple[float, float]],
+        radius: float,
+        mask: Optional[np.ndarray] = None,
+    ) -> list[Unit]:
+        return self.arrays.select(self.query(position, radius, mask))
+
+    def any_in_range(
+        self,
+        position: Union[Point2, tuple[float, float]],
+        radius: float,
+        mask: Optional[np.ndarray] = None,
+    ) -> bool:
+        return self.query(position, radius, mask).size > 0
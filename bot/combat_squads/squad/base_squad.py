@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 from ares.behaviors.combat import CombatManeuver
 from ares.behaviors.combat.individual import (
     CombatIndividualBehavior,
@@ -9,19 +10,18 @@ from ares.behaviors.combat.individual import (
     UseAOEAbility,
     UseTransfuse,
 )
-from ares.dicts.aoe_ability_to_range import AOE_ABILITY_SPELLS_INFO
-from ares.dicts.unit_data import UNIT_DATA
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
-from cython_extensions import cy_distance_to_squared
 from sc2.data import Race
 from sc2.ids.ability_id import AbilityId
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
-from bot.combat_squads.consts import FODDER_VALUES
+from bot.combat_squads.aoe_targeting import AOETargeting, aoe_abilities_for
+from bot.combat_squads.enemy_view import EnemyView
 from bot.combat_squads.squad.feed_back import FeedBack
+from bot.unit_table import NO_FODDER_VALUE, fodder_value, type_ids_of, unit_value
 
 if TYPE_CHECKING:
     from ares import AresBot
@@ -44,20 +44,25 @@ class BaseSquad:
     def set_target(self, target: Point2) -> None:
         self.target = target
 
+    def invalidate(self) -> None:
+        """
+        Called when a pooled squad object is reused for a new phase entry,
+        override to drop anything derived from the previous squad or target.
+        """
+        pass
+
     @staticmethod
     def get_fodder_tags(units: list[Unit]) -> set[int]:
-        unit_type_fodder_values: set[int] = {
-            FODDER_VALUES[u.type_id] for u in units if u.type_id in FODDER_VALUES
-        }
+        values: np.ndarray = fodder_value(type_ids_of(units))
+        unit_type_fodder_values: np.ndarray = np.unique(
+            values[values != NO_FODDER_VALUE]
+        )
 
         fodder_tags: set[int] = set()
 
-        if len(unit_type_fodder_values) > 1:
-            for unit in units:
-                if unit.type_id in FODDER_VALUES and FODDER_VALUES[unit.type_id] == min(
-                    unit_type_fodder_values
-                ):
-                    fodder_tags.add(unit.tag)
+        if unit_type_fodder_values.size > 1:
+            is_fodder: list[bool] = (values == unit_type_fodder_values[0]).tolist()
+            fodder_tags = {u.tag for u, fodder in zip(units, is_fodder) if fodder}
 
         return fodder_tags
 
@@ -69,55 +74,32 @@ class BaseSquad:
         @param mineral_weight: A value less than 1.0 will give vespene cost more emphasis
         @return:
         """
-        max_value: float = 0.0
-        target: Optional[Unit] = None
+        if not units:
+            return None
 
-        for unit in units:
-            value: float = (
-                UNIT_DATA[unit.type_id]["minerals"] * mineral_weight
-                + UNIT_DATA[unit.type_id]["gas"]
-            )
-            if value > max_value:
-                max_value = value
-                target = unit
-
-        return target
+        values: np.ndarray = unit_value(type_ids_of(units), mineral_weight)
+        best: int = int(np.argmax(values))
+        return units[best] if values[best] > 0.0 else None
 
     def _use_aoe_ability(
-        self, unit: Unit, enemy: list[Unit]
+        self, unit: Unit, aoe_targeting: AOETargeting
     ) -> Optional[CombatIndividualBehavior]:
-        for ability in AOE_ABILITY_SPELLS_INFO:
+        # most units can't cast anything, bail out before checking abilities
+        castable: tuple[AbilityId, ...] = aoe_abilities_for(unit.type_id)
+        if not castable:
+            return None
+
+        for ability in castable:
             if ability not in unit.abilities:
                 continue
 
-            ability_range_squared: float = 9.0 + (
-                AOE_ABILITY_SPELLS_INFO[ability]["range"] ** 2
-            )
-
-            _targets: list[Unit] = Units(
-                [
-                    u
-                    for u in enemy
-                    if cy_distance_to_squared(u.position, unit.position)
-                    <= ability_range_squared
-                ],
-                self.ai,
-            )
-            if ability == AbilityId.EMP_EMP:
-                _targets = [t for t in _targets if t.shield > 48 or t.energy > 48]
+            min_targets: int = self._aoe_min_targets(ability)
+            count, _, targets = aoe_targeting.best_target(unit, ability, min_targets)
+            # not even the densest cluster in range is worth a cast
+            if count < min_targets:
+                continue
+            _targets: Units = Units(targets, self.ai)
             if _targets:
-                min_targets: int = 4
-                if ability in {
-                    AbilityId.EFFECT_CORROSIVEBILE,
-                    AbilityId.KD8CHARGE_KD8CHARGE,
-                }:
-                    min_targets = 1
-                elif (
-                    ability in {AbilityId.EMP_EMP}
-                    and self.ai.enemy_race != Race.Protoss
-                ):
-                    min_targets = 2
-
                 avoid_own_ground: bool = ability in {
                     AbilityId.KD8CHARGE_KD8CHARGE,
                     AbilityId.PSISTORM_PSISTORM,
@@ -132,13 +114,31 @@ class BaseSquad:
                     avoid_own_flying=avoid_own_flying,
                 )
 
+    def _aoe_min_targets(self, ability: AbilityId) -> int:
+        if ability in {
+            AbilityId.EFFECT_CORROSIVEBILE,
+            AbilityId.KD8CHARGE_KD8CHARGE,
+        }:
+            return 1
+        elif ability in {AbilityId.EMP_EMP} and self.ai.enemy_race != Race.Protoss:
+            return 2
+        return 4
+
     def _use_unit_abilities(
-        self, unit, enemy, grid, squad, target, combat_maneuver
+        self,
+        unit,
+        enemy,
+        grid,
+        squad,
+        target,
+        combat_maneuver,
+        enemy_view: EnemyView,
+        aoe_targeting: AOETargeting,
     ) -> CombatManeuver:
         if self.mediator.is_position_safe(grid=grid, position=unit.position):
             combat_maneuver.add(GhostSnipe(unit, enemy))
-        combat_maneuver.add(FeedBack(unit, enemy, 4.5))
-        if aoe_ability := self._use_aoe_ability(unit, enemy):
+        combat_maneuver.add(FeedBack(unit, enemy_view, 4.5))
+        if aoe_ability := self._use_aoe_ability(unit, aoe_targeting):
             combat_maneuver.add(aoe_ability)
 
         # combat_maneuver.add(SiegeTankDecision(unit, enemy, target))
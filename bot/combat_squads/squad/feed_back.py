@@ -1,14 +1,14 @@
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING
 
 from ares.behaviors.combat.individual.combat_individual_behavior import (
     CombatIndividualBehavior,
 )
 from ares.managers.manager_mediator import ManagerMediator
-from cython_extensions.geometry import cy_distance_to, cy_distance_to_squared
 from sc2.ids.ability_id import AbilityId
 from sc2.unit import Unit
-from sc2.units import Units
+
+from bot.combat_squads.enemy_view import EnemyView
 
 if TYPE_CHECKING:
     from ares import AresBot
@@ -34,20 +34,23 @@ class FeedBack(CombatIndividualBehavior):
     """
 
     unit: Unit
-    targets: Union[list[Unit], Units]
+    enemy_view: EnemyView
     extra_range: float = 0.0
 
     def execute(self, ai: "AresBot", config: dict, mediator: ManagerMediator) -> bool:
         if AbilityId.FEEDBACK_FEEDBACK not in self.unit.abilities:
             return False
 
-        if targets := [
-            t
-            for t in self.targets
-            if t.energy >= 50
-            and cy_distance_to(t.position, self.unit.position)
-            < FEED_BACK_RANGE + t.radius + self.unit.radius + self.extra_range
-        ]:
+        enemy_view: EnemyView = self.enemy_view
+        targets: list[Unit] = enemy_view.select(
+            enemy_view.in_range(
+                enemy_view.energy_casters,
+                self.unit.position,
+                FEED_BACK_RANGE + self.unit.radius + self.extra_range,
+                add_radius=True,
+            )
+        )
+        if targets:
             target_with_most_energy: Unit = max(targets, key=lambda t: t.energy)
             self.unit(AbilityId.FEEDBACK_FEEDBACK, target_with_most_energy)
             return True
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from math import sqrt
 from typing import Optional, Union
 
 import numpy as np
@@ -19,7 +20,6 @@ from ares.behaviors.combat.individual import (
     StutterUnitForward,
     UseAbility,
 )
-from ares.dicts.unit_data import UNIT_DATA
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
 from cython_extensions.geometry import cy_distance_to_squared
@@ -31,7 +31,13 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.enemy_view import EnemyView
+from bot.combat_squads.frame_context import FrameContext
 from bot.combat_squads.squad.base_squad import BaseSquad
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot, UnitArrays
+from bot.unit_table import UNIT_FLYING
+
+BANELING_FLEE_DISTANCE: float = sqrt(15.4)
 
 
 @dataclass
@@ -64,21 +70,23 @@ class SquadEngagement(BaseSquad):
             self.ai.register_behavior(AMoveGroup(squad.squad_units, squad.tags, target))
             return
 
-        units: list[Unit] = squad.squad_units
-        fliers: list[Unit] = [u for u in enemy if UNIT_DATA[u.type_id]["flying"]]
-        ground: list[Unit] = [u for u in enemy if not UNIT_DATA[u.type_id]["flying"]]
+        snapshot: SquadStateSnapshot = kwargs["snapshot"]
+        own: UnitArrays = snapshot.own
+        own_idx: np.ndarray = own.indices(squad.squad_units)
+        units: list[Unit] = own.select(own_idx)
+        own_flying: list[bool] = own.flying[own_idx].tolist()
+
+        enemy_view: EnemyView = kwargs["enemy_view"]
+        fliers: list[Unit] = enemy_view.select(enemy_view.air)
+        ground: list[Unit] = enemy_view.select(enemy_view.ground)
 
         # own_fliers: list[Unit] = [u for u in squad.squad_units if UNIT_DATA[u.type_id]["flying"]]
-        own_ground: list[Unit] = [
-            u for u in squad.squad_units if not UNIT_DATA[u.type_id]["flying"]
-        ]
+        own_ground_idx: np.ndarray = own_idx[~own.flying[own_idx]]
+        own_ground: list[Unit] = own.select(own_ground_idx)
 
         threshold = 0.85
-        count_low_range = sum(
-            1 for u in ground if u.ground_range < 3 and u.type_id != UnitID.BANELING
-        )
         all_enemy_low_range = (
-            count_low_range / len(ground) > threshold if ground else False
+            len(enemy_view.melee) / len(ground) > threshold if ground else False
         )
 
         all_own_range: bool = all(u for u in own_ground if u.ground_range >= 3.0)
@@ -88,16 +96,14 @@ class SquadEngagement(BaseSquad):
             all_own_range or self.ai.race != Race.Zerg
         )
 
-        for unit in units:
-            avoid_grid: np.ndarray = self.mediator.get_ground_avoidance_grid
-            grid: np.ndarray = self.mediator.get_ground_grid
-            if UNIT_DATA[unit.type_id]["flying"]:
-                avoid_grid = self.mediator.get_air_avoidance_grid
-                grid = self.mediator.get_air_grid
+        distance_check: float = own.radius[own_ground_idx].sum() / 1.5
+
+        frame: FrameContext = kwargs["frame"]
+        for unit, flying in zip(units, own_flying):
+            avoid_grid: np.ndarray = frame.avoidance_grid(flying)
+            grid: np.ndarray = frame.grid(flying)
 
             if do_melee_fight and own_ground:
-                total_radius = sum(u.radius for u in own_ground)
-                distance_check: float = total_radius / 1.5
                 self._fight_vs_melee(
                     unit, ground, grid, squad.squad_position, distance_check
                 )
@@ -120,7 +126,14 @@ class SquadEngagement(BaseSquad):
 
             # siege, AOE, cyclone lock ons etc etc
             combat_maneuver = self._use_unit_abilities(
-                unit, enemy, grid, squad, target, combat_maneuver
+                unit,
+                enemy,
+                grid,
+                squad,
+                target,
+                combat_maneuver,
+                enemy_view,
+                kwargs["aoe_targeting"],
             )
 
             combat_maneuver = self._use_stim_pack(unit, combat_maneuver)
@@ -143,9 +156,9 @@ class SquadEngagement(BaseSquad):
                 unit.type_id == UnitID.REAPER
                 and unit.health_percentage < self.REAPER_FLEE_AT
             ):
-                combat_maneuver.add(KeepUnitSafe(unit, self.mediator.get_climber_grid))
+                combat_maneuver.add(KeepUnitSafe(unit, frame.climber_grid))
             # avoid banes
-            elif self._should_flee_baneling(unit, enemy):
+            elif self._should_flee_baneling(unit, enemy_view):
                 combat_maneuver.add(ShootTargetInRange(unit, ground))
                 combat_maneuver.add(KeepUnitSafe(unit, grid))
             # attack move things if possible
@@ -189,16 +202,13 @@ class SquadEngagement(BaseSquad):
             self.ai.register_behavior(combat_maneuver)
 
     @staticmethod
-    def _should_flee_baneling(unit, enemy) -> bool:
+    def _should_flee_baneling(unit: Unit, enemy_view: EnemyView) -> bool:
         return (
             unit.type_id != UnitID.BANELING
             and unit.is_light
-            and [
-                e
-                for e in enemy
-                if e.type_id == UnitID.BANELING
-                and cy_distance_to_squared(unit.position, e.position) < 15.4
-            ]
+            and enemy_view.any_in_range(
+                enemy_view.banelings, unit.position, BANELING_FLEE_DISTANCE
+            )
         )
 
     def _use_hallucinate(
@@ -220,7 +230,7 @@ class SquadEngagement(BaseSquad):
             if armoured := [
                 u
                 for u in enemy
-                if not UNIT_DATA[u.type_id]["flying"]
+                if not UNIT_FLYING[u.type_id.value]
                 and u.is_armored
                 and u.type_id != UnitID.ROACH
             ]:
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Union
 
+import numpy as np
 from ares import AresBot
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
@@ -9,8 +10,13 @@ from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.command_batcher import CommandBatcher
+from bot.combat_squads.formation import assign_slots
 from bot.combat_squads.squad.base_squad import BaseSquad
 
+# fodder is repositioned every frame while moving, keep the optimal solve small
+MAX_OPTIMAL_FODDER: int = 8
+
 
 @dataclass
 class SquadMovement(BaseSquad):
@@ -33,9 +39,27 @@ class SquadMovement(BaseSquad):
             need_to_move = cy_adjust_moving_formation(
                 squad.squad_units, target, fodder_tags, 1.9, 0.25
             )
+        if len(need_to_move) > 1:
+            need_to_move = self._reassign_fodder_positions(units, need_to_move)
 
+        commands: CommandBatcher = kwargs["commands"]
         for unit in units:
             if unit.tag in need_to_move:
-                unit.move(Point2(need_to_move[unit.tag]))
+                commands.move(unit, Point2(need_to_move[unit.tag]))
             else:
-                unit.move(target)
+                commands.move(unit, target)
+
+    @staticmethod
+    def _reassign_fodder_positions(
+        units: list[Unit], need_to_move: dict[int, tuple[float, float]]
+    ) -> dict[int, tuple[float, float]]:
+        """Swap fodder target positions around so no fodder crosses another."""
+        fodder: list[Unit] = [u for u in units if u.tag in need_to_move]
+        slots: np.ndarray = np.array([need_to_move[u.tag] for u in fodder])
+        slot_indices: np.ndarray = assign_slots(
+            np.array([u.position for u in fodder]), slots, MAX_OPTIMAL_FODDER
+        )
+        return {
+            unit.tag: pos
+            for unit, pos in zip(fodder, map(tuple, slots[slot_indices].tolist()))
+        }
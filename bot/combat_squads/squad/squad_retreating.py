@@ -1,25 +1,27 @@
 from dataclasses import dataclass
+from math import sqrt
 from typing import Union
 
 import numpy as np
 from ares import AresBot
 from ares.behaviors.combat import CombatManeuver
-from ares.behaviors.combat.individual import (
-    KeepUnitSafe,
-    ShootTargetInRange,
-    UseAbility,
-)
-from ares.dicts.unit_data import UNIT_DATA
+from ares.behaviors.combat.individual import KeepUnitSafe, ShootTargetInRange
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
 from cython_extensions.combat_utils import cy_pick_enemy_target
-from cython_extensions.geometry import cy_distance_to_squared, cy_towards
+from cython_extensions.geometry import cy_towards
 from sc2.ids.ability_id import AbilityId
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
+from bot.combat_squads.command_batcher import BatchedOrder, CommandBatcher
+from bot.combat_squads.frame_context import FrameContext
+from bot.combat_squads.spatial_hash import EnemySpatialHash
 from bot.combat_squads.squad.base_squad import BaseSquad
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot, UnitArrays
+
+CLOSE_GROUND_DISTANCE: float = sqrt(10.0)
 
 
 @dataclass
@@ -36,7 +38,8 @@ class SquadRetreating(BaseSquad):
         target: Point2,
         **kwargs,
     ) -> None:
-        grid: np.ndarray = self.mediator.get_ground_grid
+        frame: FrameContext = kwargs["frame"]
+        grid: np.ndarray = frame.ground_grid
         units: list[Unit] = squad.squad_units
         retreat_position: Point2
         rough_retreat_spot: Point2 = Point2(
@@ -56,20 +59,27 @@ class SquadRetreating(BaseSquad):
         else:
             retreat_position = target
 
-        for unit in units:
-            # close melee should carry on fighting
+        snapshot: SquadStateSnapshot = kwargs["snapshot"]
+        own: UnitArrays = snapshot.own
+        own_idx: np.ndarray = own.indices(units)
+        units = own.select(own_idx)
+        # close melee should carry on fighting
+        carry_on_fighting: list[bool] = (
+            (own.ground_range[own_idx] < 3) & ~own.flying[own_idx]
+        ).tolist()
+
+        enemy_hash: EnemySpatialHash = kwargs["enemy_hash"]
+        commands: CommandBatcher = kwargs["commands"]
+
+        for unit, melee in zip(units, carry_on_fighting):
             if (
-                unit.ground_range < 3
-                and not UNIT_DATA[unit.type_id]["flying"]
+                melee
                 and unit.can_attack
                 and enemy
                 and (
-                    close_ground := [
-                        e
-                        for e in enemy
-                        if not UNIT_DATA[e.type_id]["flying"]
-                        and cy_distance_to_squared(e.position, unit.position) < 10.0
-                    ]
+                    close_ground := enemy_hash.units_in_range(
+                        unit.position, CLOSE_GROUND_DISTANCE, enemy_hash.ground
+                    )
                 )
             ):
                 unit.attack(cy_pick_enemy_target(close_ground))
@@ -77,12 +87,19 @@ class SquadRetreating(BaseSquad):
 
             retreat_maneuver: CombatManeuver = CombatManeuver()
             retreat_maneuver = self._use_unit_abilities(
-                unit, enemy, grid, squad, target, retreat_maneuver
+                unit,
+                enemy,
+                grid,
+                squad,
+                target,
+                retreat_maneuver,
+                kwargs["enemy_view"],
+                kwargs["aoe_targeting"],
             )
             retreat_maneuver.add(ShootTargetInRange(unit, enemy))
             retreat_maneuver.add(KeepUnitSafe(unit, grid))
             retreat_maneuver.add(
-                UseAbility(AbilityId.MOVE_MOVE, unit, retreat_position)
+                BatchedOrder(unit, AbilityId.MOVE_MOVE, retreat_position, commands)
             )
 
             self.ai.register_behavior(retreat_maneuver)
@@ -7,7 +7,6 @@ from ares import AresBot
 from ares.behaviors.combat import CombatManeuver
 from ares.behaviors.combat.individual import UseAbility
 from ares.behaviors.combat.individual.siege_tank_decision import SiegeTankDecision
-from ares.dicts.unit_data import UNIT_DATA
 from ares.managers.manager_mediator import ManagerMediator
 from ares.managers.squad_manager import UnitSquad
 from cython_extensions import cy_center, cy_towards
@@ -17,10 +16,14 @@ from sc2.ids.ability_id import AbilityId
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
-from scipy.interpolate import interp1d
 
+from bot.combat_squads.command_batcher import CommandBatcher
+from bot.combat_squads.enemy_view import EnemyView
+from bot.combat_squads.formation import assign_slots, concave_points
 from bot.combat_squads.squad.base_squad import BaseSquad
 from bot.combat_squads.squad.feed_back import FeedBack
+from bot.combat_squads.unit_snapshot import SquadStateSnapshot, UnitArrays
+from bot.unit_table import is_flying, type_ids_of
 
 
 @dataclass
@@ -32,16 +35,25 @@ class SquadSetup(BaseSquad):
 
     core_concave_positions: dict[int, Point2] = field(default_factory=dict)
     fodder_concave_positions: dict[int, Point2] = field(default_factory=dict)
+    _formation_dirty: bool = True
 
-    def __post_init__(self):
+    def invalidate(self) -> None:
+        # squad / target changed, work the concave out again on next execute
+        self._formation_dirty = True
+
+    def _setup_formation(self) -> None:
+        self._formation_dirty = False
+        self.core_concave_positions = dict()
+        self.fodder_concave_positions = dict()
         units: list[Unit] = self.squad.squad_units
         fodder_tags: set[int] = self.get_fodder_tags(units)
-
-        if non_fodder := [
+        ground: list[Unit] = [
             u
-            for u in units
-            if u.tag not in fodder_tags and not UNIT_DATA[u.type_id]["flying"]
-        ]:
+            for u, flying in zip(units, is_flying(type_ids_of(units)).tolist())
+            if not flying
+        ]
+
+        if non_fodder := [u for u in ground if u.tag not in fodder_tags]:
             non_fodder_move_to: Point2 = Point2(
                 cy_towards(self.squad.squad_position, self.target, 0.5)
             )
@@ -50,11 +62,7 @@ class SquadSetup(BaseSquad):
                 non_fodder, non_fodder_move_to, self.target
             )
 
-        if fodder := [
-            u
-            for u in units
-            if u.tag in fodder_tags and not UNIT_DATA[u.type_id]["flying"]
-        ]:
+        if fodder := [u for u in ground if u.tag in fodder_tags]:
             fodder_move_to: Point2 = Point2(
                 cy_towards(self.squad.squad_position, self.target, 2.2)
             )
@@ -70,15 +78,23 @@ class SquadSetup(BaseSquad):
         target: Point2,
         **kwargs,
     ) -> None:
-        units: list[Unit] = squad.squad_units
-
-        for unit in units:
-            if UNIT_DATA[unit.type_id]["flying"]:
-                unit.move(squad.squad_position)
+        if self._formation_dirty:
+            self._setup_formation()
+
+        snapshot: SquadStateSnapshot = kwargs["snapshot"]
+        own: UnitArrays = snapshot.own
+        own_idx: np.ndarray = own.indices(squad.squad_units)
+        units: list[Unit] = own.select(own_idx)
+        enemy_view: EnemyView = kwargs["enemy_view"]
+        commands: CommandBatcher = kwargs["commands"]
+
+        for unit, flying in zip(units, own.flying[own_idx].tolist()):
+            if flying:
+                commands.move(unit, squad.squad_position)
                 continue
             fodder_maneuver: CombatManeuver = CombatManeuver()
             # fodder_maneuver.add(SiegeTankDecision(unit, enemy, target))
-            fodder_maneuver.add(FeedBack(unit, enemy))
+            fodder_maneuver.add(FeedBack(unit, enemy_view))
             tag: int = unit.tag
             if tag in self.core_concave_positions:
                 pos: Point2 = self.core_concave_positions[tag]
@@ -100,30 +116,15 @@ class SquadSetup(BaseSquad):
         setup_from: Point2 = Point2(
             cy_towards(defend_position, target_location, setup_towards)
         )
-        num_points = len(units)
-        distance_spread: float = num_points * 0.35
-        mid_value_depth = distance_spread * 0.6
-        mid_value: float = (
-            mid_value_depth if target_location[0] < setup_from[0] else -mid_value_depth
+        points: np.ndarray = concave_points(len(units), setup_from, target_location)
+        # closest overall slot for each unit, so they don't cross paths
+        slot_indices: np.ndarray = assign_slots(
+            np.array([u.position for u in units]), points
         )
-        point_a: Point2 = Point2((setup_from[0], setup_from[1] - distance_spread))
-        mid_point: Point2 = Point2((setup_from[0] + mid_value, setup_from[1]))
-        point_b: Point2 = Point2((setup_from[0], setup_from[1] + distance_spread))
-
-        points = np.array(
-            [[point_a.x, mid_point.x, point_b.x], [point_a.y, mid_point.y, point_b.y]]
-        ).T
-
-        distance = np.cumsum(np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1)))
-        distance = np.insert(distance, 0, 0) / distance[-1]
-
-        alpha = np.linspace(0, 1, num_points)
-        interpolator = interp1d(distance, points, kind="quadratic", axis=0)
-        points = interpolator(alpha)
 
         concave_positions: dict[int, Point2] = dict()
-        for pos, unit in zip(points, units):
-            concave_positions[unit.tag] = Point2((pos[0], pos[1]))
+        for unit, pos in zip(units, points[slot_indices].tolist()):
+            concave_positions[unit.tag] = Point2(pos)
         return concave_positions
 
     # alternative working solution
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from ares.consts import EngagementResult
+from ares.managers.squad_manager import UnitSquad
+
+from bot.combat_squads.consts import EngagementPhase
+from bot.combat_squads.fight_cache import FightSignature
+from bot.combat_squads.squad.base_squad import BaseSquad
+
+
+@dataclass(slots=True)
+class SquadState:
+    """What `CombatSquadsController` remembers about a squad between frames."""
+
+    combat_object: BaseSquad
+    phase: EngagementPhase
+    time_phase_transition: float
+    engagement_result: EngagementResult = EngagementResult.LOSS_EMPHATIC
+    # game loop `engagement_result` was simulated, `None` if never
+    frame_engagement_result: Optional[int] = None
+    stutter_forward: bool = False
+    time_stutter_set: float = 0.0
+    engaging: bool = False
+    time_engagement_switched: float = 0.0
+    small_engagement: bool = False
+    main_fight_engage: bool = False
+    # change detection, `FightResultCache.signature` of the squad and its
+    # far enemy when the engagement was last evaluated
+    fight_signature: Optional[FightSignature] = None
+    # `unit_set_key` of the squad and its far enemy combined, when stutter
+    # forward was last set
+    stutter_forward_key: int = 0
+    # squad position when `engagement_result` was worked out
+    position_engagement_result: tuple[float, float] = (0.0, 0.0)
+
+
+class SquadTracker(dict[str, SquadState]):
+    """
+    `SquadState` for every squad currently known to the controller, keyed
+    by squad id.
+
+    Subclasses `dict` so lookups stay in C. Squads no longer returned by
+    `mediator.get_squads` are evicted each frame, so memory stays bounded
+    over long multi round games.
+    """
+
+    __slots__ = ()
+
+    def evict_missing(self, squads: list[UnitSquad]) -> list[str]:
+        """Remove squads not in `squads`, returning the evicted squad ids."""
+        active_ids: set[str] = {squad.squad_id for squad in squads}
+        evicted: list[str] = [
+            squad_id for squad_id in self if squad_id not in active_ids
+        ]
+        for squad_id in evicted:
+            del self[squad_id]
+        return evicted
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Union
+
+import numpy as np
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.unit_table import is_flying
+
+
+@dataclass
+class UnitArrays:
+    """
+    Structure of arrays view over a collection of units for a single frame.
+
+    Every array is aligned with `units`, so a boolean mask or an index array
+    from any column can be used to pick the matching `Unit` objects back out
+    with `select`.
+    """
+
+    units: list[Unit]
+    tags: np.ndarray
+    type_ids: np.ndarray
+    positions: np.ndarray
+    ground_range: np.ndarray
+    air_range: np.ndarray
+    radius: np.ndarray
+    flying: np.ndarray
+    health_perc: np.ndarray
+    shield_perc: np.ndarray
+    shield: np.ndarray
+    energy: np.ndarray
+    tag_to_index: dict[int, int]
+
+    @classmethod
+    def from_units(cls, units: Union[Units, list[Unit]]) -> "UnitArrays":
+        units = list(units)
+        num_units: int = len(units)
+        positions: np.ndarray = np.empty((num_units, 2), dtype=np.float64)
+        columns: np.ndarray = np.empty((7, num_units), dtype=np.float64)
+        type_ids: np.ndarray = np.empty(num_units, dtype=np.int32)
+        tags: np.ndarray = np.empty(num_units, dtype=np.int64)
+
+        for i, u in enumerate(units):
+            positions[i] = u.position
+            columns[:, i] = (
+                u.ground_range,
+                u.air_range,
+                u.radius,
+                u.health_percentage,
+                u.shield_percentage,
+                u.shield,
+                u.energy,
+            )
+            type_ids[i] = u.type_id.value
+            tags[i] = u.tag
+
+        return cls(
+            units=units,
+            tags=tags,
+            type_ids=type_ids,
+            positions=positions,
+            ground_range=columns[0],
+            air_range=columns[1],
+            radius=columns[2],
+            flying=is_flying(type_ids),
+            health_perc=columns[3],
+            shield_perc=columns[4],
+            shield=columns[5],
+            energy=columns[6],
+            tag_to_index={tag: i for i, tag in enumerate(tags.tolist())},
+        )
+
+    def indices(self, units: Union[Units, list[Unit]]) -> np.ndarray:
+        """Indices of `units` in this snapshot, units not present are dropped."""
+        tag_to_index: dict[int, int] = self.tag_to_index
+        return np.array(
+            [tag_to_index[u.tag] for u in units if u.tag in tag_to_index],
+            dtype=np.intp,
+        )
+
+    def select(self, indices: np.ndarray) -> list[Unit]:
+        units: list[Unit] = self.units
+        return [units[i] for i in indices.tolist()]
+
+
+@dataclass
+class SquadStateSnapshot:
+    """
+    Own and enemy unit arrays, built once per frame in `CombatManager` and
+    shared by the squad controller and every squad phase class.
+    """
+
+    own: UnitArrays
+    enemy: UnitArrays
+
+    @classmethod
+    def build(
+        cls,
+        own_units: Union[Units, list[Unit]],
+        enemy_units: Union[Units, list[Unit]],
+    ) -> "SquadStateSnapshot":
+        return cls(
+            own=UnitArrays.from_units(own_units),
+            enemy=UnitArrays.from_units(enemy_units),
+        )
@@ -5,3 +5,27 @@ BEST_RANGE: set[UnitTypeId] = {
     UnitTypeId.STALKER,
     UnitTypeId.ROACH,
 }
+
+# config keys, see `config.yml`
+PROFILER: str = "Profiler"
+ENABLED: str = "Enabled"
+WINDOW: str = "Window"
+REPORT_PATH: str = "ReportPath"
+FIGHT_SIM_QUEUE: str = "FightSimQueue"
+MODE: str = "Mode"
+ASYNC: str = "Async"
+MAX_RESULT_AGE: str = "MaxResultAge"
+DEADLINE: str = "Deadline"
+SQUAD_SCHEDULER: str = "SquadScheduler"
+ROUND_ROBIN_STEPS: str = "RoundRobinSteps"
+STEP_BUDGET: str = "StepBudget"
+MAX_DEFERRED_STEPS: str = "MaxDeferredSteps"
+MATCH_UP_HISTORY: str = "MatchUpHistory"
+DB_PATH: str = "DbPath"
+RECORDER: str = "Recorder"
+PATH: str = "Path"
+CHUNK_FRAMES: str = "ChunkFrames"
+GRID_HISTORY: str = "GridHistory"
+MAX_FRAMES: str = "MaxFrames"
+DENSE_FRACTION: str = "DenseFraction"
+COMMAND_BATCHING: str = "CommandBatching"
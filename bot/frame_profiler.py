@@ -0,0 +1,108 @@
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from os import makedirs, path
+from typing import ContextManager, Optional
+
+import numpy as np
+from loguru import logger
+
+# returned when profiling is off, so timing a stage costs a single call
+_NO_OP_STAGE: ContextManager = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *args) -> None:
+        self._profiler.add_sample(self._name, time.perf_counter() - self._start)
+
+
+class FrameProfiler:
+    """
+    Low overhead per stage timing of the `on_step` pipeline.
+
+    Stages may be entered several times per frame (once per squad for
+    example), their durations are summed and pushed into a rolling window
+    when `end_frame` is called, so percentiles describe per step cost.
+
+    Parameters
+    ----------
+    enabled : bool
+        When `False` every `stage` is a shared no-op context manager.
+    window : int
+        Number of frames to keep per stage for the rolling percentiles.
+    report_path : str
+        Directory the per game report is written to.
+    """
+
+    def __init__(
+        self, enabled: bool = False, window: int = 5000, report_path: str = "data"
+    ):
+        self.enabled: bool = enabled
+        self.report_path: str = report_path
+        self._frame_totals: dict[str, float] = defaultdict(float)
+        self._samples: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+        self._num_frames: int = 0
+
+    def stage(self, name: str) -> ContextManager:
+        if not self.enabled:
+            return _NO_OP_STAGE
+        return _StageTimer(self, name)
+
+    def add_sample(self, name: str, seconds: float) -> None:
+        self._frame_totals[name] += seconds
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._num_frames += 1
+        for name, seconds in self._frame_totals.items():
+            self._samples[name].append(seconds)
+        self._frame_totals.clear()
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        """Rolling p50 / p95 / p99 / max in milliseconds for every stage."""
+        stats: dict[str, dict[str, float]] = dict()
+        for name, samples in self._samples.items():
+            if not samples:
+                continue
+            ms: np.ndarray = np.fromiter(samples, dtype=np.float64) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            stats[name] = {
+                "frames": len(ms),
+                "mean": float(ms.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(ms.max()),
+            }
+        return stats
+
+    def dump_report(self, file_name: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        stats: dict[str, dict[str, float]] = self.percentiles()
+        for name, stage_stats in sorted(stats.items()):
+            logger.info(
+                f"{name}: p50 {stage_stats['p50']:.3f}ms "
+                f"p95 {stage_stats['p95']:.3f}ms p99 {stage_stats['p99']:.3f}ms"
+            )
+
+        makedirs(self.report_path, exist_ok=True)
+        report_file: str = path.join(self.report_path, file_name)
+        with open(report_file, "w") as f:
+            json.dump({"frames": self._num_frames, "stages": stats}, f, indent=2)
+        return report_file
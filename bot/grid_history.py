@@ -0,0 +1,333 @@
+"""
+Influence grid history stored as keyframes plus sparse per frame deltas.
+
+Only a few cells of the influence grids change between frames, so a frame
+costs the indices and values of the changed cells rather than a full copy
+of the map. Storage can be backed by `.npy` files opened as memory maps,
+which `GridHistory.open` maps back read only, so keyframes and deltas of a
+whole game are read as NumPy views without loading them into memory.
+"""
+import json
+from os import makedirs, path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+if TYPE_CHECKING:
+    from ares.managers.manager_mediator import ManagerMediator
+
+# (changed flat cell indices, their new values)
+GridDelta = tuple[np.ndarray, np.ndarray]
+
+
+class GridDeltaEncoder:
+    """
+    Changed cells of a grid since the previous `encode` call.
+
+    The previous grid is patched in place rather than copied each frame.
+    """
+
+    def __init__(self):
+        self._previous: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self._previous = None
+
+    def encode(self, grid: np.ndarray) -> Optional[GridDelta]:
+        """Delta from the previous grid, `None` on the first call after `reset`."""
+        if self._previous is None or self._previous.shape != grid.shape:
+            self._previous = grid.copy()
+            return None
+        changed: np.ndarray = np.flatnonzero(grid != self._previous)
+        values: np.ndarray = grid.ravel()[changed]
+        self._previous.ravel()[changed] = values
+        return changed, values
+
+
+def _create_array(
+    directory: Optional[str], name: str, shape: tuple, dtype: np.dtype
+) -> np.ndarray:
+    if directory is None:
+        return np.zeros(shape, dtype=dtype)
+    return np.lib.format.open_memmap(
+        path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape
+    )
+
+
+class GridHistory:
+    """
+    Append only history of one influence grid.
+
+    A keyframe is stored every `keyframe_interval` frames, and whenever
+    more than `dense_fraction` of the grid changed in one frame, every
+    other frame stores only its changed cells. Once the keyframe store is
+    full, every later frame is stored as changed cells of the last
+    keyframe, so `grid_at` gets slower but nothing is dropped until the
+    delta store runs out.
+
+    Parameters
+    ----------
+    shape : tuple[int, int]
+        Grid shape.
+    max_frames : int
+        Frames that can be stored, `append` returns `False` once full.
+    max_delta_cells : int
+        Total changed cells that can be stored over all frames.
+    directory : Optional[str]
+        Back storage with memory mapped `.npy` files in this directory,
+        in memory when `None`.
+    keyframe_interval : int
+        Frames between keyframes, bounds the cost of `grid_at`.
+    dense_fraction : float
+        Frames changing more of the grid than this store a keyframe.
+    dtype : np.dtype
+        Grid dtype.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, int],
+        max_frames: int = 30_000,
+        max_delta_cells: int = 10_000_000,
+        directory: Optional[str] = None,
+        keyframe_interval: int = 1000,
+        dense_fraction: float = 0.1,
+        dtype: np.dtype = np.float32,
+    ):
+        if directory is not None:
+            makedirs(directory, exist_ok=True)
+        self.shape: tuple[int, int] = shape
+        self.directory: Optional[str] = directory
+        self.keyframe_interval: int = keyframe_interval
+        self.max_dense_cells: int = int(shape[0] * shape[1] * dense_fraction)
+        self.num_frames: int = 0
+        self.num_keyframes: int = 0
+        self.num_delta_cells: int = 0
+        max_keyframes: int = 2 * (max_frames // keyframe_interval + 1)
+
+        self.keyframes: np.ndarray = _create_array(
+            directory, "keyframes", (max_keyframes, *shape), dtype
+        )
+        self.delta_index: np.ndarray = _create_array(
+            directory, "delta_index", (max_delta_cells,), np.int32
+        )
+        self.delta_value: np.ndarray = _create_array(
+            directory, "delta_value", (max_delta_cells,), dtype
+        )
+        # delta cells of frame i are `delta_offsets[i]:delta_offsets[i + 1]`
+        self.delta_offsets: np.ndarray = _create_array(
+            directory, "delta_offsets", (max_frames + 1,), np.int64
+        )
+        # keyframe each frame's deltas apply to
+        self.frame_keyframe: np.ndarray = _create_array(
+            directory, "frame_keyframe", (max_frames,), np.int32
+        )
+        self._encoder: GridDeltaEncoder = GridDeltaEncoder()
+        self._full: bool = False
+
+    @classmethod
+    def open(cls, directory: str) -> "GridHistory":
+        """Map a history written to `directory` back read only, without copying."""
+        with open(path.join(directory, "meta.json")) as f:
+            meta: dict = json.load(f)
+        history: GridHistory = cls.__new__(cls)
+        history.shape = tuple(meta["shape"])
+        history.directory = directory
+        history.keyframe_interval = meta["keyframe_interval"]
+        history.max_dense_cells = meta["max_dense_cells"]
+        history.num_frames = meta["num_frames"]
+        history.num_keyframes = meta["num_keyframes"]
+        history.num_delta_cells = meta["num_delta_cells"]
+        for name in (
+            "keyframes",
+            "delta_index",
+            "delta_value",
+            "delta_offsets",
+            "frame_keyframe",
+        ):
+            setattr(
+                history,
+                name,
+                np.load(path.join(directory, f"{name}.npy"), mmap_mode="r"),
+            )
+        history._encoder = GridDeltaEncoder()
+        # read only
+        history._full = True
+        return history
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the frames stored so far."""
+        return (
+            self.num_keyframes * self.keyframes[0].nbytes
+            + self.num_delta_cells
+            * (self.delta_index.itemsize + self.delta_value.itemsize)
+            + self.num_frames
+            * (self.delta_offsets.itemsize + self.frame_keyframe.itemsize)
+        )
+
+    def append(self, grid: np.ndarray) -> bool:
+        """Store `grid` as the next frame, `False` if storage is full."""
+        frame: int = self.num_frames
+        if self._full or frame >= len(self.frame_keyframe):
+            self._full = True
+            return False
+        keyframes_full: bool = self.num_keyframes >= len(self.keyframes)
+        if frame % self.keyframe_interval == 0 and not keyframes_full:
+            self._encoder.reset()
+        delta: Optional[GridDelta] = self._encoder.encode(grid)
+        start: int = self.num_delta_cells
+
+        if delta is None or (
+            len(delta[0]) > self.max_dense_cells and not keyframes_full
+        ):
+            if delta is not None:
+                self._encoder.reset()
+                self._encoder.encode(grid)
+            self.keyframes[self.num_keyframes] = grid
+            self.num_keyframes += 1
+        else:
+            changed, values = delta
+            end: int = start + len(changed)
+            if end > len(self.delta_index):
+                self._full = True
+                return False
+            self.delta_index[start:end] = changed
+            self.delta_value[start:end] = values
+            self.num_delta_cells = end
+
+        self.frame_keyframe[frame] = self.num_keyframes - 1
+        self.delta_offsets[frame + 1] = self.num_delta_cells
+        self.num_frames += 1
+        return True
+
+    def keyframe(self, frame: int) -> np.ndarray:
+        """View of the keyframe `frame` builds on."""
+        return self.keyframes[self.frame_keyframe[frame]]
+
+    def delta(self, frame: int) -> GridDelta:
+        """Views of the cells changed on `frame` relative to the frame before."""
+        start: int = int(self.delta_offsets[frame])
+        end: int = int(self.delta_offsets[frame + 1])
+        return self.delta_index[start:end], self.delta_value[start:end]
+
+    def grid_at(self, frame: int) -> np.ndarray:
+        """Reconstruct the grid of `frame`, as a new array."""
+        keyframe_index: int = int(self.frame_keyframe[frame])
+        # frame the keyframe was stored on, keyframe indices never decrease
+        first: int = int(
+            np.searchsorted(self.frame_keyframe[: self.num_frames], keyframe_index)
+        )
+        grid: np.ndarray = np.array(self.keyframes[keyframe_index])
+        start: int = int(self.delta_offsets[first + 1])
+        end: int = int(self.delta_offsets[frame + 1])
+        # later writes to the same cell win, as with sequential replay
+        grid.ravel()[self.delta_index[start:end]] = self.delta_value[start:end]
+        return grid
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """
+        Every frame in order. One buffer is patched in place and yielded
+        each time, copy it to keep a frame around.
+        """
+        grid: Optional[np.ndarray] = None
+        current_keyframe: int = -1
+        for frame in range(self.num_frames):
+            keyframe_index: int = int(self.frame_keyframe[frame])
+            if keyframe_index != current_keyframe:
+                grid = np.array(self.keyframes[keyframe_index])
+                current_keyframe = keyframe_index
+            else:
+                changed, values = self.delta(frame)
+                grid.ravel()[changed] = values
+            yield grid
+
+    def flush(self) -> None:
+        """Write metadata (and memory mapped data) so `open` can read it back."""
+        if self.directory is None:
+            return
+        for array in (
+            self.keyframes,
+            self.delta_index,
+            self.delta_value,
+            self.delta_offsets,
+            self.frame_keyframe,
+        ):
+            if isinstance(array, np.memmap):
+                array.flush()
+        with open(path.join(self.directory, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "shape": list(self.shape),
+                    "keyframe_interval": self.keyframe_interval,
+                    "max_dense_cells": self.max_dense_cells,
+                    "num_frames": self.num_frames,
+                    "num_keyframes": self.num_keyframes,
+                    "num_delta_cells": self.num_delta_cells,
+                },
+                f,
+            )
+
+
+# mediator grid properties kept by `InfluenceHistory`
+INFLUENCE_GRIDS: tuple[str, ...] = (
+    "get_ground_grid",
+    "get_air_grid",
+    "get_ground_avoidance_grid",
+    "get_air_avoidance_grid",
+    "get_climber_grid",
+)
+
+
+class InfluenceHistory:
+    """
+    `GridHistory` of every influence grid the combat code reads, one
+    memory mapped subdirectory per grid.
+
+    Parameters
+    ----------
+    directory : str
+        Parent directory of the per grid histories.
+    shape : tuple[int, int]
+        Shape of the influence grids.
+    max_frames : int
+        Frames kept per grid.
+    dense_fraction : float
+        Frames changing more of a grid than this store a keyframe.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shape: tuple[int, int],
+        max_frames: int,
+        dense_fraction: float = 0.1,
+    ):
+        self.histories: dict[str, GridHistory] = {
+            name: GridHistory(
+                shape,
+                max_frames=max_frames,
+                directory=path.join(directory, name.removeprefix("get_")),
+                dense_fraction=dense_fraction,
+            )
+            for name in INFLUENCE_GRIDS
+        }
+        self._full: set[str] = set()
+
+    def record(self, mediator: "ManagerMediator") -> None:
+        for name, history in self.histories.items():
+            if not history.append(getattr(mediator, name)) and name not in self._full:
+                self._full.add(name)
+                logger.warning(
+                    f"Influence history of {name.removeprefix('get_')} is full "
+                    f"after {history.num_frames} frames, later frames are dropped"
+                )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(history.nbytes for history in self.histories.values())
+
+    def flush(self) -> None:
+        for history in self.histories.values():
+            history.flush()
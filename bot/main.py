@@ -1,24 +1,48 @@
+import gc
+import time
+from os import path
 from typing import Optional
 
-from sc2.ids.ability_id import AbilityId
-from sc2.ids.unit_typeid import UnitTypeId
-
+import numpy as np
 from ares import AresBot, UnitRole
-from ares.consts import ALL_STRUCTURES
-from ares.dicts.unit_data import UNIT_DATA
 from cython_extensions.units_utils import cy_closest_to
-from sc2.data import Race
+from loguru import logger
+from sc2.data import Race, Result
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
 
 from bot.combat_manager import CombatManager
+from bot.consts import (
+    CHUNK_FRAMES,
+    DB_PATH,
+    DENSE_FRACTION,
+    ENABLED,
+    GRID_HISTORY,
+    MATCH_UP_HISTORY,
+    MAX_FRAMES,
+    PATH,
+    PROFILER,
+    RECORDER,
+    REPORT_PATH,
+    WINDOW,
+)
+from bot.frame_profiler import FrameProfiler
+from bot.grid_history import InfluenceHistory
+from bot.match_up_store import MatchUpStore
 from bot.match_up_tracker import MatchUpTracker
+from bot.recorder import GameRecorder
+from bot.unit_table import is_structure, supply, type_ids_of
 
 
 class MyBot(AresBot):
     combat_manager: CombatManager
     match_up_tracker: MatchUpTracker
+    profiler: FrameProfiler
+    recorder: Optional[GameRecorder] = None
+    influence_history: Optional[InfluenceHistory] = None
 
     def __init__(self, game_step_override: Optional[int] = None):
         """Initiate custom bot
@@ -34,6 +58,7 @@ class MyBot(AresBot):
         self._detected_race: bool = False
         self._detected_enemy_race: Race = Race.Random
         self._sent_race_tag: bool = False
+        self._warmed_up: bool = False
         self._unreachable_cells = None
 
     @property
@@ -47,38 +72,150 @@ class MyBot(AresBot):
 
     async def on_start(self) -> None:
         await super(MyBot, self).on_start()
-        self.match_up_tracker = MatchUpTracker(self, self.config, self.mediator)
+        profiler_config: dict = self.config.get(PROFILER, {})
+        self.profiler = FrameProfiler(
+            enabled=profiler_config.get(ENABLED, False),
+            window=profiler_config.get(WINDOW, 5000),
+            report_path=profiler_config.get(REPORT_PATH, "data"),
+        )
+        match_up_store: Optional[MatchUpStore] = None
+        history_config: dict = self.config.get(MATCH_UP_HISTORY, {})
+        if history_config.get(ENABLED, False):
+            match_up_store = MatchUpStore(
+                history_config.get(DB_PATH, "data/match_ups.db")
+            )
+        self.match_up_tracker = MatchUpTracker(
+            self, self.config, self.mediator, match_up_store
+        )
         self.combat_manager = CombatManager(
-            self, self.config, self.mediator, self.match_up_tracker
+            self, self.config, self.mediator, self.match_up_tracker, self.profiler
         )
 
+        recorder_config: dict = self.config.get(RECORDER, {})
+        if recorder_config.get(ENABLED, False):
+            self.recorder = GameRecorder(
+                path.join(
+                    recorder_config.get(PATH, "data/recordings"),
+                    f"{self.opponent_id}_{int(time.time())}",
+                ),
+                chunk_frames=recorder_config.get(CHUNK_FRAMES, 500),
+            )
+        grid_history_config: dict = self.config.get(GRID_HISTORY, {})
+        if grid_history_config.get(ENABLED, False):
+            self.influence_history = InfluenceHistory(
+                path.join(
+                    grid_history_config.get(PATH, "data/grid_history"),
+                    f"{self.opponent_id}_{int(time.time())}",
+                ),
+                self.mediator.get_ground_grid.shape,
+                grid_history_config.get(MAX_FRAMES, 30000),
+                dense_fraction=grid_history_config.get(DENSE_FRACTION, 0.1),
+            )
+
     async def on_step(self, iteration: int) -> None:
         await super(MyBot, self).on_step(iteration)
 
-        self.combat_manager.execute()
-
-        await self.match_up_tracker.execute()
+        if self.recorder:
+            with self.profiler.stage("recorder"):
+                self.recorder.record(
+                    self.state.game_loop,
+                    self.time,
+                    self.race,
+                    self.enemy_race,
+                    self.units,
+                    self.all_enemy_units,
+                    self.mediator,
+                    self.match_up_tracker.active_match_up is not None,
+                )
+
+        if self.influence_history:
+            with self.profiler.stage("influence_history"):
+                self.influence_history.record(self.mediator)
+
+        # roles are assigned as the starting units are created, on the first
+        # step, so the squads the combat code runs on only exist from then
+        if not self._warmed_up and self.mediator.get_units_from_role(
+            role=UnitRole.ATTACKING
+        ):
+            self._warm_up()
+
+        with self.profiler.stage("combat_manager"):
+            self.combat_manager.execute()
+
+        with self.profiler.stage("match_up_tracker"):
+            await self.match_up_tracker.execute()
+
+        self.profiler.end_frame()
 
         if not self._sent_race_tag and self.time > 5.0:
             await self.chat_send(f"Tag: My Race: {self.race.name}", True)
             await self.chat_send(f"Tag: Enemy Race: {self.enemy_race.name}", True)
             self._sent_race_tag = True
 
+    def _warm_up(self) -> None:
+        start: float = time.perf_counter()
+        self.combat_manager.warm_up()
+        # objects built so far live all game, keep them out of gc scans
+        gc.collect()
+        gc.freeze()
+        self._warmed_up = True
+        logger.info(f"Warm up took {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    async def on_end(self, game_result: Result) -> None:
+        await super(MyBot, self).on_end(game_result)
+        fight_cache = self.combat_manager.fight_cache
+        logger.info(
+            f"Fight cache: {fight_cache.hits} hits, {fight_cache.misses} misses, "
+            f"hit rate {fight_cache.hit_rate:.1%}"
+        )
+        logger.info(f"Unchanged squads: {self.combat_manager.skip_stats.summary()}")
+        logger.info(f"Squad orders: {self.combat_manager.command_stats.summary()}")
+        if scheduler := self.combat_manager.scheduler:
+            logger.info(
+                f"Squad scheduler: {scheduler.updated} updates, "
+                f"{scheduler.deferred} deferred, "
+                f"{scheduler.over_budget_steps} steps over budget"
+            )
+        if sim_queue := self.combat_manager.sim_queue:
+            logger.info(
+                f"Fight sim queue: {sim_queue.submitted} submitted, "
+                f"{sim_queue.completed} completed, {sim_queue.late} late"
+            )
+            sim_queue.shutdown()
+        if self.recorder:
+            self.recorder.flush()
+            logger.info(
+                f"Recorded {self.recorder.frames_recorded} frames "
+                f"to {self.recorder.directory}"
+            )
+        if self.influence_history:
+            self.influence_history.flush()
+            logger.info(
+                f"Influence history: {self.influence_history.nbytes / 2**20:.1f}MiB"
+            )
+        if self.match_up_tracker.store:
+            self.match_up_tracker.store.close()
+        if report := self.profiler.dump_report(
+            f"profile_{self.opponent_id}_{int(time.time())}.json"
+        ):
+            logger.info(f"Frame profile written to {report}")
+
     async def on_unit_destroyed(self, unit_tag: int) -> None:
         await super(MyBot, self).on_unit_destroyed(unit_tag)
         self.match_up_tracker.remove_unit_tag(unit_tag)
+        self.combat_manager.on_unit_destroyed(unit_tag)
 
     async def on_unit_created(self, unit: Unit) -> None:
         # on micro ladder, assign all to attacking by default
         self.mediator.assign_role(tag=unit.tag, role=UnitRole.ATTACKING)
+        self.combat_manager.on_unit_created(unit)
         if unit.type_id == UnitTypeId.CYCLONE:
             await self.client.toggle_autocast([unit], AbilityId.LOCKON_LOCKON)
 
-    def get_total_supply(self, units: Units) -> int:
-        return sum(
-            [
-                UNIT_DATA[unit.type_id]["supply"]
-                for unit in units
-                if unit.type_id not in ALL_STRUCTURES
-            ]
-        )
+    async def on_unit_type_changed(self, unit: Unit, previous_type: UnitTypeId) -> None:
+        await super(MyBot, self).on_unit_type_changed(unit, previous_type)
+        self.combat_manager.on_unit_type_changed(unit)
+
+    def get_total_supply(self, units: Units) -> float:
+        type_ids: np.ndarray = type_ids_of(units)
+        return float(supply(type_ids)[~is_structure(type_ids)].sum())
@@ -0,0 +1,153 @@
+import sqlite3
+from dataclasses import dataclass
+from enum import IntEnum
+from os import makedirs, path
+from typing import Iterable, Optional
+
+
+class RoundResult(IntEnum):
+    LOSS = 0
+    TIE = 1
+    WIN = 2
+
+
+@dataclass(frozen=True)
+class CompositionStats:
+    """Historical results of one own vs enemy composition."""
+
+    rounds: int
+    wins: int
+    losses: int
+    ties: int
+    average_duration: float
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.rounds if self.rounds else 0.0
+
+
+def composition_key(unit_types: Iterable[str]) -> str:
+    """Order independent key for a set of unit type names."""
+    return ",".join(sorted(unit_types))
+
+
+class MatchUpStore:
+    """
+    SQLite store of every micro arena round played, keyed by opponent id.
+
+    Each round is appended to `rounds`. Per composition totals are kept
+    up to date in `composition_stats`, so looking up the history of a
+    match up is a single primary key read no matter how many rounds have
+    been recorded.
+
+    Parameters
+    ----------
+    db_path : str
+        SQLite file, created along with its directory if missing.
+    """
+
+    def __init__(self, db_path: str):
+        if directory := path.dirname(db_path):
+            makedirs(directory, exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(db_path)
+        # a crash mid game may lose the last round, never corrupts the file
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS rounds (
+                    id INTEGER PRIMARY KEY,
+                    opponent_id TEXT NOT NULL,
+                    own_composition TEXT NOT NULL,
+                    enemy_composition TEXT NOT NULL,
+                    result INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    engage_decisions INTEGER NOT NULL,
+                    disengage_decisions INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS rounds_opponent
+                    ON rounds (opponent_id);
+                CREATE TABLE IF NOT EXISTS composition_stats (
+                    opponent_id TEXT NOT NULL,
+                    own_composition TEXT NOT NULL,
+                    enemy_composition TEXT NOT NULL,
+                    rounds INTEGER NOT NULL,
+                    wins INTEGER NOT NULL,
+                    losses INTEGER NOT NULL,
+                    ties INTEGER NOT NULL,
+                    total_duration REAL NOT NULL,
+                    PRIMARY KEY (opponent_id, own_composition, enemy_composition)
+                ) WITHOUT ROWID;
+                """
+            )
+
+    def record_round(
+        self,
+        opponent_id: str,
+        own_unit_types: Iterable[str],
+        enemy_unit_types: Iterable[str],
+        result: RoundResult,
+        duration: float,
+        engage_decisions: int = 0,
+        disengage_decisions: int = 0,
+    ) -> None:
+        own: str = composition_key(own_unit_types)
+        enemy: str = composition_key(enemy_unit_types)
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO rounds (opponent_id, own_composition, enemy_composition,"
+                " result, duration, engage_decisions, disengage_decisions)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    opponent_id,
+                    own,
+                    enemy,
+                    int(result),
+                    duration,
+                    engage_decisions,
+                    disengage_decisions,
+                ),
+            )
+            self._connection.execute(
+                "INSERT INTO composition_stats VALUES (?, ?, ?, 1, ?, ?, ?, ?)"
+                " ON CONFLICT (opponent_id, own_composition, enemy_composition)"
+                " DO UPDATE SET rounds = rounds + 1,"
+                " wins = wins + excluded.wins, losses = losses + excluded.losses,"
+                " ties = ties + excluded.ties,"
+                " total_duration = total_duration + excluded.total_duration",
+                (
+                    opponent_id,
+                    own,
+                    enemy,
+                    int(result == RoundResult.WIN),
+                    int(result == RoundResult.LOSS),
+                    int(result == RoundResult.TIE),
+                    duration,
+                ),
+            )
+
+    def composition_stats(
+        self,
+        opponent_id: str,
+        own_unit_types: Iterable[str],
+        enemy_unit_types: Iterable[str],
+    ) -> Optional[CompositionStats]:
+        """History of this composition against this opponent, if played before."""
+        row: Optional[tuple] = self._connection.execute(
+            "SELECT rounds, wins, losses, ties, total_duration"
+            " FROM composition_stats WHERE opponent_id = ?"
+            " AND own_composition = ? AND enemy_composition = ?",
+            (
+                opponent_id,
+                composition_key(own_unit_types),
+                composition_key(enemy_unit_types),
+            ),
+        ).fetchone()
+        if not row:
+            return None
+        rounds, wins, losses, ties, total_duration = row
+        return CompositionStats(rounds, wins, losses, ties, total_duration / rounds)
+
+    def close(self) -> None:
+        self._connection.close()
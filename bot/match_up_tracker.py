@@ -6,6 +6,8 @@ from ares.managers.manager_mediator import ManagerMediator
 from loguru import logger
 from sc2.ids.unit_typeid import UnitTypeId
 
+from bot.match_up_store import CompositionStats, MatchUpStore, RoundResult
+
 if TYPE_CHECKING:
     from ares import AresBot
 
@@ -22,6 +24,10 @@ class MatchUpState:
 
     start_time: float = 0
     end_time: float = 0
+    engage_decisions: int = 0
+    disengage_decisions: int = 0
+    # how this composition went against this opponent in the past
+    history: Optional[CompositionStats] = None
 
     def init(self):
         for unit in self.mediator.get_own_army:
@@ -52,16 +58,37 @@ class MatchUpTracker:
         Dictionary with the data from the configuration file
     mediator : ManagerMediator
         Used for getting information from managers in Ares.
+    store : Optional[MatchUpStore]
+        Rounds are recorded here across games when provided.
     """
 
-    def __init__(self, ai: "AresBot", config: dict, mediator: ManagerMediator):
+    def __init__(
+        self,
+        ai: "AresBot",
+        config: dict,
+        mediator: ManagerMediator,
+        store: Optional[MatchUpStore] = None,
+    ):
         self.ai: "AresBot" = ai
         self.config: dict = config
         self.mediator: ManagerMediator = mediator
+        self.store: Optional[MatchUpStore] = store
 
         self.match_ups: list[MatchUpState] = []
         self.active_match_up: Optional[MatchUpState] = None
 
+    @property
+    def opponent_id(self) -> str:
+        # only set when run through `ladder.py`
+        return str(getattr(self.ai, "opponent_id", None) or "unknown")
+
+    def record_engagement_decision(self, engage: bool) -> None:
+        if self.active_match_up:
+            if engage:
+                self.active_match_up.engage_decisions += 1
+            else:
+                self.active_match_up.disengage_decisions += 1
+
     def remove_unit_tag(self, tag: int) -> None:
         if self.active_match_up:
             self.active_match_up.remove_unit_tag(tag)
@@ -73,6 +100,17 @@ class MatchUpTracker:
                 self.active_match_up = MatchUpState(self.mediator)
                 self.active_match_up.start_time = self.ai.time
                 self.active_match_up.init()
+                if self.store:
+                    self.active_match_up.history = self.store.composition_stats(
+                        self.opponent_id,
+                        self.active_match_up.own_unit_types,
+                        self.active_match_up.enemy_unit_types,
+                    )
+                    if history := self.active_match_up.history:
+                        logger.info(
+                            f"Played this match up {history.rounds} times before, "
+                            f"win rate {history.win_rate:.0%}"
+                        )
         else:
             # Round over / not started yet
             if self.active_match_up:
@@ -95,13 +133,29 @@ class MatchUpTracker:
                 )
                 logger.info(formatted_tag)
                 # await self.ai.chat_send(formatted_tag)
+                result: RoundResult
                 if (has_enemy and has_own) or (not has_enemy and not has_own):
+                    result = RoundResult.TIE
                     await self.ai.chat_send(f"Tag: Round {round_number} - Tie")
                 elif has_own:
+                    result = RoundResult.WIN
                     await self.ai.chat_send(f"Tag: Round {round_number} - Won")
                 else:
+                    result = RoundResult.LOSS
                     await self.ai.chat_send(f"Tag: Round {round_number} - Lost")
 
+                if self.store:
+                    match_up: MatchUpState = self.active_match_up
+                    self.store.record_round(
+                        self.opponent_id,
+                        match_up.own_unit_types,
+                        match_up.enemy_unit_types,
+                        result,
+                        match_up.end_time - match_up.start_time,
+                        match_up.engage_decisions,
+                        match_up.disengage_decisions,
+                    )
+
                 self.active_match_up = None
 
                 if round_number == 10:
@@ -0,0 +1,294 @@
+"""
+Record what the combat code sees each frame, so real games can be played
+back headless as benchmarks and regression fixtures.
+
+A recording is a directory of `chunk_*.npz` files, each holding
+`chunk_frames` consecutive frames in columnar form. Unit columns of every
+frame in a chunk are concatenated with per frame offsets. Influence grids
+are stored as a full keyframe at the start of each chunk followed by the
+cells that changed each frame, so a chunk can be read on its own.
+"""
+from dataclasses import dataclass
+from os import listdir, makedirs, path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+from ares.consts import UnitRole
+from ares.managers.manager_mediator import ManagerMediator
+from ares.managers.squad_manager import UnitSquad
+from sc2.data import Race
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.grid_history import INFLUENCE_GRIDS, GridDelta, GridDeltaEncoder
+
+FLOAT_COLUMNS: tuple[str, ...] = (
+    "health",
+    "health_max",
+    "shield",
+    "shield_max",
+    "energy",
+    "ground_range",
+    "air_range",
+    "radius",
+    "movement_speed",
+)
+INT_COLUMNS: tuple[str, ...] = (
+    "attack_upgrade_level",
+    "armor_upgrade_level",
+    "shield_upgrade_level",
+)
+FLAG_COLUMNS: tuple[str, ...] = (
+    "can_attack",
+    "is_light",
+    "is_armored",
+    "is_hallucination",
+)
+UNIT_COLUMNS: tuple[str, ...] = (
+    ("tag", "type_id", "x", "y") + FLOAT_COLUMNS + INT_COLUMNS + FLAG_COLUMNS
+)
+# every influence grid the combat code reads, without the mediator's `get_`
+GRID_NAMES: tuple[str, ...] = tuple(
+    name.removeprefix("get_") for name in INFLUENCE_GRIDS
+)
+
+
+def _unit_columns(units: Union[Units, list[Unit]]) -> dict[str, np.ndarray]:
+    units = list(units)
+    columns: dict[str, np.ndarray] = {
+        "tag": np.array([u.tag for u in units], dtype=np.int64),
+        "type_id": np.array([u.type_id.value for u in units], dtype=np.int32),
+        "x": np.array([u.position[0] for u in units], dtype=np.float32),
+        "y": np.array([u.position[1] for u in units], dtype=np.float32),
+    }
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array([getattr(u, name) for u in units], dtype=np.float32)
+    for name in INT_COLUMNS:
+        columns[name] = np.array([getattr(u, name) for u in units], dtype=np.int8)
+    for name in FLAG_COLUMNS:
+        columns[name] = np.array([getattr(u, name) for u in units], dtype=bool)
+    return columns
+
+
+class _ChunkBuffer:
+    """Columns of the frames recorded since the last chunk was written."""
+
+    def __init__(self):
+        self.columns: dict[str, list] = dict()
+
+    def append(self, name: str, value) -> None:
+        self.columns.setdefault(name, []).append(value)
+
+    def __len__(self) -> int:
+        return len(self.columns.get("game_loop", []))
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        arrays: dict[str, np.ndarray] = dict()
+        for name, values in self.columns.items():
+            if isinstance(values[0], np.ndarray) and values[0].ndim > 0:
+                arrays[name] = np.concatenate(values)
+                arrays[f"{name}_counts"] = np.array(
+                    [len(v) for v in values], dtype=np.int32
+                )
+            else:
+                arrays[name] = np.array(values)
+        return arrays
+
+
+class GameRecorder:
+    """
+    Stream per frame combat state to compressed columnar chunks on disk.
+
+    Parameters
+    ----------
+    directory : str
+        Directory the recording is written to, created if missing.
+    chunk_frames : int
+        Frames per chunk file.
+    squad_radius : float
+        Passed to `mediator.get_squads`, should match the squad controller.
+    """
+
+    def __init__(
+        self, directory: str, chunk_frames: int = 500, squad_radius: float = 9.0
+    ):
+        makedirs(directory, exist_ok=True)
+        self.directory: str = directory
+        self.chunk_frames: int = chunk_frames
+        self.squad_radius: float = squad_radius
+        self.frames_recorded: int = 0
+        self._num_chunks: int = 0
+        self._buffer: _ChunkBuffer = _ChunkBuffer()
+        self._grid_encoders: dict[str, GridDeltaEncoder] = {
+            name: GridDeltaEncoder() for name in GRID_NAMES
+        }
+        self._keyframes: dict[str, np.ndarray] = dict()
+
+    def record(
+        self,
+        game_loop: int,
+        time: float,
+        race: Race,
+        enemy_race: Race,
+        own_units: Units,
+        all_enemy_units: Units,
+        mediator: ManagerMediator,
+        match_up_active: bool,
+    ) -> None:
+        buffer: _ChunkBuffer = self._buffer
+        buffer.append("game_loop", game_loop)
+        buffer.append("time", time)
+        # per frame, a random enemy's race is only known once it is scouted
+        buffer.append("race", race.value)
+        buffer.append("enemy_race", enemy_race.value)
+        buffer.append("match_up_active", match_up_active)
+        for prefix, units in (("own", own_units), ("enemy", all_enemy_units)):
+            for name, column in _unit_columns(units).items():
+                buffer.append(f"{prefix}_{name}", column)
+
+        squads: list[UnitSquad] = mediator.get_squads(
+            role=UnitRole.ATTACKING, squad_radius=self.squad_radius
+        )
+        buffer.append("squad_id", np.array([s.squad_id for s in squads], dtype=str))
+        buffer.append(
+            "squad_main", np.array([s.main_squad for s in squads], dtype=bool)
+        )
+        buffer.append(
+            "squad_position",
+            np.array([s.squad_position for s in squads], dtype=np.float32).reshape(
+                -1, 2
+            ),
+        )
+        buffer.append(
+            "squad_member_counts",
+            np.array([len(s.squad_units) for s in squads], dtype=np.int32),
+        )
+        buffer.append(
+            "squad_member_tags",
+            np.array([u.tag for s in squads for u in s.squad_units], dtype=np.int64),
+        )
+
+        for name in GRID_NAMES:
+            self._record_grid(name, getattr(mediator, f"get_{name}"))
+
+        self.frames_recorded += 1
+        if len(buffer) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        if not len(self._buffer):
+            return
+        np.savez_compressed(
+            path.join(self.directory, f"chunk_{self._num_chunks:05}.npz"),
+            **self._buffer.arrays(),
+            **{
+                f"{name}_keyframe": keyframe
+                for name, keyframe in self._keyframes.items()
+            },
+        )
+        self._num_chunks += 1
+        self._buffer = _ChunkBuffer()
+        for encoder in self._grid_encoders.values():
+            encoder.reset()
+        self._keyframes = dict()
+
+    def _record_grid(self, name: str, grid: np.ndarray) -> None:
+        delta: Optional[GridDelta] = self._grid_encoders[name].encode(grid)
+        if delta is None:
+            # first frame of the chunk, the keyframe is the whole grid
+            self._keyframes[name] = grid.copy()
+            delta = np.empty(0, dtype=np.int64), np.empty(0, dtype=grid.dtype)
+        self._buffer.append(f"{name}_changed", delta[0])
+        self._buffer.append(f"{name}_values", delta[1])
+
+
+@dataclass
+class RecordedSquad:
+    squad_id: str
+    main_squad: bool
+    position: tuple[float, float]
+    member_tags: np.ndarray
+
+
+@dataclass
+class RecordedFrame:
+    game_loop: int
+    time: float
+    race: Race
+    enemy_race: Race
+    match_up_active: bool
+    own: dict[str, np.ndarray]
+    enemy: dict[str, np.ndarray]
+    squads: list[RecordedSquad]
+    # views of the reconstructed grids, only valid until the next frame
+    grids: dict[str, np.ndarray]
+
+
+def _frame_slices(counts: np.ndarray) -> list[slice]:
+    ends: np.ndarray = np.cumsum(counts)
+    return [slice(int(e - c), int(e)) for e, c in zip(ends, counts)]
+
+
+def read_recording(directory: str) -> Iterator[RecordedFrame]:
+    """Yield every frame of a recording made by `GameRecorder`, in order."""
+    for file_name in sorted(
+        f for f in listdir(directory) if f.startswith("chunk_") and f.endswith(".npz")
+    ):
+        with np.load(path.join(directory, file_name)) as chunk:
+            data: dict[str, np.ndarray] = dict(chunk)
+        num_frames: int = len(data["game_loop"])
+
+        unit_slices: dict[str, list[slice]] = {
+            prefix: _frame_slices(data[f"{prefix}_tag_counts"])
+            for prefix in ("own", "enemy")
+        }
+        squad_slices: list[slice] = _frame_slices(data["squad_id_counts"])
+        member_slices: list[slice] = _frame_slices(data["squad_member_tags_counts"])
+        grid_slices: dict[str, list[slice]] = {
+            name: _frame_slices(data[f"{name}_changed_counts"]) for name in GRID_NAMES
+        }
+        grids: dict[str, np.ndarray] = {
+            name: data[f"{name}_keyframe"].copy() for name in GRID_NAMES
+        }
+
+        for i in range(num_frames):
+            for name in GRID_NAMES:
+                frame_slice: slice = grid_slices[name][i]
+                grids[name].ravel()[data[f"{name}_changed"][frame_slice]] = data[
+                    f"{name}_values"
+                ][frame_slice]
+
+            squads: list[RecordedSquad] = []
+            member_tags: np.ndarray = data["squad_member_tags"][member_slices[i]]
+            member_ends: np.ndarray = np.cumsum(
+                data["squad_member_counts"][squad_slices[i]]
+            )
+            squad_slice: slice = squad_slices[i]
+            for j, squad_index in enumerate(range(squad_slice.start, squad_slice.stop)):
+                start: int = int(member_ends[j - 1]) if j else 0
+                squads.append(
+                    RecordedSquad(
+                        squad_id=str(data["squad_id"][squad_index]),
+                        main_squad=bool(data["squad_main"][squad_index]),
+                        position=tuple(data["squad_position"][squad_index].tolist()),
+                        member_tags=member_tags[start : int(member_ends[j])],
+                    )
+                )
+
+            yield RecordedFrame(
+                game_loop=int(data["game_loop"][i]),
+                time=float(data["time"][i]),
+                race=Race(int(data["race"][i])),
+                enemy_race=Race(int(data["enemy_race"][i])),
+                match_up_active=bool(data["match_up_active"][i]),
+                own={
+                    name: data[f"own_{name}"][unit_slices["own"][i]]
+                    for name in UNIT_COLUMNS
+                },
+                enemy={
+                    name: data[f"enemy_{name}"][unit_slices["enemy"][i]]
+                    for name in UNIT_COLUMNS
+                },
+                squads=squads,
+                grids=grids,
+            )
@@ -0,0 +1,75 @@
+"""
+Static per `UnitTypeId` attributes, built once at import.
+
+Each column is a NumPy array indexed by `UnitTypeId.value`, so a whole
+collection of units can be looked up at once from an array of type ids,
+instead of going through the nested `UNIT_DATA` dicts per unit.
+"""
+from typing import Any, Callable, Union
+
+import numpy as np
+from ares.consts import ALL_STRUCTURES
+from ares.dicts.unit_data import UNIT_DATA
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.unit import Unit
+from sc2.units import Units
+
+from bot.combat_squads.consts import FODDER_VALUES
+
+NO_FODDER_VALUE: int = -1
+TABLE_SIZE: int = max(type_id.value for type_id in UnitTypeId) + 1
+
+
+def _build_column(
+    dtype: type, default: Union[bool, float], get: Callable[[UnitTypeId], Any]
+) -> np.ndarray:
+    column: np.ndarray = np.full(TABLE_SIZE, default, dtype=dtype)
+    for type_id in UnitTypeId:
+        if (value := get(type_id)) is not None:
+            column[type_id.value] = value
+    column.flags.writeable = False
+    return column
+
+
+def _unit_data(key: str) -> Callable[[UnitTypeId], Any]:
+    return lambda type_id: UNIT_DATA[type_id][key] if type_id in UNIT_DATA else None
+
+
+UNIT_FLYING: np.ndarray = _build_column(bool, False, _unit_data("flying"))
+UNIT_SUPPLY: np.ndarray = _build_column(np.float64, 0.0, _unit_data("supply"))
+UNIT_MINERALS: np.ndarray = _build_column(np.float64, 0.0, _unit_data("minerals"))
+UNIT_GAS: np.ndarray = _build_column(np.float64, 0.0, _unit_data("gas"))
+UNIT_IS_STRUCTURE: np.ndarray = _build_column(
+    bool, False, lambda type_id: type_id in ALL_STRUCTURES
+)
+UNIT_FODDER_VALUE: np.ndarray = _build_column(
+    np.int32, NO_FODDER_VALUE, FODDER_VALUES.get
+)
+
+
+def type_ids_of(units: Union[Units, list[Unit]]) -> np.ndarray:
+    return np.fromiter(
+        (u.type_id.value for u in units), dtype=np.int32, count=len(units)
+    )
+
+
+def is_flying(type_ids: np.ndarray) -> np.ndarray:
+    return UNIT_FLYING[type_ids]
+
+
+def is_structure(type_ids: np.ndarray) -> np.ndarray:
+    return UNIT_IS_STRUCTURE[type_ids]
+
+
+def supply(type_ids: np.ndarray) -> np.ndarray:
+    return UNIT_SUPPLY[type_ids]
+
+
+def fodder_value(type_ids: np.ndarray) -> np.ndarray:
+    """Fodder value per type, `NO_FODDER_VALUE` where a type is never fodder."""
+    return UNIT_FODDER_VALUE[type_ids]
+
+
+def unit_value(type_ids: np.ndarray, mineral_weight: float = 0.5) -> np.ndarray:
+    """Resource value per type, a `mineral_weight` < 1.0 favours vespene."""
+    return UNIT_MINERALS[type_ids] * mineral_weight + UNIT_GAS[type_ids]